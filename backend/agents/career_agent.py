@@ -4,10 +4,16 @@ Enhanced Career Agent using LangChain Framework
 Backward compatible with existing code while providing advanced capabilities
 """
 
-import os
 from typing import List, Dict, Any, Optional
+from utils.llm_client import create_chat_model
+from utils.deadline import invoke_agent, InsufficientTimeBudget
+from utils.circuit_breaker import get_breaker
+from utils.model_cascade import ModelCascade
+from utils.metrics import instrument_tools
+from utils.structured_logging import get_logger
+from utils.knowledge_base import get_knowledge_base, grounded_prompt
+from utils.skill_graph import get_skill_graph, gap_facts
 try:
-    from langchain_openai import ChatOpenAI
     from langchain.agents import AgentExecutor, create_openai_functions_agent
     from langchain.tools import Tool
     from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
@@ -18,6 +24,8 @@ except ImportError:
     LANGCHAIN_AVAILABLE = False
     from utils.openai_helper import agentic_completion
 
+log = get_logger("agents.career")
+
 class CareerAgentLangChain:
     """Enhanced Career Agent using LangChain framework"""
     
@@ -25,12 +33,18 @@ class CareerAgentLangChain:
         if not LANGCHAIN_AVAILABLE:
             raise ImportError("LangChain not installed. Install with: pip install langchain langchain-openai")
         
-        self.llm = ChatOpenAI(
+        self.llm = create_chat_model(
             model="gpt-3.5-turbo",
-            temperature=0.7,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
+            temperature=0.7
         )
         
+        # Tool prompts go through the model cascade (cheap tier first)
+        self.cascade = ModelCascade("career-advice")
+        
+        # Local market data grounds (or answers) the research tools
+        self.knowledge_base = get_knowledge_base()
+        self.skill_graph = get_skill_graph()
+        
         # Initialize memory for conversation context
         self.memory = ConversationBufferWindowMemory(
             memory_key="chat_history",
@@ -39,7 +53,7 @@ class CareerAgentLangChain:
         )
         
         # Create specialized tools
-        self.tools = self._create_career_tools()
+        self.tools = instrument_tools(self._create_career_tools())
         
         # Create the agent
         self.agent_executor = self._create_agent()
@@ -49,6 +63,16 @@ class CareerAgentLangChain:
         
         def industry_trend_analyzer(industry_query: str) -> str:
             """Analyze current industry trends and market conditions"""
+            lookup = self.knowledge_base.lookup("industry_trend_analyzer", industry_query)
+            if lookup["answer"]:
+                return lookup["answer"]
+            if lookup["facts"]:
+                prompt = grounded_prompt(
+                    "As a career market analyst, summarize the outlook, opportunities and 2-5 year predictions.",
+                    industry_query, lookup["facts"]
+                )
+                return self.cascade.invoke("industry_trend_analyzer", prompt)
+            
             prompt = f"""
             As a career market analyst, provide comprehensive industry analysis for: {industry_query}
             
@@ -65,11 +89,19 @@ class CareerAgentLangChain:
             
             Provide specific, actionable insights for career planning.
             """
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content
+            return self.cascade.invoke("industry_trend_analyzer", prompt)
         
         def skill_development_planner(current_profile: str, target_role: str) -> str:
             """Create personalized skill development roadmap"""
+            gap = self.skill_graph.gap(current_profile, target_role)
+            if gap:
+                prompt = grounded_prompt(
+                    "Write a 12-month skill development plan that follows the learning order below, "
+                    "with portfolio projects and measurable milestones for each phase.",
+                    f"Current profile: {current_profile}; target role: {target_role}", gap_facts(gap)
+                )
+                return self.cascade.invoke("skill_development_planner", prompt)
+            
             prompt = f"""
             Current Profile: {current_profile}
             Target Role: {target_role}
@@ -104,8 +136,7 @@ class CareerAgentLangChain:
                - Assessment checkpoints
                - Adjustment triggers
             """
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content
+            return self.cascade.invoke("skill_development_planner", prompt)
         
         def career_transition_strategist(transition_details: str) -> str:
             """Develop strategic career transition plan"""
@@ -144,11 +175,20 @@ class CareerAgentLangChain:
                - Phase 3: Job search execution (months 4-6)
                - Phase 4: Transition completion (months 6-8)
             """
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content
+            return self.cascade.invoke("career_transition_strategist", prompt)
         
         def compensation_research_analyst(role_location_experience: str) -> str:
             """Provide detailed compensation analysis and negotiation strategy"""
+            lookup = self.knowledge_base.lookup("compensation_research_analyst", role_location_experience)
+            if lookup["answer"]:
+                return lookup["answer"]
+            if lookup["facts"]:
+                prompt = grounded_prompt(
+                    "As a compensation analyst, position the candidate within these bands and give a negotiation strategy.",
+                    role_location_experience, lookup["facts"]
+                )
+                return self.cascade.invoke("compensation_research_analyst", prompt)
+            
             prompt = f"""
             Role/Location/Experience: {role_location_experience}
             
@@ -182,8 +222,7 @@ class CareerAgentLangChain:
                - Promotion timeline strategy
                - External opportunity benchmarking
             """
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content
+            return self.cascade.invoke("compensation_research_analyst", prompt)
         
         return [
             Tool(
@@ -254,7 +293,7 @@ class CareerAgentLangChain:
             agent=agent,
             tools=self.tools,
             memory=self.memory,
-            verbose=True,
+            verbose=False,
             handle_parsing_errors=True,
             max_iterations=3
         )
@@ -286,8 +325,10 @@ class CareerAgentLangChain:
             enhanced_query = query
         
         try:
-            response = self.agent_executor.invoke({"input": enhanced_query})
-            return response["output"]
+            return get_breaker("agent:career").call(
+                lambda: invoke_agent(self.agent_executor, {"input": enhanced_query}, agent="career"),
+                neutral_errors=(InsufficientTimeBudget,)
+            )
         
         except Exception as e:
             # Fallback to simple completion if agent fails
@@ -311,13 +352,14 @@ def get_career_advice(query: str, user_context: Optional[Dict[str, Any]] = None)
     Enhanced career advice function with LangChain capabilities
     Backward compatible with existing code
     """
-    if LANGCHAIN_AVAILABLE:
+    # While the agent's breaker is open, go straight to the cheap completion
+    if LANGCHAIN_AVAILABLE and not get_breaker("agent:career").is_open:
         try:
             # Use enhanced LangChain agent
             agent = CareerAgentLangChain()
             return agent.get_career_advice(query, user_context)
         except Exception as e:
-            print(f"[INFO] LangChain agent failed, falling back to simple completion: {e}")
+            log.info("agent.fallback", agent="career", error=e)
             # Fallback to original implementation
             pass
     
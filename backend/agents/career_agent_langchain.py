@@ -3,9 +3,8 @@ LangChain-powered Career Agent
 A drop-in replacement for the current career_agent.py with enhanced capabilities
 """
 
-import os
 from typing import List, Dict, Any, Optional
-from langchain_openai import ChatOpenAI
+from utils.llm_client import create_chat_model
 from langchain.agents import AgentExecutor, create_openai_functions_agent
 from langchain.tools import Tool
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
@@ -16,10 +15,9 @@ class CareerAgentLangChain:
     """Enhanced Career Agent using LangChain framework"""
     
     def __init__(self):
-        self.llm = ChatOpenAI(
+        self.llm = create_chat_model(
             model="gpt-3.5-turbo",
-            temperature=0.7,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
+            temperature=0.7
         )
         
         # Initialize memory for conversation context
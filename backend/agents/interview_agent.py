@@ -4,10 +4,16 @@ Enhanced Interview Agent using LangChain Framework
 Comprehensive interview preparation with specialized coaching tools
 """
 
-import os
 from typing import List, Dict, Any, Optional
+from utils.llm_client import create_chat_model
+from utils.deadline import invoke_agent, InsufficientTimeBudget
+from utils.circuit_breaker import get_breaker
+from utils.model_cascade import ModelCascade
+from utils.metrics import instrument_tools
+from utils.structured_logging import get_logger
+from utils.knowledge_base import detect_level
+from utils.question_bank import get_question_bank, format_questions, format_mock_interview, parse_questions
 try:
-    from langchain_openai import ChatOpenAI
     from langchain.agents import AgentExecutor, create_openai_functions_agent
     from langchain.tools import Tool
     from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
@@ -18,6 +24,8 @@ except ImportError:
     LANGCHAIN_AVAILABLE = False
     from utils.openai_helper import agentic_completion
 
+log = get_logger("agents.interview")
+
 class InterviewAgentLangChain:
     """Enhanced Interview Agent using LangChain framework"""
     
@@ -25,19 +33,24 @@ class InterviewAgentLangChain:
         if not LANGCHAIN_AVAILABLE:
             raise ImportError("LangChain not installed. Install with: pip install langchain langchain-openai")
         
-        self.llm = ChatOpenAI(
+        self.llm = create_chat_model(
             model="gpt-3.5-turbo",
-            temperature=0.7,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
+            temperature=0.7
         )
         
+        # Tool prompts go through the model cascade (cheap tier first)
+        self.cascade = ModelCascade("mock-interview")
+        
+        # Questions come from the local bank; the LLM only fills gaps for unseen roles
+        self.question_bank = get_question_bank()
+        
         self.memory = ConversationBufferWindowMemory(
             memory_key="chat_history",
             return_messages=True,
             k=5
         )
         
-        self.tools = self._create_interview_tools()
+        self.tools = instrument_tools(self._create_interview_tools())
         self.agent_executor = self._create_agent()
     
     def _create_interview_tools(self) -> List[Tool]:
@@ -45,6 +58,14 @@ class InterviewAgentLangChain:
         
         def question_generator(role_level_company: str) -> str:
             """Generate targeted interview questions by category and difficulty"""
+            role, level = self.question_bank.resolve_role(role_level_company), detect_level(role_level_company)
+
+            def generate(gap_prompt: str) -> str:
+                return self.cascade.invoke("question_generator", gap_prompt)
+
+            if self.question_bank.fill_gap(role, level, generate):
+                return format_questions(role, self.question_bank.sample(role, level))
+            
             prompt = f"""
             Role/Level/Company Context: {role_level_company}
             
@@ -94,8 +115,7 @@ class InterviewAgentLangChain:
             
             Provide 20-25 high-quality questions across all categories with difficulty levels.
             """
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content
+            return self.cascade.invoke("question_generator", prompt)
         
         def answer_coach(question_answer_context: str) -> str:
             """Provide coaching for interview answer improvement"""
@@ -148,8 +168,7 @@ class InterviewAgentLangChain:
             
             Provide specific, actionable feedback with improved answer examples.
             """
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content
+            return self.cascade.invoke("answer_coach", prompt)
         
         def company_research_analyst(company_role_info: str) -> str:
             """Analyze company and role for strategic interview preparation"""
@@ -210,11 +229,18 @@ class InterviewAgentLangChain:
             
             Provide strategic insights and actionable preparation recommendations.
             """
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content
+            return self.cascade.invoke("company_research_analyst", prompt)
         
         def mock_interview_simulator(interview_parameters: str) -> str:
             """Simulate realistic interview scenarios with feedback"""
+            role, level = self.question_bank.resolve_role(interview_parameters), detect_level(interview_parameters)
+
+            def generate(gap_prompt: str) -> str:
+                return self.cascade.invoke("mock_interview_simulator", gap_prompt)
+
+            if self.question_bank.fill_gap(role, level, generate):
+                return format_mock_interview(role, self.question_bank.sample(role, level))
+            
             prompt = f"""
             Interview Parameters: {interview_parameters}
             
@@ -267,8 +293,7 @@ class InterviewAgentLangChain:
             
             Provide immersive simulation with detailed performance feedback.
             """
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content
+            return self.cascade.invoke("mock_interview_simulator", prompt)
         
         return [
             Tool(
@@ -339,7 +364,7 @@ class InterviewAgentLangChain:
             agent=agent,
             tools=self.tools,
             memory=self.memory,
-            verbose=True,
+            verbose=False,
             handle_parsing_errors=True,
             max_iterations=3
         )
@@ -362,8 +387,12 @@ class InterviewAgentLangChain:
             enhanced_query = f"Generate challenging and relevant mock interview questions and preparation strategy for the role: {role}"
         
         try:
-            response = self.agent_executor.invoke({"input": enhanced_query})
-            return response["output"]
+            response = get_breaker("agent:interview").call(
+                lambda: invoke_agent(self.agent_executor, {"input": enhanced_query}, agent="interview"),
+                neutral_errors=(InsufficientTimeBudget,)
+            )
+            remember_questions(role, response)
+            return response
         
         except Exception as e:
             # Fallback to direct LLM call
@@ -384,22 +413,50 @@ class InterviewAgentLangChain:
             except Exception as fallback_error:
                 return f"I apologize, but I'm experiencing technical difficulties. Please try again. Error: {str(fallback_error)}"
 
+def remember_questions(role: str, response: str):
+    """Write questions from a generated response back to the bank (duplicates are ignored)"""
+    try:
+        bank = get_question_bank()
+        bank.add(parse_questions(response), bank.resolve_role(role), detect_level(role))
+    except Exception as e:
+        log.warning("question_bank.write_failed", error=e)
+
+def answer_from_bank(role: str) -> Optional[str]:
+    """Questions and a mock interview script for a role the bank covers, or None to use the LLM"""
+    try:
+        bank = get_question_bank()
+        bank_role, level = bank.resolve_role(role), detect_level(role)
+        if not bank.has_coverage(bank_role, level):
+            return None
+        questions = bank.sample(bank_role, level)
+    except Exception as e:
+        log.warning("question_bank.read_failed", error=e)
+        return None
+    return format_questions(bank_role, questions) + "\n\n" + format_mock_interview(bank_role, questions)
+
 # Backward compatible function
 def get_interview_questions(role: str, context: Optional[Dict[str, Any]] = None) -> str:
     """
     Enhanced interview preparation with LangChain capabilities
     Backward compatible with existing code
     """
-    if LANGCHAIN_AVAILABLE:
+    # Covered roles are answered from the bank without building the agent; the LLM only fills gaps
+    answer = answer_from_bank(role)
+    if answer is not None:
+        return answer
+
+    # While the agent's breaker is open, go straight to the cheap completion
+    if LANGCHAIN_AVAILABLE and not get_breaker("agent:interview").is_open:
         try:
             agent = InterviewAgentLangChain()
             return agent.get_interview_questions(role, context)
         except Exception as e:
-            print(f"[INFO] LangChain agent failed, falling back to simple completion: {e}")
+            log.info("agent.fallback", agent="interview", error=e)
     
     # Original implementation as fallback
     from utils.openai_helper import agentic_completion
     system_prompt = "You are an expert AI interviewer."
     user_prompt = f"Generate challenging and relevant mock interview questions for the role: {role}"
     result = agentic_completion(system_prompt, user_prompt)
+    remember_questions(role, result["content"])
     return result["content"]
@@ -4,10 +4,17 @@ Enhanced Learning Agent using LangChain Framework
 Comprehensive learning resource discovery and pathway planning
 """
 
-import os
 from typing import List, Dict, Any, Optional
+from utils.llm_client import create_chat_model
+from utils.deadline import invoke_agent, InsufficientTimeBudget
+from utils.circuit_breaker import get_breaker
+from utils.model_cascade import ModelCascade
+from utils.metrics import instrument_tools
+from utils.structured_logging import get_logger
+from utils.knowledge_base import grounded_prompt
+from utils.skill_graph import get_skill_graph, gap_facts
+from utils.resource_catalog import get_resource_catalog, format_resources, pathway_prompt
 try:
-    from langchain_openai import ChatOpenAI
     from langchain.agents import AgentExecutor, create_openai_functions_agent
     from langchain.tools import Tool
     from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
@@ -18,6 +25,8 @@ except ImportError:
     LANGCHAIN_AVAILABLE = False
     from utils.openai_helper import agentic_completion
 
+log = get_logger("agents.learning")
+
 class LearningAgentLangChain:
     """Enhanced Learning Agent using LangChain framework"""
     
@@ -25,19 +34,27 @@ class LearningAgentLangChain:
         if not LANGCHAIN_AVAILABLE:
             raise ImportError("LangChain not installed. Install with: pip install langchain langchain-openai")
         
-        self.llm = ChatOpenAI(
+        self.llm = create_chat_model(
             model="gpt-3.5-turbo",
-            temperature=0.7,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
+            temperature=0.7
         )
         
+        # Tool prompts go through the model cascade (cheap tier first)
+        self.cascade = ModelCascade("learning-resources")
+        
+        # Role requirements and skill gaps come from the skill graph
+        self.skill_graph = get_skill_graph()
+        
+        # Concrete courses and books come from the local catalog, not the LLM
+        self.catalog = get_resource_catalog()
+        
         self.memory = ConversationBufferWindowMemory(
             memory_key="chat_history",
             return_messages=True,
             k=5
         )
         
-        self.tools = self._create_learning_tools()
+        self.tools = instrument_tools(self._create_learning_tools())
         self.agent_executor = self._create_agent()
     
     def _create_learning_tools(self) -> List[Tool]:
@@ -45,6 +62,10 @@ class LearningAgentLangChain:
         
         def learning_pathway_architect(topic_goal: str) -> str:
             """Design structured learning pathways with progression levels"""
+            resources = self.catalog.search(topic_goal)
+            if resources:
+                return self.cascade.invoke("learning_pathway_architect", pathway_prompt(topic_goal, resources))
+            
             prompt = f"""
             Topic/Goal: {topic_goal}
             
@@ -89,11 +110,14 @@ class LearningAgentLangChain:
             
             Provide a clear, actionable learning roadmap.
             """
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content
+            return self.cascade.invoke("learning_pathway_architect", prompt)
         
         def resource_curator(topic_criteria: str) -> str:
             """Curate high-quality learning resources across multiple formats"""
+            resources = self.catalog.search(topic_criteria)
+            if resources:
+                return format_resources(resources)
+            
             prompt = f"""
             Learning Topic/Criteria: {topic_criteria}
             
@@ -143,11 +167,18 @@ class LearningAgentLangChain:
             
             Provide specific resource recommendations with quality indicators.
             """
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content
+            return self.cascade.invoke("resource_curator", prompt)
         
         def skill_gap_analyzer(current_skills: str, target_role: str) -> str:
             """Analyze skill gaps and prioritize learning objectives"""
+            gap = self.skill_graph.gap(current_skills, target_role)
+            if gap:
+                prompt = grounded_prompt(
+                    "Prioritize the missing skills into quick wins, foundations and advanced development, with validation ideas.",
+                    f"Current skills: {current_skills}; target role: {target_role}", gap_facts(gap)
+                )
+                return self.cascade.invoke("skill_gap_analyzer", prompt)
+            
             prompt = f"""
             Current Skills: {current_skills}
             Target Role: {target_role}
@@ -189,8 +220,7 @@ class LearningAgentLangChain:
             
             Provide actionable gap analysis with clear priorities.
             """
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content
+            return self.cascade.invoke("skill_gap_analyzer", prompt)
         
         def learning_progress_tracker(learning_context: str) -> str:
             """Create tracking system for learning progress and accountability"""
@@ -243,8 +273,7 @@ class LearningAgentLangChain:
             
             Provide actionable tracking framework with specific tools.
             """
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content
+            return self.cascade.invoke("learning_progress_tracker", prompt)
         
         return [
             Tool(
@@ -315,7 +344,7 @@ class LearningAgentLangChain:
             agent=agent,
             tools=self.tools,
             memory=self.memory,
-            verbose=True,
+            verbose=False,
             handle_parsing_errors=True,
             max_iterations=3
         )
@@ -338,8 +367,10 @@ class LearningAgentLangChain:
             enhanced_query = f"Suggest the best learning strategy, resources, and pathway for mastering: {topic}"
         
         try:
-            response = self.agent_executor.invoke({"input": enhanced_query})
-            return response["output"]
+            return get_breaker("agent:learning").call(
+                lambda: invoke_agent(self.agent_executor, {"input": enhanced_query}, agent="learning"),
+                neutral_errors=(InsufficientTimeBudget,)
+            )
         
         except Exception as e:
             # Fallback to direct LLM call
@@ -360,18 +391,41 @@ class LearningAgentLangChain:
             except Exception as fallback_error:
                 return f"I apologize, but I'm experiencing technical difficulties. Please try again. Error: {str(fallback_error)}"
 
+def sequence_resources(topic: str, resources: List[Dict[str, Any]], context: Optional[Dict[str, Any]] = None) -> str:
+    """One LLM call that orders catalog resources into a pathway; the ranked list if that fails"""
+    prompt = pathway_prompt(topic, resources, context)
+    try:
+        if LANGCHAIN_AVAILABLE:
+            return ModelCascade("learning-resources").invoke("learning_pathway_architect", prompt)
+        from utils.openai_helper import agentic_completion
+        return agentic_completion("You are an expert AI learning advisor.", prompt)["content"]
+    except Exception as e:
+        log.warning("resources.sequence_failed", error=e)
+        return format_resources(resources)
+
 # Backward compatible function
-def get_learning_resources(topic: str, context: Optional[Dict[str, Any]] = None) -> str:
+def get_learning_resources(topic: str, context: Optional[Dict[str, Any]] = None,
+                           resources: Optional[List[Dict[str, Any]]] = None) -> str:
     """
     Enhanced learning resource discovery with LangChain capabilities
     Backward compatible with existing code
+    
+    Topics the resource catalog covers skip the agent: the catalog ranks the
+    resources and the LLM only sequences them. `resources` lets callers that
+    already searched the catalog pass their results in.
     """
-    if LANGCHAIN_AVAILABLE:
+    if resources is None:
+        resources = get_resource_catalog().search(topic)
+    if resources:
+        return sequence_resources(topic, resources, context)
+    
+    # While the agent's breaker is open, go straight to the cheap completion
+    if LANGCHAIN_AVAILABLE and not get_breaker("agent:learning").is_open:
         try:
             agent = LearningAgentLangChain()
             return agent.get_learning_resources(topic, context)
         except Exception as e:
-            print(f"[INFO] LangChain agent failed, falling back to simple completion: {e}")
+            log.info("agent.fallback", agent="learning", error=e)
     
     # Original implementation as fallback
     from utils.openai_helper import agentic_completion
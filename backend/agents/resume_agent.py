@@ -4,10 +4,17 @@ Enhanced Resume Agent using LangChain Framework
 Advanced resume optimization with specialized tools and analysis
 """
 
-import os
 from typing import List, Dict, Any, Optional
+from utils.llm_client import create_chat_model
+from utils.deadline import invoke_agent, InsufficientTimeBudget
+from utils.circuit_breaker import get_breaker
+from utils.model_cascade import ModelCascade
+from utils.metrics import instrument_tools
+from utils.structured_logging import get_logger
+from utils.knowledge_base import grounded_prompt
+from utils.skill_graph import get_skill_graph, gap_facts
+from utils.resume_analyzer import get_resume_analyzer, resume_hints, ats_report
 try:
-    from langchain_openai import ChatOpenAI
     from langchain.agents import AgentExecutor, create_openai_functions_agent
     from langchain.tools import Tool
     from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
@@ -18,6 +25,8 @@ except ImportError:
     LANGCHAIN_AVAILABLE = False
     from utils.openai_helper import agentic_completion
 
+log = get_logger("agents.resume")
+
 class ResumeAgentLangChain:
     """Enhanced Resume Agent using LangChain framework"""
     
@@ -25,19 +34,25 @@ class ResumeAgentLangChain:
         if not LANGCHAIN_AVAILABLE:
             raise ImportError("LangChain not installed. Install with: pip install langchain langchain-openai")
         
-        self.llm = ChatOpenAI(
+        self.llm = create_chat_model(
             model="gpt-3.5-turbo",
-            temperature=0.7,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
+            temperature=0.7
         )
         
+        # Tool prompts go through the model cascade (cheap tier first)
+        self.cascade = ModelCascade("generate-resume")
+        
+        # Role skill requirements and gaps come from the skill graph
+        self.skill_graph = get_skill_graph()
+        self.analyzer = get_resume_analyzer()
+        
         self.memory = ConversationBufferWindowMemory(
             memory_key="chat_history",
             return_messages=True,
             k=3
         )
         
-        self.tools = self._create_resume_tools()
+        self.tools = instrument_tools(self._create_resume_tools())
         self.agent_executor = self._create_agent()
     
     def _create_resume_tools(self) -> List[Tool]:
@@ -45,6 +60,17 @@ class ResumeAgentLangChain:
         
         def ats_optimizer(content: str) -> str:
             """Optimize content for Applicant Tracking Systems (ATS)"""
+            analysis = self.analyzer.analyze(content)
+            if analysis["bullet_count"] and not analysis["issues"]:
+                return ats_report(analysis)
+            if analysis["bullet_count"]:
+                prompt = grounded_prompt(
+                    "As an ATS optimization expert, fix each issue found by the local checks below and rewrite "
+                    "the affected lines; do not repeat checks that already pass.",
+                    content, resume_hints(analysis)
+                )
+                return self.cascade.invoke("ats_optimizer", prompt)
+            
             prompt = f"""
             As an ATS optimization expert, analyze and improve this resume content: {content}
             
@@ -76,11 +102,23 @@ class ResumeAgentLangChain:
             
             Provide specific, actionable improvements.
             """
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content
+            return self.cascade.invoke("ats_optimizer", prompt)
         
         def achievement_quantifier(experience_text: str) -> str:
             """Transform experience into quantified, achievement-focused bullet points"""
+            analysis = self.analyzer.analyze(experience_text)
+            if analysis["bullet_count"] and not analysis["unquantified_bullets"] and not analysis["weak_bullets"] \
+                    and analysis["action_verb_bullets"] == analysis["bullet_count"]:
+                return (f"All {analysis['bullet_count']} bullets already open with action verbs "
+                        f"({', '.join(analysis['action_verbs_used'])}) and include measurable results; no rewrite needed.")
+            if analysis["bullet_count"]:
+                prompt = grounded_prompt(
+                    "Rewrite only the bullets flagged below using the STAR method: add specific numbers, scope or "
+                    "outcomes (mark estimates for the candidate to confirm) and open each with a strong action verb.",
+                    experience_text, resume_hints(analysis)
+                )
+                return self.cascade.invoke("achievement_quantifier", prompt)
+            
             prompt = f"""
             Transform this experience into powerful, quantified resume bullets: {experience_text}
             
@@ -112,11 +150,19 @@ class ResumeAgentLangChain:
             
             Generate 3-5 powerful bullet points that showcase measurable achievements.
             """
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content
+            return self.cascade.invoke("achievement_quantifier", prompt)
         
         def skills_matrix_builder(role_target: str, current_skills: str) -> str:
             """Build comprehensive skills matrix aligned with target role"""
+            gap = self.skill_graph.gap(current_skills, role_target)
+            if gap:
+                prompt = grounded_prompt(
+                    "Turn this skill gap into a resume skills matrix: group skills by category, "
+                    "suggest proficiency indicators and how to present transferable skills.",
+                    f"Target role: {role_target}; current skills: {current_skills}", gap_facts(gap)
+                )
+                return self.cascade.invoke("skills_matrix_builder", prompt)
+            
             prompt = f"""
             Target Role: {role_target}
             Current Skills: {current_skills}
@@ -158,8 +204,7 @@ class ResumeAgentLangChain:
             
             Provide a structured skills matrix with clear recommendations.
             """
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content
+            return self.cascade.invoke("skills_matrix_builder", prompt)
         
         def resume_section_optimizer(section_content: str, section_type: str) -> str:
             """Optimize specific resume sections with targeted improvements"""
@@ -201,8 +246,7 @@ class ResumeAgentLangChain:
             
             Provide specific, actionable improvements for the {section_type} section.
             """
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content
+            return self.cascade.invoke("resume_section_optimizer", prompt)
         
         return [
             Tool(
@@ -273,7 +317,7 @@ class ResumeAgentLangChain:
             agent=agent,
             tools=self.tools,
             memory=self.memory,
-            verbose=True,
+            verbose=False,
             handle_parsing_errors=True,
             max_iterations=3
         )
@@ -296,8 +340,10 @@ class ResumeAgentLangChain:
             enhanced_query = f"Generate strong, achievement-focused resume bullet points for this experience: {experience}"
         
         try:
-            response = self.agent_executor.invoke({"input": enhanced_query})
-            return response["output"]
+            return get_breaker("agent:resume").call(
+                lambda: invoke_agent(self.agent_executor, {"input": enhanced_query}, agent="resume"),
+                neutral_errors=(InsufficientTimeBudget,)
+            )
         
         except Exception as e:
             # Fallback to direct LLM call
@@ -324,12 +370,13 @@ def generate_resume_bullets(experience: str, context: Optional[Dict[str, Any]] =
     Enhanced resume bullet generation with LangChain capabilities
     Backward compatible with existing code
     """
-    if LANGCHAIN_AVAILABLE:
+    # While the agent's breaker is open, go straight to the cheap completion
+    if LANGCHAIN_AVAILABLE and not get_breaker("agent:resume").is_open:
         try:
             agent = ResumeAgentLangChain()
             return agent.generate_resume_bullets(experience, context)
         except Exception as e:
-            print(f"[INFO] LangChain agent failed, falling back to simple completion: {e}")
+            log.info("agent.fallback", agent="resume", error=e)
     
     # Original implementation as fallback
     from utils.openai_helper import agentic_completion
@@ -1,38 +1,88 @@
 from flask_cors import CORS
-from flask import Flask, request, jsonify, session, redirect, url_for
+from flask import Flask, Response, g, request, jsonify, session, redirect, url_for
 from dotenv import load_dotenv
 from agents.career_agent import get_career_advice
 from agents.interview_agent import get_interview_questions
 from agents.learning_agent import get_learning_resources
 from agents.resume_agent import generate_resume_bullets
 from utils.openai_helper import setup_openai
+from utils.circuit_breaker import breaker_states
+from utils.model_cascade import cascade_report
+from utils.knowledge_base import get_knowledge_base, set_knowledge_base
+from utils.skill_graph import get_skill_graph
+from utils.resource_catalog import get_resource_catalog, format_resources
+from utils.question_bank import get_question_bank, set_question_bank
+from utils.analytics_store import get_analytics_store, set_analytics_store
+from utils.rate_limiter import set_upstream_limiter
+from utils.profiler import ProfilerBusy, get_profiler
+from utils.structured_logging import configure_logging, get_logger
+from utils.agent_pipeline import AgentEndpoint, create_pipeline
+from utils.request_validation import InputValidator, MAX_REQUEST_BYTES
+from utils.admission import ADMISSION_ENABLED, AdmissionController
+from utils.static_assets import FRONTEND_DIR, get_static_assets
+from utils.compression import init_compression
+from utils.serialization import SerializerJSONProvider
+from utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, HTTP_REQUEST_SECONDS, render as render_metrics
 
-from flask import send_from_directory
 import os
-import json
 from datetime import datetime
 import time
-import hashlib
 from functools import wraps
+import hmac
 
-print("[DEBUG] Starting Flask app...")
 load_dotenv()
-print("[DEBUG] Loaded environment variables.")
+log = get_logger("app")
 setup_openai()
-print("[DEBUG] OpenAI setup complete.")
+log.debug("app.openai_ready")
+
+def warm_up():
+    """Build local data and import agent code before serving
+
+    Under a pre-forking server this runs once in the master, so workers
+    start with the indexes and agent modules already in (shared) memory.
+    """
+    get_knowledge_base()
+    get_skill_graph()
+    get_resource_catalog()
+    get_question_bank()
+    get_analytics_store()
+    get_static_assets()
+    from agents.career_agent import CareerAgentLangChain
+    from agents.interview_agent import InterviewAgentLangChain
+    from agents.learning_agent import LearningAgentLangChain
+    from agents.resume_agent import ResumeAgentLangChain
+    for agent_class in (CareerAgentLangChain, InterviewAgentLangChain, LearningAgentLangChain, ResumeAgentLangChain):
+        try:
+            agent_class()
+        except Exception as e:
+            log.warning("app.warm_up_failed", agent=agent_class.__name__, error=e)
+
+def after_fork(workers=1):
+    """Per-worker setup: fresh SQLite connections and this worker's share of the upstream rate, upstream concurrency and agent slots"""
+    set_knowledge_base(None)
+    set_question_bank(None)
+    set_analytics_store(None)
+    workers = max(workers, 1)
+    requests_per_minute = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "3000"))
+    os.environ["LLM_REQUESTS_PER_MINUTE"] = str(requests_per_minute / workers)
+    # The limiter's concurrency is per process too: split the starting value and the adaptive ceiling
+    for name, default in (("LLM_CONCURRENCY", "8"), ("LLM_MAX_CONCURRENCY", "32")):
+        os.environ[name] = str(max(int(os.getenv(name, default)) // workers, 1))
+    set_upstream_limiter(None)
+    if AGENT_PIPELINE.admission:
+        AGENT_PIPELINE.admission.set_workers(workers)
+    configure_logging()
+
+warm_up()
 
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)
+app.json = SerializerJSONProvider(app)
 app.secret_key = os.getenv("FLASK_SECRET_KEY", "your-secret-key-change-this")  # Change this in production
-print("[DEBUG] Flask app initialized.")
+app.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_BYTES  # larger bodies get a 413 before they are read
 
-FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../frontend"))
-print(f"[DEBUG] Serving frontend from: {FRONTEND_DIR}")
-
-# Initialize conversation history storage
-CONVERSATION_HISTORY = []
-MODEL_EVAL_DATA = []
+log.debug("app.initialized", frontend_dir=FRONTEND_DIR)
 
 # Simple user database (in production, use a real database)
 USERS_DB = {
@@ -62,6 +112,43 @@ def require_login(f):
         return f(*args, **kwargs)
     return decorated_function
 
+@app.errorhandler(413)
+def request_too_large(error):
+    return jsonify({"error": f"Request body is too large (limit {MAX_REQUEST_BYTES} bytes)", "limit": MAX_REQUEST_BYTES}), 413
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    get_profiler().enter_request(f"{request.method} {request.path}")
+
+@app.teardown_request
+def end_request_profile(error=None):
+    get_profiler().exit_request()
+
+@app.after_request
+def record_request_latency(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        # Label by route pattern, not raw path, so series stay bounded
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_REQUEST_SECONDS.labels(route, request.method, str(response.status_code)).observe(time.perf_counter() - started)
+    return response
+
+init_compression(app)
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+def require_admin(f):
+    """Decorator for admin-only routes: an admin session, or the ADMIN_TOKEN bearer token"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        user = USERS_DB.get(session.get('user_id'), {})
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if user.get("role") != "admin" and not (ADMIN_TOKEN and hmac.compare_digest(token, ADMIN_TOKEN)):
+            return jsonify({"error": "Admin access required"}), 403
+        return f(*args, **kwargs)
+    return decorated_function
+
 def get_current_user():
     """Get current logged-in user info - simplified for demo"""
     return {
@@ -70,235 +157,129 @@ def get_current_user():
         "role": "user"
     }
 
-def calculate_response_metrics(user_input, ai_response, processing_time):
-    """Calculate comprehensive response quality metrics"""
-    metrics = {
-        "response_time_seconds": processing_time,
-        "input_length": len(user_input),
-        "output_length": len(ai_response),
-        "input_word_count": len(user_input.split()),
-        "output_word_count": len(ai_response.split()),
-        "compression_ratio": len(ai_response) / max(len(user_input), 1),
-        "words_per_second": len(ai_response.split()) / max(processing_time, 0.1),
-        "has_structured_format": bool(any(marker in ai_response for marker in ['###', '**', '1.', '2.', '•', '-'])),
-        "has_quantified_data": bool(any(char.isdigit() and '%' in ai_response[i:i+10] for i, char in enumerate(ai_response))),
-        "response_completeness_score": min(len(ai_response) / 500, 1.0),  # Normalized completeness
-        "response_id": hashlib.md5(f"{user_input}{ai_response}".encode()).hexdigest()[:8]
-    }
-    return metrics
-
-def evaluate_response_quality(ai_response, endpoint):
-    """Evaluate response quality based on content analysis"""
-    quality_score = 0
-    quality_factors = []
-    
-    # Length appropriateness (20 points)
-    if 200 <= len(ai_response) <= 3000:
-        quality_score += 20
-        quality_factors.append("appropriate_length")
-    elif len(ai_response) > 100:
-        quality_score += 10
-        quality_factors.append("minimal_length")
-    
-    # Structure and formatting (25 points)
-    structure_indicators = ['###', '**', '1.', '2.', '3.', '•', '-', '\n\n']
-    structure_count = sum(1 for indicator in structure_indicators if indicator in ai_response)
-    if structure_count >= 5:
-        quality_score += 25
-        quality_factors.append("well_structured")
-    elif structure_count >= 2:
-        quality_score += 15
-        quality_factors.append("basic_structure")
-    
-    # Specific content quality by endpoint (30 points)
-    if endpoint == "career-advice":
-        career_keywords = ['skill', 'experience', 'growth', 'opportunity', 'market', 'salary', 'trend']
-        keyword_count = sum(1 for keyword in career_keywords if keyword.lower() in ai_response.lower())
-        quality_score += min(keyword_count * 4, 30)
-        if keyword_count >= 5:
-            quality_factors.append("comprehensive_career_advice")
-    
-    elif endpoint == "generate-resume":
-        resume_keywords = ['achieved', 'led', 'managed', 'improved', 'increased', '%', 'result']
-        keyword_count = sum(1 for keyword in resume_keywords if keyword.lower() in ai_response.lower())
-        quality_score += min(keyword_count * 5, 30)
-        if keyword_count >= 4:
-            quality_factors.append("quantified_achievements")
-    
-    elif endpoint == "mock-interview":
-        interview_keywords = ['question', 'behavior', 'technical', 'experience', 'situation', 'challenge']
-        keyword_count = sum(1 for keyword in interview_keywords if keyword.lower() in ai_response.lower())
-        quality_score += min(keyword_count * 5, 30)
-        if keyword_count >= 4:
-            quality_factors.append("comprehensive_interview_prep")
-    
-    elif endpoint == "learning-resources":
-        learning_keywords = ['course', 'book', 'tutorial', 'practice', 'project', 'skill', 'learn']
-        keyword_count = sum(1 for keyword in learning_keywords if keyword.lower() in ai_response.lower())
-        quality_score += min(keyword_count * 4, 30)
-        if keyword_count >= 5:
-            quality_factors.append("diverse_learning_resources")
-    
-    # Actionability (15 points)
-    actionable_indicators = ['step', 'action', 'recommendation', 'should', 'consider', 'try', 'start']
-    actionable_count = sum(1 for indicator in actionable_indicators if indicator.lower() in ai_response.lower())
-    if actionable_count >= 5:
-        quality_score += 15
-        quality_factors.append("highly_actionable")
-    elif actionable_count >= 2:
-        quality_score += 8
-        quality_factors.append("somewhat_actionable")
-    
-    # Professional tone (10 points)
-    professional_indicators = ['professional', 'industry', 'best practice', 'recommend', 'suggest']
-    if any(indicator.lower() in ai_response.lower() for indicator in professional_indicators):
-        quality_score += 10
-        quality_factors.append("professional_tone")
-    
-    return {
-        "quality_score": quality_score,
-        "quality_grade": "A" if quality_score >= 80 else "B" if quality_score >= 60 else "C" if quality_score >= 40 else "D",
-        "quality_factors": quality_factors,
-        "max_possible_score": 100
-    }
+MODEL_INFO = {
+    "framework": "LangChain",
+    "base_model": "gpt-3.5-turbo",
+    "agent_type": "OpenAI Functions Agent",
+    "tools_used": True,
+    "memory_enabled": True
+}
 
-def save_model_evaluation(endpoint, user_input, ai_response, processing_time, metadata=None):
+def save_model_evaluation(evaluation, metadata=None):
     """Save comprehensive model evaluation data"""
-    
-    # Calculate metrics
-    response_metrics = calculate_response_metrics(user_input, ai_response, processing_time)
-    quality_eval = evaluate_response_quality(ai_response, endpoint)
-    
-    eval_entry = {
-        "timestamp": datetime.now().isoformat(),
-        "endpoint": endpoint,
-        "user_input": user_input,
-        "ai_response": ai_response,
-        "processing_time": processing_time,
-        "metrics": response_metrics,
-        "quality_evaluation": quality_eval,
-        "metadata": metadata or {},
-        "model_info": {
-            "framework": "LangChain",
-            "base_model": "gpt-3.5-turbo",
-            "agent_type": "OpenAI Functions Agent",
-            "tools_used": True,
-            "memory_enabled": True
-        }
-    }
-    
-    MODEL_EVAL_DATA.append(eval_entry)
-    
-    # Save to file for persistence
+    # Shared store, so every worker process sees the same evaluations
     try:
-        with open("model_evaluation_data.json", "w") as f:
-            json.dump(MODEL_EVAL_DATA, f, indent=2)
-        print(f"[EVAL] {endpoint} - Quality: {quality_eval['quality_grade']} ({quality_eval['quality_score']}/100) - Time: {processing_time:.2f}s")
+        get_analytics_store().add_evaluation(evaluation.evaluation_entry(metadata, MODEL_INFO))
+        log.info("evaluation.saved", endpoint=evaluation.endpoint, grade=evaluation.quality['quality_grade'],
+                 score=evaluation.quality['quality_score'], seconds=round(evaluation.processing_time, 2))
     except Exception as e:
-        print(f"[WARNING] Could not save evaluation data: {e}")
+        log.warning("evaluation.save_failed", endpoint=evaluation.endpoint, error=e)
 
-def save_conversation(endpoint, user_input, ai_response, metadata=None):
+def save_conversation(evaluation, metadata=None):
     """Save conversation history for analytics and debugging"""
-    conversation_entry = {
-        "timestamp": datetime.now().isoformat(),
-        "endpoint": endpoint,
-        "user_input": user_input,
-        "ai_response": ai_response,
-        "response_length": len(ai_response),
-        "metadata": metadata or {}
-    }
-    
-    CONVERSATION_HISTORY.append(conversation_entry)
-    
-    # Optionally save to file for persistence
     try:
-        with open("conversation_history.json", "w") as f:
-            json.dump(CONVERSATION_HISTORY, f, indent=2)
-        print(f"[DEBUG] Conversation saved: {endpoint} - {len(ai_response)} chars")
+        get_analytics_store().add_conversation(evaluation.conversation_entry(metadata))
+        log.debug("conversation.saved", endpoint=evaluation.endpoint, chars=len(evaluation.ai_response))
     except Exception as e:
-        print(f"[WARNING] Could not save conversation history: {e}")
+        log.warning("conversation.save_failed", endpoint=evaluation.endpoint, error=e)
+
+def persist_response(evaluation, metadata=None):
+    """Pipeline persistence stage: the conversation and its evaluation, from one evaluation"""
+    save_conversation(evaluation, metadata)
+    save_model_evaluation(evaluation, metadata)
 
 @app.route("/conversation-history", methods=["GET"])
 def get_conversation_history():
     """Get conversation history for analytics"""
+    store = get_analytics_store()
     return jsonify({
-        "total_conversations": len(CONVERSATION_HISTORY),
-        "conversations": CONVERSATION_HISTORY[-10:]  # Return last 10 conversations
+        "total_conversations": store.conversation_count(),
+        "conversations": store.recent_conversations(10)  # Return last 10 conversations
     })
 
 @app.route("/model-evaluation", methods=["GET"])
 def get_model_evaluation():
-    """Get comprehensive model evaluation analytics"""
+    """Get comprehensive model evaluation analytics
+
+    Optional ?endpoint= and ?since=<ISO timestamp> narrow the aggregates.
+    """
+    store = get_analytics_store()
+    # Aggregates run as SQL over indexed columns instead of over every record in memory
+    summary = store.evaluation_summary(endpoint=request.args.get("endpoint"), since=request.args.get("since"))
     
-    if not MODEL_EVAL_DATA:
+    if not summary["total_evaluations"]:
         return jsonify({
             "message": "No evaluation data available",
             "total_evaluations": 0
         })
     
-    # Calculate aggregate statistics
-    total_evals = len(MODEL_EVAL_DATA)
-    avg_quality_score = sum(eval_data["quality_evaluation"]["quality_score"] for eval_data in MODEL_EVAL_DATA) / total_evals
-    avg_response_time = sum(eval_data["processing_time"] for eval_data in MODEL_EVAL_DATA) / total_evals
-    avg_response_length = sum(eval_data["metrics"]["output_length"] for eval_data in MODEL_EVAL_DATA) / total_evals
-    
-    # Quality grade distribution
-    grade_distribution = {}
-    for eval_data in MODEL_EVAL_DATA:
-        grade = eval_data["quality_evaluation"]["quality_grade"]
-        grade_distribution[grade] = grade_distribution.get(grade, 0) + 1
-    
-    # Endpoint performance breakdown
-    endpoint_stats = {}
-    for eval_data in MODEL_EVAL_DATA:
-        endpoint = eval_data["endpoint"]
-        if endpoint not in endpoint_stats:
-            endpoint_stats[endpoint] = {
-                "count": 0,
-                "avg_quality": 0,
-                "avg_response_time": 0,
-                "quality_scores": []
-            }
-        
-        endpoint_stats[endpoint]["count"] += 1
-        endpoint_stats[endpoint]["quality_scores"].append(eval_data["quality_evaluation"]["quality_score"])
-    
-    # Calculate averages for each endpoint
-    for endpoint, stats in endpoint_stats.items():
-        stats["avg_quality"] = sum(stats["quality_scores"]) / len(stats["quality_scores"])
-        stats["avg_response_time"] = sum(eval_data["processing_time"] for eval_data in MODEL_EVAL_DATA if eval_data["endpoint"] == endpoint) / stats["count"]
-        del stats["quality_scores"]  # Remove raw scores from response
-    
-    # Recent performance trend (last 10 evaluations)
-    recent_evals = MODEL_EVAL_DATA[-10:]
-    recent_trend = {
-        "avg_quality": sum(eval_data["quality_evaluation"]["quality_score"] for eval_data in recent_evals) / len(recent_evals),
-        "avg_response_time": sum(eval_data["processing_time"] for eval_data in recent_evals) / len(recent_evals)
-    }
-    
     return jsonify({
-        "total_evaluations": total_evals,
+        "total_evaluations": summary["total_evaluations"],
         "overall_statistics": {
-            "average_quality_score": round(avg_quality_score, 2),
-            "average_response_time": round(avg_response_time, 2),
-            "average_response_length": round(avg_response_length, 2),
-            "quality_grade_distribution": grade_distribution
+            "average_quality_score": round(summary["average_quality_score"], 2),
+            "average_response_time": round(summary["average_response_time"], 2),
+            "average_response_length": round(summary["average_response_length"], 2),
+            "quality_grade_distribution": summary["quality_grade_distribution"]
         },
-        "endpoint_performance": endpoint_stats,
-        "recent_trend": recent_trend,
+        "endpoint_performance": summary["endpoint_performance"],
+        "recent_trend": summary["recent_trend"],
         "model_info": {
             "framework": "LangChain with OpenAI Functions Agent",
             "base_model": "gpt-3.5-turbo",
-            "features": ["specialized_tools", "memory_management", "agent_reasoning"]
+            "features": ["specialized_tools", "memory_management", "agent_reasoning", "model_cascade"]
         },
+        "model_cascade": cascade_report(),
         "evaluation_criteria": {
             "quality_factors": ["length_appropriateness", "structure", "content_relevance", "actionability", "professional_tone"],
             "max_quality_score": 100,
             "grade_ranges": {"A": "80-100", "B": "60-79", "C": "40-59", "D": "0-39"}
         },
-        "recent_evaluations": MODEL_EVAL_DATA[-5:]  # Last 5 evaluations
+        "recent_evaluations": store.evaluations(limit=5)  # Last 5 evaluations
     })
 
+@app.route("/circuit-breakers", methods=["GET"])
+def get_circuit_breakers():
+    """Get circuit breaker state for every agent and upstream, for monitoring"""
+    breakers = breaker_states()
+    return jsonify({
+        "open_circuits": [name for name, state in breakers.items() if state["state"] != "closed"],
+        "breakers": breakers
+    })
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Latency histograms, token counts, cache hits and queue depths in Prometheus text format"""
+    return Response(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
+@app.route("/admin/profiler", methods=["GET"])
+@require_admin
+def profiler_status():
+    """Current or last profiling session, with output file paths and top frames"""
+    return jsonify(get_profiler().status())
+
+@app.route("/admin/profiler", methods=["POST"])
+@require_admin
+def start_profiler():
+    """Sample request threads for `seconds`, profiling a `sample_rate` share of requests"""
+    data = request.get_json(silent=True) or {}
+    try:
+        session_info = get_profiler().start(
+            seconds=float(data.get("seconds", 30)),
+            sample_rate=float(data.get("sample_rate", 1.0)),
+            interval=float(data.get("interval_ms", 10)) / 1000
+        )
+    except ProfilerBusy as e:
+        return jsonify({"error": str(e), **get_profiler().status()}), 409
+    except (TypeError, ValueError):
+        return jsonify({"error": "seconds, sample_rate and interval_ms must be numbers"}), 400
+    return jsonify({"started": True, "session": session_info}), 202
+
+@app.route("/admin/profiler", methods=["DELETE"])
+@require_admin
+def stop_profiler():
+    """Stop the running profiling session early and write its output"""
+    return jsonify({"stopped": True, "result": get_profiler().stop()})
+
 @app.route("/feedback", methods=["POST"])
 def submit_feedback():
     """Submit user feedback for model evaluation"""
@@ -307,24 +288,21 @@ def submit_feedback():
     rating = data.get("rating", 0)  # 1-5 scale
     feedback_text = data.get("feedback", "")
     
-    # Find the corresponding evaluation entry
-    for eval_entry in MODEL_EVAL_DATA:
-        if eval_entry["metrics"]["response_id"] == response_id:
-            eval_entry["user_feedback"] = {
-                "rating": rating,
-                "feedback_text": feedback_text,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            # Save updated data
-            try:
-                with open("model_evaluation_data.json", "w") as f:
-                    json.dump(MODEL_EVAL_DATA, f, indent=2)
-                print(f"[FEEDBACK] Response {response_id} rated {rating}/5")
-            except Exception as e:
-                print(f"[WARNING] Could not save feedback: {e}")
-            
+    # Attach it to the corresponding evaluation entry, whichever worker recorded it
+    feedback = {
+        "rating": rating,
+        "feedback_text": feedback_text,
+        "timestamp": datetime.now().isoformat()
+    }
+    try:
+        # The evaluation may still be queued for background persistence
+        AGENT_PIPELINE.persistence.drain()
+        if get_analytics_store().set_feedback(response_id, feedback):
+            log.info("feedback.saved", response_id=response_id, rating=rating)
             return jsonify({"message": "Feedback saved successfully", "response_id": response_id})
+    except Exception as e:
+        log.warning("feedback.save_failed", response_id=response_id, error=e)
+        return jsonify({"error": "Could not save feedback", "response_id": response_id}), 500
     
     return jsonify({"error": "Response ID not found", "response_id": response_id}), 404
 
@@ -383,272 +361,76 @@ def protected_test():
         }
     })
 
-@app.route("/career-advice", methods=["POST"])
-# @require_login  # Temporarily disabled for better UX
-def career_advice():
-    print("[DEBUG] /career-advice endpoint hit")
-    start_time = time.time()
-    
-    data = request.get_json()
-    print(f"[DEBUG] Request data: {data}")
-    query = data.get("query", "")
-    print(f"[DEBUG] Query: {query}")
-    
-    # Get enhanced career advice
-    result = get_career_advice(query)
-    processing_time = time.time() - start_time
-    print(f"[DEBUG] Result: {result}")
-    
-    # Save conversation history with user info
-    user = get_current_user()
-    save_conversation(
-        endpoint="career-advice",
-        user_input=query,
-        ai_response=result,
-        metadata={
-            "user_context": data.get("context", {}),
-            "user_id": session.get('user_id'),
-            "user_name": user['name'] if user else None
-        }
-    )
-    
-    # Save model evaluation data with user info
-    save_model_evaluation(
-        endpoint="career-advice",
-        user_input=query,
-        ai_response=result,
-        processing_time=processing_time,
-        metadata={
-            "user_context": data.get("context", {}),
-            "user_id": session.get('user_id'),
-            "user_name": user['name'] if user else None
-        }
-    )
-    
-    # Calculate response metrics for immediate feedback
-    metrics = calculate_response_metrics(query, result, processing_time)
-    quality_eval = evaluate_response_quality(result, "career-advice")
-    
-    return jsonify({
-        "advice": result,
-        "prompt": query,
-        "timestamp": datetime.now().isoformat(),
-        "response_length": len(result),
-        "evaluation": {
-            "quality_score": quality_eval["quality_score"],
-            "quality_grade": quality_eval["quality_grade"],
-            "response_time": round(processing_time, 2),
-            "response_id": metrics["response_id"]
-        }
-    })
-
-@app.route("/generate-resume", methods=["POST"])
-# @require_login  # Temporarily disabled for better UX
-def generate_resume():
-    print("[DEBUG] /generate-resume endpoint hit")
-    start_time = time.time()
-    
-    data = request.get_json()
-    print(f"[DEBUG] Request data: {data}")
-    experience = data.get("experience", "")
-    print(f"[DEBUG] Experience: {experience}")
-    
-    # Get enhanced resume bullets
-    result = generate_resume_bullets(experience)
-    processing_time = time.time() - start_time
-    print(f"[DEBUG] Result: {result}")
-    
-    # Save conversation history
-    save_conversation(
-        endpoint="generate-resume",
-        user_input=experience,
-        ai_response=result,
-        metadata={"user_context": data.get("context", {})}
-    )
-    
-    # Save model evaluation data
-    save_model_evaluation(
-        endpoint="generate-resume",
-        user_input=experience,
-        ai_response=result,
-        processing_time=processing_time,
-        metadata={"user_context": data.get("context", {})}
-    )
-    
-    # Calculate response metrics for immediate feedback
-    metrics = calculate_response_metrics(experience, result, processing_time)
-    quality_eval = evaluate_response_quality(result, "generate-resume")
-    
-    return jsonify({
-        "resume": result,
-        "prompt": experience,
-        "timestamp": datetime.now().isoformat(),
-        "response_length": len(result),
-        "evaluation": {
-            "quality_score": quality_eval["quality_score"],
-            "quality_grade": quality_eval["quality_grade"],
-            "response_time": round(processing_time, 2),
-            "response_id": metrics["response_id"]
-        }
-    })
-
-@app.route("/mock-interview", methods=["POST"])
-# @require_login  # Temporarily disabled for better UX
-def mock_interview():
-    print("[DEBUG] /mock-interview endpoint hit")
-    start_time = time.time()
-    
-    data = request.get_json()
-    print(f"[DEBUG] Request data: {data}")
-    role = data.get("role", "")
-    print(f"[DEBUG] Role: {role}")
-    
-    # Get enhanced interview questions
-    result = get_interview_questions(role)
-    processing_time = time.time() - start_time
-    print(f"[DEBUG] Result: {result}")
-    
-    # Save conversation history
-    save_conversation(
-        endpoint="mock-interview",
-        user_input=role,
-        ai_response=result,
-        metadata={"user_context": data.get("context", {})}
-    )
-    
-    # Save model evaluation data
-    save_model_evaluation(
-        endpoint="mock-interview",
-        user_input=role,
-        ai_response=result,
-        processing_time=processing_time,
-        metadata={"user_context": data.get("context", {})}
-    )
-    
-    # Calculate response metrics for immediate feedback
-    metrics = calculate_response_metrics(role, result, processing_time)
-    quality_eval = evaluate_response_quality(result, "mock-interview")
-    
-    return jsonify({
-        "questions": result,
-        "prompt": role,
-        "timestamp": datetime.now().isoformat(),
-        "response_length": len(result),
-        "evaluation": {
-            "quality_score": quality_eval["quality_score"],
-            "quality_grade": quality_eval["quality_grade"],
-            "response_time": round(processing_time, 2),
-            "response_id": metrics["response_id"]
-        }
-    })
-
-@app.route("/learning-resources", methods=["POST"])
-# @require_login  # Temporarily disabled for better UX
-def learning_resources():
-    print("[DEBUG] /learning-resources endpoint hit")
-    start_time = time.time()
-    
-    data = request.get_json()
-    print(f"[DEBUG] Request data: {data}")
-    topic = data.get("topic", "")
-    print(f"[DEBUG] Topic: {topic}")
-    
-    # Get enhanced learning resources
-    result = get_learning_resources(topic)
-    processing_time = time.time() - start_time
-    print(f"[DEBUG] Result: {result}")
-    
-    # Save conversation history
-    save_conversation(
-        endpoint="learning-resources",
-        user_input=topic,
-        ai_response=result,
-        metadata={"user_context": data.get("context", {})}
-    )
-    
-    # Save model evaluation data
-    save_model_evaluation(
-        endpoint="learning-resources",
-        user_input=topic,
-        ai_response=result,
-        processing_time=processing_time,
-        metadata={"user_context": data.get("context", {})}
-    )
-    
-    # Calculate response metrics for immediate feedback
-    metrics = calculate_response_metrics(topic, result, processing_time)
-    quality_eval = evaluate_response_quality(result, "learning-resources")
-    
-    return jsonify({
-        "resources": result,
-        "prompt": topic,
-        "timestamp": datetime.now().isoformat(),
-        "response_length": len(result),
-        "evaluation": {
-            "quality_score": quality_eval["quality_score"],
-            "quality_grade": quality_eval["quality_grade"],
-            "response_time": round(processing_time, 2),
-            "response_id": metrics["response_id"]
-        }
-    })
-
-
-
+# Agent endpoints: every route runs through the same request pipeline
+AGENT_PIPELINE = create_pipeline(persist_response, admission=AdmissionController.from_env() if ADMISSION_ENABLED else None)
+AGENT_PIPELINE.add_validator(InputValidator())
 
+def career_metadata(data):
+    user = get_current_user()
+    return {
+        "user_context": data.get("context", {}),
+        "user_id": session.get('user_id'),
+        "user_name": user['name'] if user else None
+    }
 
+def rank_resources(topic, data):
+    # Rank catalog resources locally; the LLM only sequences them into a pathway
+    return {"ranked_resources": get_resource_catalog().search(topic, level=data.get("level"), resource_format=data.get("format"))}
+
+def dispatch_learning_resources(topic, data, extras):
+    ranked_resources = extras["ranked_resources"]
+    if ranked_resources and not data.get("sequence", True):
+        return format_resources(ranked_resources)
+    return get_learning_resources(topic, resources=ranked_resources)
+
+for agent_endpoint in (
+    AgentEndpoint("career-advice", "query", "advice", lambda query, data, extras: get_career_advice(query),
+                  metadata=career_metadata),
+    AgentEndpoint("generate-resume", "experience", "resume", lambda experience, data, extras: generate_resume_bullets(experience)),
+    AgentEndpoint("mock-interview", "role", "questions", lambda role, data, extras: get_interview_questions(role)),
+    AgentEndpoint("learning-resources", "topic", "resources", dispatch_learning_resources,
+                  prepare=rank_resources, cache_fields=("level", "format", "sequence"), cost=3)
+):
+    AGENT_PIPELINE.register(app, agent_endpoint)
+
+# Frontend pages and assets, served from memory with ETags and precompressed variants
 @app.route("/")
 def serve_home():
-    print(f"[DEBUG] FRONTEND_DIR: {FRONTEND_DIR}")
-    print("[DEBUG] Serving index.html")
-    return send_from_directory(FRONTEND_DIR, "index.html")
+    return get_static_assets().serve("index.html")
 
 @app.route("/career.html")
 def serve_career():
-    print(f"[DEBUG] FRONTEND_DIR: {FRONTEND_DIR}")
-    print("[DEBUG] Serving career.html")
-    return send_from_directory(FRONTEND_DIR, "career.html")
+    return get_static_assets().serve("career.html")
 
 @app.route("/resume.html")
 def serve_resume():
-    print(f"[DEBUG] FRONTEND_DIR: {FRONTEND_DIR}")
-    print("[DEBUG] Serving resume.html")
-    return send_from_directory(FRONTEND_DIR, "resume.html")
+    return get_static_assets().serve("resume.html")
 
 @app.route("/interview.html")
 def serve_interview():
-    print(f"[DEBUG] FRONTEND_DIR: {FRONTEND_DIR}")
-    print("[DEBUG] Serving interview.html")
-    return send_from_directory(FRONTEND_DIR, "interview.html")
+    return get_static_assets().serve("interview.html")
 
 @app.route("/learning.html")
 def serve_learning():
-    print(f"[DEBUG] FRONTEND_DIR: {FRONTEND_DIR}")
-    print("[DEBUG] Serving learning.html")
-    return send_from_directory(FRONTEND_DIR, "learning.html")
+    return get_static_assets().serve("learning.html")
 
 @app.route("/index.html")
 def serve_ind():
-    print(f"[DEBUG] FRONTEND_DIR: {FRONTEND_DIR}")
-    print("[DEBUG] Serving index.html")
-    return send_from_directory(FRONTEND_DIR, "index.html")
+    return get_static_assets().serve("index.html")
 
-# Serve static files (CSS, JS)
 @app.route("/static/<path:filename>")
 def serve_static_files(filename):
-    static_dir = os.path.join(os.path.dirname(__file__), "static")
-    return send_from_directory(static_dir, filename)
+    return get_static_assets().serve(f"static/{filename}")
 
 @app.route("/css/<path:filename>")
 def serve_css(filename):
-    css_dir = os.path.join(FRONTEND_DIR, "css")
-    return send_from_directory(css_dir, filename)
+    return get_static_assets().serve(f"css/{filename}")
 
 @app.route("/js/<path:filename>")
 def serve_js(filename):
-    js_dir = os.path.join(FRONTEND_DIR, "js")
-    return send_from_directory(js_dir, filename)
+    return get_static_assets().serve(f"js/{filename}")
 
 
 if __name__ == "__main__":
-    print("[DEBUG] Running Flask app...")
+    log.info("app.run", port=5002)
     app.run(debug=True, port=5002)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Replay Benchmark for the Agent Endpoints
+Records live agent sessions once, then replays them offline to profile
+orchestration overhead, tool fan-out and persistence cost between versions
+
+Usage:
+    python benchmark_replay.py record --session session.jsonl
+    python benchmark_replay.py run --session session.jsonl --iterations 5 --output results.json
+    python benchmark_replay.py run --session session.jsonl --compare results.json
+    JSON_BACKEND=json python benchmark_replay.py run --session session.jsonl
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+
+BENCHMARK_REQUESTS = [
+    ("/career-advice", {"query": "Should I transition from frontend to AI/ML development?"}),
+    ("/generate-resume", {"experience": "Led a team of 5 developers to build a React application that increased user engagement by 40%"}),
+    ("/mock-interview", {"role": "Senior Data Scientist"}),
+    ("/learning-resources", {"topic": "React advanced patterns"})
+]
+
+
+def load_app(mode, session_file, latency):
+    """Import the Flask app with the session recorder configured for this run"""
+    os.environ["LLM_SESSION_MODE"] = mode
+    os.environ["LLM_SESSION_FILE"] = os.path.abspath(session_file)
+    os.environ["LLM_REPLAY_LATENCY"] = latency
+    # Every iteration should run the agents, not the response cache, and never be throttled
+    os.environ["AGENT_RESPONSE_CACHE_TTL"] = "0"
+    os.environ["ADMISSION_ENABLED"] = "false"
+
+    import app as app_module
+    return app_module
+
+
+def instrument_persistence(app_module, timings):
+    """Wrap the save_* helpers so their cost is reported separately"""
+    for name in ("save_conversation", "save_model_evaluation"):
+        original = getattr(app_module, name)
+
+        def timed(*args, _original=original, _name=name, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return _original(*args, **kwargs)
+            finally:
+                timings.setdefault(_name, []).append(time.perf_counter() - start_time)
+
+        setattr(app_module, name, timed)
+
+
+def instrument_serialization(app_module, timings):
+    """Wrap the storage and response serializers so JSON encode/decode time is reported separately"""
+    from utils.serialization import get_serializer
+
+    for serializer in {id(s): s for s in (get_serializer(), app_module.app.json.serializer)}.values():
+        for name in ("dumps", "dumps_text", "loads"):
+            original = getattr(serializer, name)
+
+            def timed(*args, _original=original, **kwargs):
+                start_time = time.perf_counter()
+                try:
+                    return _original(*args, **kwargs)
+                finally:
+                    timings.append(time.perf_counter() - start_time)
+
+            setattr(serializer, name, timed)
+
+
+def compare_serializers(records, repeat=20):
+    """Encode and decode `records` with every installed JSON backend, and with the old indent=2 output"""
+    from utils.serialization import SERIALIZERS, create_serializer
+
+    codecs = {name: create_serializer(name) for name in SERIALIZERS}
+    results = {}
+    for name, codec in [("json indent=2", None)] + list(codecs.items()):
+        encode = (lambda: json.dumps(records, indent=2, default=str)) if codec is None else (lambda: codec.dumps(records))
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            encoded = encode()
+        encode_seconds = (time.perf_counter() - start_time) / repeat
+        decode = json.loads if codec is None else codec.loads
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            decode(encoded)
+        results[name] = {
+            "records": len(records),
+            "bytes": len(encoded),
+            "encode_seconds": encode_seconds,
+            "decode_seconds": (time.perf_counter() - start_time) / repeat
+        }
+    return results
+
+
+def run_requests(app_module, iterations):
+    """Send every benchmark request `iterations` times and collect per-endpoint timings"""
+    from utils.session_replay import get_session_recorder
+
+    recorder = get_session_recorder()
+    client = app_module.app.test_client()
+    persistence = {}
+    instrument_persistence(app_module, persistence)
+    serialization = []
+    instrument_serialization(app_module, serialization)
+    persist_async = app_module.AGENT_PIPELINE.persistence.enabled
+
+    results = {}
+    for endpoint, payload in BENCHMARK_REQUESTS:
+        durations = []
+        upstream_calls = []
+        persistence_times = []
+        serialization_times = []
+
+        for _ in range(iterations):
+            recorder.rewind()
+            persistence.clear()
+            serialization.clear()
+            calls_before = recorder.stats["replayed"] + recorder.stats["recorded"]
+
+            start_time = time.perf_counter()
+            response = client.post(endpoint, json=payload)
+            durations.append(time.perf_counter() - start_time)
+            app_module.AGENT_PIPELINE.persistence.drain()
+
+            if response.status_code != 200:
+                raise RuntimeError(f"{endpoint} returned HTTP {response.status_code}")
+
+            upstream_calls.append(recorder.stats["replayed"] + recorder.stats["recorded"] - calls_before)
+            persistence_times.append(sum(sum(values) for values in persistence.values()))
+            serialization_times.append(sum(serialization))
+
+        results[endpoint] = {
+            "iterations": iterations,
+            "mean_seconds": statistics.mean(durations),
+            "p50_seconds": statistics.median(durations),
+            "max_seconds": max(durations),
+            "upstream_calls_per_request": statistics.mean(upstream_calls),
+            "persistence_seconds": statistics.mean(persistence_times),
+            # JSON encode/decode for the response and the stored rows (also counted in persistence)
+            "serialization_seconds": statistics.mean(serialization_times),
+            # Persistence runs after the response unless AGENT_PERSIST_ASYNC is off
+            "orchestration_seconds": statistics.mean(durations) - (0 if persist_async else statistics.mean(persistence_times))
+        }
+
+    from utils.analytics_store import get_analytics_store
+    results["serialization_backends"] = compare_serializers(get_analytics_store().evaluations(limit=100))
+    return results
+
+
+def print_results(results, baseline=None):
+    print("=" * 86)
+    print(f"{'Endpoint':<22}{'mean ms':>10}{'p50 ms':>10}{'calls':>8}{'persist ms':>12}{'json ms':>8}{'orch ms':>10}{'Δ mean':>8}")
+    print("-" * 86)
+    for endpoint, _ in BENCHMARK_REQUESTS:
+        stats = results[endpoint]
+        delta = ""
+        if baseline and endpoint in baseline:
+            previous = baseline[endpoint]["mean_seconds"]
+            delta = f"{(stats['mean_seconds'] - previous) / max(previous, 1e-9) * 100:+.0f}%"
+        print(
+            f"{endpoint:<22}"
+            f"{stats['mean_seconds'] * 1000:>10.1f}"
+            f"{stats['p50_seconds'] * 1000:>10.1f}"
+            f"{stats['upstream_calls_per_request']:>8.1f}"
+            f"{stats['persistence_seconds'] * 1000:>12.2f}"
+            f"{stats.get('serialization_seconds', 0) * 1000:>8.2f}"
+            f"{stats['orchestration_seconds'] * 1000:>10.1f}"
+            f"{delta:>8}"
+        )
+    print("=" * 86)
+
+    backends = results.get("serialization_backends")
+    if backends:
+        records = next(iter(backends.values()))["records"]
+        print(f"JSON backends, {records} evaluation records")
+        print(f"{'Backend':<22}{'KB':>10}{'encode ms':>12}{'decode ms':>12}")
+        for name, stats in backends.items():
+            print(f"{name:<22}{stats['bytes'] / 1024:>10.1f}{stats['encode_seconds'] * 1000:>12.3f}"
+                  f"{stats['decode_seconds'] * 1000:>12.3f}")
+        print("=" * 86)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay agent sessions for offline benchmarking")
+    parser.add_argument("command", choices=["record", "run"])
+    parser.add_argument("--session", default="llm_session.jsonl", help="Recorded session file")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--latency", default="none", help="Replay latency: none, original or a scale factor")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    args = parser.parse_args()
+
+    session_file = os.path.abspath(args.session)
+    output_file = os.path.abspath(args.output) if args.output else None
+    compare_file = os.path.abspath(args.compare) if args.compare else None
+    if args.command == "record" and os.path.exists(session_file):
+        os.remove(session_file)
+
+    mode = "record" if args.command == "record" else "replay"
+    iterations = 1 if args.command == "record" else args.iterations
+
+    # Persistence writes go to a scratch directory so the tracked data files stay untouched
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        os.chdir(scratch_dir)
+        try:
+            app_module = load_app(mode, session_file, args.latency)
+            results = run_requests(app_module, iterations)
+        finally:
+            os.chdir(BACKEND_DIR)
+
+    baseline = None
+    if compare_file:
+        with open(compare_file, "r") as f:
+            baseline = json.load(f)
+
+    print_results(results, baseline)
+
+    if output_file:
+        with open(output_file, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
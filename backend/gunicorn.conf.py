@@ -0,0 +1,34 @@
+"""
+Gunicorn Configuration for Production Serving
+Pre-forks N workers from a warmed-up master; run from the backend directory:
+
+    gunicorn -c gunicorn.conf.py app:app
+"""
+
+import os
+import multiprocessing
+
+bind = os.getenv("BIND", "0.0.0.0:5002")
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+# Agent requests mostly wait on the LLM, so each worker also runs a few threads
+worker_class = "gthread"
+threads = int(os.getenv("WEB_THREADS", "4"))
+# Leave room past the agent deadline for evaluation and persistence
+timeout = int(float(os.getenv("AGENT_REQUEST_DEADLINE", "45"))) + 15
+graceful_timeout = 30
+keepalive = 5
+
+# Import the app (and run its warm-up) once in the master before forking
+preload_app = True
+
+
+def post_fork(server, worker):
+    import app
+    app.after_fork(server.cfg.workers)
+    server.log.info(f"Worker {worker.pid} ready")
+
+
+def worker_exit(server, worker):
+    import app
+    app.AGENT_PIPELINE.persistence.drain()
+    app.get_analytics_store().flush()
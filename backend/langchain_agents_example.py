@@ -14,10 +14,9 @@ from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.schema import HumanMessage, SystemMessage
 from langchain.memory import ConversationBufferWindowMemory
-from langchain.embeddings import OpenAIEmbeddings
-from langchain.vectorstores import FAISS
 from langchain.document_loaders import TextLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from utils.model_cascade import ModelCascade
+from utils.vector_index import get_resume_matcher
 
 
 class CareerAgentLangChain:
@@ -369,43 +368,44 @@ class AdvancedCareerFeatures:
     """Additional advanced features using LangChain"""
     
     def __init__(self):
-        self.llm = ChatOpenAI(model="gpt-4", temperature=0.7)
+        # Cheap model first, escalating to gpt-4 only when the answer falls short
+        self.cascade = ModelCascade("career-advice")
         
     def career_document_analysis(self, resume_text: str, job_description: str) -> str:
         """Analyze resume against specific job descriptions"""
         
-        # Create embeddings for semantic similarity
-        embeddings = OpenAIEmbeddings()
+        # Score the match from chunk embeddings; chunks seen before reuse their stored vectors
+        match = get_resume_matcher().analyze(resume_text, job_description)
         
-        # Split documents for analysis
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200
+        alignments = "\n".join(
+            f"- ({item['similarity']:.2f}) Requirement: {item['requirement'][:200]} | Evidence: {item['evidence'][:200]}"
+            for item in match["strongest_alignments"]
+        )
+        gaps = "\n".join(
+            f"- ({item['similarity']:.2f}) {item['requirement'][:200]}"
+            for item in match["weakest_requirements"]
         )
         
-        resume_chunks = text_splitter.split_text(resume_text)
-        job_chunks = text_splitter.split_text(job_description)
+        prompt = f"""
+        Analyze this resume against the job description.
         
-        # Create vector stores for semantic search
-        resume_vectorstore = FAISS.from_texts(resume_chunks, embeddings)
-        job_vectorstore = FAISS.from_texts(job_chunks, embeddings)
+        Semantic match score (embedding similarity): {match['match_score']}/100
         
-        # Perform similarity analysis
-        # This is a simplified example - you'd want more sophisticated analysis
+        Best-supported requirements:
+        {alignments}
         
-        prompt = f"""
-        Analyze this resume against the job description:
+        Least-supported requirements:
+        {gaps}
         
         Resume: {resume_text[:1000]}...
         Job Description: {job_description[:1000]}...
         
         Provide:
-        1. Match percentage and reasoning
+        1. Match percentage and reasoning (anchored on the semantic match score)
         2. Strengths that align well
         3. Missing qualifications
         4. Suggestions for resume improvements
         5. Keywords to add
         """
         
-        response = self.llm.invoke([HumanMessage(content=prompt)])
-        return response.content
+        return self.cascade.invoke("career_document_analysis", prompt)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for per-client quotas and admission control
+"""
+
+import threading
+import time
+
+from flask import Flask
+
+from utils.admission import AdmissionController, MemoryQuotaStore, SQLiteQuotaStore
+from utils.agent_pipeline import AgentEndpoint, AgentPipeline, BackgroundPersistence, ResponseCache
+
+ANSWER = """### Plan
+1. **Skill** growth: practice system design and consider a mentor; start with one project.
+2. Track market salary trends and experience requirements, then take the next step.
+""" * 3
+
+
+def make_client(admission, dispatch=None, cache_ttl=60):
+    app = Flask(__name__)
+    calls = []
+    pipeline = AgentPipeline(lambda evaluation, metadata: None, cache=ResponseCache(ttl=cache_ttl),
+                             persistence=BackgroundPersistence(enabled=False), admission=admission)
+    pipeline.register(app, AgentEndpoint("career-advice", "query", "advice",
+                                         dispatch or (lambda query, data, extras: calls.append(query) or ANSWER), cost=5))
+    return app.test_client(), calls
+
+
+def post(client, query, address="10.0.0.1"):
+    return client.post("/career-advice", json={"query": query}, environ_base={"REMOTE_ADDR": address})
+
+
+def test_agent_runs_spend_the_budget_and_get_a_429_with_retry_after():
+    client, calls = make_client(AdmissionController(rate_per_minute=6, burst=10, cache_hit_cost=1))
+    assert post(client, "first").status_code == 200   # 10 -> 5
+    assert post(client, "second").status_code == 200  # 5 -> 0
+    response = post(client, "third")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.get_json()["retry_after"] == int(response.headers["Retry-After"])
+    assert calls == ["first", "second"]
+    # Other clients have their own buckets
+    assert post(client, "third", address="10.0.0.2").status_code == 200
+
+
+def test_cache_hits_cost_less_than_agent_runs():
+    client, calls = make_client(AdmissionController(rate_per_minute=0.001, burst=10, cache_hit_cost=1))
+    statuses = [post(client, "same question").status_code for _ in range(7)]
+    assert statuses == [200] * 6 + [429]  # one agent run (5) then five cache hits (1 each)
+    assert len(calls) == 1
+
+
+def test_concurrent_agent_runs_are_capped():
+    started = threading.Event()
+
+    def slow(query, data, extras):
+        started.set()
+        time.sleep(0.4)
+        return ANSWER
+
+    client, _ = make_client(AdmissionController(rate_per_minute=600, burst=100, max_concurrent=1, slot_wait=0.05),
+                            dispatch=slow, cache_ttl=0)
+    first = []
+    thread = threading.Thread(target=lambda: first.append(post(client, "slow one").status_code))
+    thread.start()
+    started.wait(2)
+    response = post(client, "another one", address="10.0.0.9")
+    thread.join()
+
+    assert first == [200]
+    assert response.status_code == 429 and response.headers["Retry-After"] == "1"
+
+
+def test_coalesced_followers_take_no_slot_and_pay_only_the_hit_cost():
+    started = threading.Event()
+    calls = []
+
+    def slow(query, data, extras):
+        calls.append(query)
+        started.set()
+        time.sleep(0.4)
+        return ANSWER
+
+    # Room for one agent run (5) plus two hit costs (1 each), but not two agent runs
+    admission = AdmissionController(rate_per_minute=0.001, burst=7, cache_hit_cost=1, max_concurrent=1, slot_wait=0.05)
+    client, _ = make_client(admission, dispatch=slow)
+    statuses = []
+    leader = threading.Thread(target=lambda: statuses.append(post(client, "same").status_code))
+    leader.start()
+    started.wait(2)
+    follower = threading.Thread(target=lambda: statuses.append(post(client, "same").status_code))
+    follower.start()
+    leader.join()
+    follower.join()
+
+    assert statuses == [200, 200] and calls == ["same"]
+    assert admission.stats["rejected_busy"] == 0
+    assert post(client, "same").status_code == 200   # a cache hit still fits the budget
+    assert post(client, "other").status_code == 429
+
+
+def test_concurrency_ceiling_is_split_between_workers():
+    admission = AdmissionController(max_concurrent=8)
+    assert admission.max_concurrent_per_worker == 8
+    admission.set_workers(3)
+    assert admission.max_concurrent_per_worker == 2
+    admission.set_workers(16)
+    assert admission.max_concurrent_per_worker == 1
+
+
+def test_sqlite_store_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "quotas.db")
+    worker_a, worker_b = SQLiteQuotaStore(path), SQLiteQuotaStore(path)
+    assert worker_a.apply("ip:1", 6, rate=0.0001, capacity=10, enforce=True) == (True, 0.0)
+    allowed, retry_after = worker_b.apply("ip:1", 6, rate=0.0001, capacity=10, enforce=True)
+    assert not allowed and retry_after > 0
+    # Unenforced charges may go into debt, but never below -capacity
+    assert worker_b.apply("ip:1", 100, rate=1, capacity=10, enforce=False)[0]
+    allowed, retry_after = worker_a.apply("ip:1", 1, rate=1, capacity=10, enforce=True)
+    assert not allowed and 10 < retry_after <= 11
+
+
+def test_memory_store_refills_over_time():
+    store = MemoryQuotaStore()
+    assert store.apply("user:a", 10, rate=100, capacity=10, enforce=True)[0]
+    assert not store.apply("user:a", 10, rate=100, capacity=10, enforce=True)[0]
+    time.sleep(0.12)
+    assert store.apply("user:a", 10, rate=100, capacity=10, enforce=True)[0]
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
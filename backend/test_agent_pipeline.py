@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared agent endpoint pipeline
+"""
+
+import threading
+import time
+
+from flask import Flask
+
+from utils.agent_pipeline import AgentEndpoint, AgentPipeline, BackgroundPersistence, RequestRejected, ResponseCache
+
+ANSWER = """### Plan
+1. **Skill** growth: practice system design and consider a mentor; start with one project.
+2. Track market salary trends and experience requirements, then take the next step.
+""" * 3
+
+
+def make_app(dispatch, **endpoint_options):
+    app = Flask(__name__)
+    persisted = []
+    pipeline = AgentPipeline(lambda evaluation, metadata: persisted.append((evaluation, metadata)),
+                             cache=ResponseCache(ttl=60, max_entries=8), persistence=BackgroundPersistence(enabled=False))
+    pipeline.register(app, AgentEndpoint("career-advice", "query", "advice", dispatch, **endpoint_options))
+    return app.test_client(), pipeline, persisted
+
+
+def test_repeat_requests_are_served_from_cache():
+    calls = []
+    client, pipeline, persisted = make_app(lambda query, data, extras: calls.append(query) or ANSWER)
+
+    first = client.post("/career-advice", json={"query": "Move into ML?"}).get_json()
+    second = client.post("/career-advice", json={"query": "  move into   ML? "}).get_json()
+
+    assert len(calls) == 1
+    assert first["advice"] == second["advice"] == ANSWER
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert len(persisted) == 2 and persisted[1][1]["cached"] is True
+
+
+def test_options_and_tracing_bypass_cached_answers():
+    calls = []
+    client, pipeline, _ = make_app(lambda query, data, extras: calls.append(data.get("level")) or ANSWER,
+                                   cache_fields=("level",))
+    client.post("/career-advice", json={"query": "Python", "level": "beginner"})
+    client.post("/career-advice", json={"query": "Python", "level": "advanced"})
+    client.post("/career-advice", json={"query": "Python", "level": "advanced", "trace": True})
+    assert calls == ["beginner", "advanced", "advanced"]
+
+
+def test_low_quality_answers_are_not_cached():
+    calls = []
+    client, _, _ = make_app(lambda query, data, extras: calls.append(query) or "I apologize, please try again.")
+    client.post("/career-advice", json={"query": "q"})
+    client.post("/career-advice", json={"query": "q"})
+    assert len(calls) == 2
+
+
+def test_concurrent_identical_requests_share_one_dispatch():
+    calls = []
+
+    def slow(query, data, extras):
+        calls.append(query)
+        time.sleep(0.3)
+        return ANSWER
+
+    client, pipeline, _ = make_app(slow)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.post("/career-advice", json={"query": "same"}).get_json()))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 4 and all(result["advice"] == ANSWER for result in results)
+    assert pipeline.stats["coalesced"] + pipeline.cache.stats["hits"] == 3
+
+
+def test_followers_past_their_deadline_get_504():
+    def slow(query, data, extras):
+        time.sleep(1.5)
+        return ANSWER
+
+    client, pipeline, _ = make_app(slow)
+    leader = threading.Thread(target=lambda: client.post("/career-advice", json={"query": "same"}))
+    leader.start()
+    time.sleep(0.1)
+    response = client.post("/career-advice", json={"query": "same", "deadline_seconds": 1})
+    leader.join()
+
+    assert response.status_code == 504
+    assert pipeline.stats["coalesced"] == 1 and pipeline.stats["rejected"] == 1
+
+
+def test_followers_wait_only_for_the_time_left():
+    def slow(query, data, extras):
+        time.sleep(1.5)
+        return ANSWER
+
+    client, pipeline, _ = make_app(slow)
+    pipeline.add_validator(lambda endpoint, data, user_input: time.sleep(0.5 if data.get("slow_check") else 0))
+    leader = threading.Thread(target=lambda: client.post("/career-advice", json={"query": "same"}))
+    leader.start()
+    time.sleep(0.1)
+    started = time.monotonic()
+    response = client.post("/career-advice", json={"query": "same", "deadline_seconds": 1, "slow_check": True})
+    elapsed = time.monotonic() - started
+    leader.join()
+
+    assert response.status_code == 504
+    assert elapsed < 1.3  # validation time counts against the deadline
+
+
+def test_validators_reject_before_dispatch_and_empty_bodies_do_not_crash():
+    calls = []
+    client, pipeline, persisted = make_app(lambda query, data, extras: calls.append(query) or ANSWER)
+
+    def require_input(endpoint, data, user_input):
+        if not user_input.strip():
+            raise RequestRejected(f"'{endpoint.input_field}' is required", field=endpoint.input_field)
+
+    pipeline.add_validator(require_input)
+    response = client.post("/career-advice", data="", content_type="application/json")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "'query' is required", "field": "query"}
+    assert not calls and not persisted
+
+
+def test_prepare_adds_fields_used_by_dispatch():
+    client, _, _ = make_app(lambda query, data, extras: ANSWER + str(len(extras["ranked"])),
+                            prepare=lambda query, data: {"ranked": [query, query]})
+    body = client.post("/career-advice", json={"query": "x"}).get_json()
+    assert body["ranked"] == ["x", "x"] and body["advice"].endswith("2")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
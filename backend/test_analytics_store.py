@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared analytics store
+"""
+
+import json
+import sqlite3
+import multiprocessing
+
+from utils.analytics_store import AnalyticsStore, encode_body, decode_body
+
+
+def evaluation(response_id, endpoint="career-advice", score=70, grade="B", seconds=1.0, user_id=None):
+    return {
+        "timestamp": f"2025-01-01T00:00:{len(response_id):02d}",
+        "endpoint": endpoint,
+        "user_input": "question",
+        "ai_response": "answer",
+        "processing_time": seconds,
+        "metrics": {"response_id": response_id, "output_length": 6},
+        "quality_evaluation": {"quality_score": score, "quality_grade": grade},
+        "metadata": {"user_id": user_id},
+        "model_info": {"base_model": "gpt-3.5-turbo"}
+    }
+
+
+def conversation(index, endpoint="career-advice"):
+    return {"timestamp": f"2025-01-01T00:00:{index:02d}", "endpoint": endpoint,
+            "user_input": "q", "ai_response": "a" * index, "metadata": {"index": index}}
+
+
+def write_from_worker(db_path, worker, count):
+    store = AnalyticsStore(db_path)
+    for index in range(count):
+        store.add_evaluation(evaluation(f"w{worker}-{index}"))
+        store.add_conversation(conversation(index))
+    store.close()
+
+
+def feedback_from_worker(db_path, response_id, queue):
+    queue.put(AnalyticsStore(db_path).set_feedback(response_id, {"rating": 5, "feedback_text": "great"}))
+
+
+def test_records_round_trip_in_order(tmp_path):
+    store = AnalyticsStore(str(tmp_path / "analytics.db"))
+    for index in range(12):
+        store.add_conversation(conversation(index, "mock-interview"))
+    store.add_evaluation(evaluation("a", user_id=7))
+
+    assert store.conversation_count() == 12
+    assert [entry["metadata"]["index"] for entry in store.recent_conversations(10)] == list(range(2, 12))
+    assert store.evaluations()[0]["metrics"]["response_id"] == "a"
+    assert store.evaluations()[0]["metadata"]["user_id"] == 7
+    assert not store.set_feedback("missing", {"rating": 1})
+    assert store.set_feedback("a", {"rating": 2, "feedback_text": "meh", "timestamp": "t1"})
+    assert store.set_feedback("a", {"rating": 4, "feedback_text": "better", "timestamp": "t2"})
+    assert store.evaluations(limit=1)[0]["user_feedback"] == {"rating": 4, "feedback_text": "better", "timestamp": "t2"}
+
+
+def test_writes_are_batched(tmp_path):
+    store = AnalyticsStore(str(tmp_path / "analytics.db"), flush_interval=60, batch_size=10)
+    for index in range(25):
+        store.add_conversation(conversation(index))
+    assert store.stats["flushes"] == 2 and store.stats["rows_written"] == 20
+    assert store.conversation_count() == 25  # reads flush the rest first
+    assert store.stats["flushes"] == 3
+
+
+def test_summary_matches_the_records(tmp_path):
+    store = AnalyticsStore(str(tmp_path / "analytics.db"))
+    store.add_evaluation(evaluation("a", "career-advice", 80, "A", 1.0))
+    store.add_evaluation(evaluation("bb", "career-advice", 60, "B", 3.0))
+    store.add_evaluation(evaluation("ccc", "mock-interview", 40, "C", 2.0))
+
+    summary = store.evaluation_summary()
+    assert summary["total_evaluations"] == 3
+    assert summary["average_quality_score"] == 60
+    assert summary["quality_grade_distribution"] == {"A": 1, "B": 1, "C": 1}
+    assert summary["endpoint_performance"]["career-advice"] == {"count": 2, "avg_quality": 70, "avg_response_time": 2.0}
+    assert summary["recent_trend"] == {"avg_quality": 60, "avg_response_time": 2.0}
+    assert store.evaluation_summary(endpoint="mock-interview")["total_evaluations"] == 1
+    assert store.evaluation_summary(since="2025-01-01T00:00:02")["total_evaluations"] == 2
+
+
+def test_lookups_use_the_indexes(tmp_path):
+    store = AnalyticsStore(str(tmp_path / "analytics.db"))
+    store.add_evaluation(evaluation("a"))
+    conn = sqlite3.connect(str(tmp_path / "analytics.db"))
+    plans = {
+        "response_id": "SELECT 1 FROM evaluations WHERE response_id = 'a'",
+        "endpoint": "SELECT COUNT(*) FROM evaluations WHERE endpoint = 'x' AND timestamp >= 't'",
+        "user_id": "SELECT * FROM conversations WHERE user_id = '7'"
+    }
+    for column, query in plans.items():
+        plan = " ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + query))
+        assert "USING" in plan and "INDEX" in plan, (column, plan)
+
+
+def test_json_history_is_imported_once(tmp_path):
+    conversations, evaluations = tmp_path / "conversation_history.json", tmp_path / "model_evaluation_data.json"
+    conversations.write_text(json.dumps([conversation(1), conversation(2)]))
+    rated = evaluation("old")
+    rated["user_feedback"] = {"rating": 5, "feedback_text": "", "timestamp": "t"}
+    evaluations.write_text(json.dumps([rated, evaluation("older")]))
+
+    store = AnalyticsStore(str(tmp_path / "analytics.db"))
+    assert store.import_json_history(str(conversations), str(evaluations)) == {"conversations": 2, "evaluations": 2}
+    assert store.import_json_history(str(conversations), str(evaluations)) == {"conversations": 0, "evaluations": 0}
+    assert store.conversation_count() == 2
+    assert store.evaluations()[0]["user_feedback"]["rating"] == 5
+
+
+def test_bodies_are_stored_once_and_compressed(tmp_path):
+    store = AnalyticsStore(str(tmp_path / "analytics.db"))
+    answer = "Focus on SQL, Python and one cloud warehouse. " * 40
+    for response_id in ("a", "b"):
+        entry = evaluation(response_id)
+        entry["ai_response"] = answer
+        store.add_conversation({"timestamp": "t", "endpoint": "career-advice", "user_input": "question",
+                                "ai_response": answer, "metadata": {}})
+        store.add_evaluation(entry)
+
+    stats = store.body_stats()
+    assert stats["bodies"] == 2  # one prompt, one response, shared by all four records
+    assert stats["stored_bytes"] < stats["raw_bytes"] / 5
+    assert store.stats["bodies_reused"] == 6
+    assert store.recent_conversations(1)[0]["ai_response"] == answer
+    assert store.evaluations()[1]["ai_response"] == answer
+
+
+def test_body_codecs_round_trip():
+    for text in ("short", "repeated text " * 100, "unicodé ✓ " * 50):
+        codec, size, data = encode_body(text)
+        assert size == len(text.encode("utf-8"))
+        assert decode_body(codec, data) == text
+    assert encode_body("short")[0] == "raw"
+    assert encode_body("x" * 1000, codec="zlib")[0] == "zlib"
+
+
+def test_worker_processes_share_one_history(tmp_path):
+    db_path = str(tmp_path / "analytics.db")
+    store = AnalyticsStore(db_path)
+    store.add_evaluation(evaluation("parent"))  # opened before the fork, like a preloaded app
+    store.flush()
+
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=write_from_worker, args=(db_path, worker, 25)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(30)
+        assert process.exitcode == 0
+
+    assert len(store.evaluations()) == 101
+    assert store.conversation_count() == 100
+
+    # Feedback recorded by one worker is visible to every other
+    queue = context.Queue()
+    process = context.Process(target=feedback_from_worker, args=(db_path, "w2-7", queue))
+    process.start()
+    process.join(30)
+    assert queue.get(timeout=5)
+    rated = [entry for entry in store.evaluations() if "user_feedback" in entry]
+    assert [entry["metrics"]["response_id"] for entry in rated] == ["w2-7"]
+    store.add_evaluation(evaluation("parent-again"))
+    assert store.evaluation_summary()["total_evaluations"] == 102
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for agent and upstream circuit breakers
+"""
+
+import time
+
+import utils.openai_helper as openai_helper
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError, get_breaker, reset_breakers, CLOSED, OPEN, HALF_OPEN
+
+
+def failing():
+    raise RuntimeError("upstream down")
+
+
+def test_breaker_opens_then_half_opens_and_recovers():
+    breaker = CircuitBreaker("agent:test", failure_threshold=2, cool_down=0.05)
+
+    for _ in range(2):
+        try:
+            breaker.call(failing)
+        except RuntimeError:
+            pass
+    assert breaker.state == OPEN
+
+    try:
+        breaker.call(lambda: "never runs")
+        assert False, "expected CircuitOpenError"
+    except CircuitOpenError:
+        pass
+    assert breaker.stats["rejected"] == 1
+
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    assert breaker.call(lambda: "probe ok") == "probe ok"
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens_and_latency_counts_as_failure():
+    breaker = CircuitBreaker("upstream:test", failure_threshold=1, latency_threshold=0.01, cool_down=0.05)
+
+    breaker.call(lambda: time.sleep(0.02))
+    assert breaker.state == OPEN
+    assert breaker.stats["latency_breaches"] == 1
+
+    time.sleep(0.06)
+    try:
+        breaker.call(failing)
+    except RuntimeError:
+        pass
+    assert breaker.state == OPEN
+
+
+def test_neutral_errors_do_not_trip_the_breaker():
+    breaker = CircuitBreaker("upstream:neutral", failure_threshold=1)
+    try:
+        breaker.call(lambda: (_ for _ in ()).throw(TimeoutError()), neutral_errors=(TimeoutError,))
+    except TimeoutError:
+        pass
+    assert breaker.state == CLOSED
+
+
+def test_open_agent_breaker_skips_straight_to_fallback(monkeypatch):
+    import agents.career_agent as career_agent
+
+    reset_breakers()
+    breaker = get_breaker("agent:career")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    def agent_must_not_run(*args, **kwargs):
+        raise AssertionError("agent should be skipped while its breaker is open")
+
+    monkeypatch.setattr(career_agent, "CareerAgentLangChain", agent_must_not_run)
+    monkeypatch.setattr(openai_helper, "agentic_completion", lambda system, user: {"content": "fallback advice"})
+
+    try:
+        assert career_agent.get_career_advice("What next after QA?") == "fallback advice"
+        assert breaker.stats["rejected"] == 0  # checking state does not consume probes
+    finally:
+        reset_breakers()
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
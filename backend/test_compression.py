@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for Accept-Encoding negotiated compression of API responses
+"""
+
+import gzip
+import zlib
+
+from flask import Flask, Response, jsonify
+
+from utils.compression import MIN_COMPRESS_BYTES, StreamCompressor, init_compression
+
+ADVICE = "### Next steps\n1. **Build** a portfolio project and write about what you learned.\n" * 60
+
+
+def make_client():
+    app = Flask(__name__)
+
+    @app.route("/advice")
+    def advice():
+        return jsonify({"advice": ADVICE, "prompt": "How do I move into data engineering?"})
+
+    @app.route("/small")
+    def small():
+        return jsonify({"ok": True})
+
+    @app.route("/page")
+    def page():
+        return Response(ADVICE, mimetype="text/html")
+
+    @app.route("/events")
+    def events():
+        return Response((f"data: {line}\n\n" for line in ADVICE.splitlines()), mimetype="text/event-stream")
+
+    init_compression(app)
+    return app.test_client()
+
+
+def test_large_json_is_gzipped_for_clients_that_accept_it():
+    client = make_client()
+    plain = client.get("/advice")
+    response = client.get("/advice", headers={"Accept-Encoding": "gzip, deflate"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) == len(response.get_data())
+    assert gzip.decompress(response.get_data()) == plain.get_data()
+    assert len(response.get_data()) * 3 < len(plain.get_data())
+
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+
+def test_small_and_non_api_responses_are_left_alone():
+    client = make_client()
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert len(small.get_data()) < MIN_COMPRESS_BYTES
+    assert "Content-Encoding" not in small.headers
+    assert "Content-Encoding" not in client.get("/page", headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in client.get("/advice", headers={"Accept-Encoding": "gzip;q=0"}).headers
+
+
+def test_streamed_responses_are_compressed_per_chunk():
+    client = make_client()
+    response = client.get("/events", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    body = gzip.decompress(response.get_data()).decode()
+    assert body == "".join(f"data: {line}\n\n" for line in ADVICE.splitlines())
+
+
+def test_each_stream_chunk_is_decodable_on_arrival():
+    compressor = StreamCompressor("gzip")
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for event in (b"data: one\n\n", b"data: two\n\n"):
+        assert decoder.decompress(compressor.chunk(event)) == event
+    assert decoder.decompress(compressor.finish()) == b""
+    assert decoder.eof
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
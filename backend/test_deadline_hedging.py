@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for request deadlines and hedged upstream calls
+"""
+
+import time
+import threading
+
+from utils import deadline, rate_limiter
+from utils.deadline import DeadlineExceeded, deadline_scope, invoke_agent, time_left
+from utils.hedging import RequestHedger
+from utils.rate_limiter import UpstreamLimiter
+
+
+class FakeExecutor:
+    """Stands in for AgentExecutor: records its time budget and optionally runs past it"""
+
+    def __init__(self, run_seconds=0.0, output="agent answer"):
+        self.run_seconds = run_seconds
+        self.output = output
+        self.max_execution_time = None
+        self.seen_time_left = None
+
+    def invoke(self, inputs):
+        self.seen_time_left = time_left()
+        time.sleep(self.run_seconds)
+        if self.max_execution_time is not None and self.run_seconds >= self.max_execution_time:
+            return {"output": "Agent stopped due to iteration limit or time limit."}
+        return {"output": self.output}
+
+
+def test_nested_deadlines_never_extend():
+    assert time_left() is None
+    with deadline_scope(1.0):
+        with deadline_scope(10.0):
+            assert time_left() <= 1.0
+    assert time_left() is None
+
+
+def test_invoke_agent_reserves_time_for_fallback(monkeypatch):
+    monkeypatch.setattr(deadline, "FALLBACK_RESERVE_SECONDS", 0.5)
+
+    executor = FakeExecutor()
+    with deadline_scope(2.0):
+        assert invoke_agent(executor, {"input": "q"}) == "agent answer"
+    assert executor.max_execution_time <= 1.5
+    assert executor.seen_time_left <= 1.5
+
+    with deadline_scope(0.4):
+        try:
+            invoke_agent(FakeExecutor(), {"input": "q"})
+            assert False, "expected the agent to be skipped"
+        except DeadlineExceeded:
+            pass
+
+    with deadline_scope(0.7):
+        try:
+            invoke_agent(FakeExecutor(run_seconds=0.25), {"input": "q"})
+            assert False, "expected the agent steps to be cut"
+        except DeadlineExceeded:
+            pass
+
+
+def test_limiter_does_not_retry_past_deadline(monkeypatch):
+    limiter = UpstreamLimiter(max_retries=5, backoff_base=1.0, backoff_max=1.0)
+    # Full jitter can draw a delay shorter than the deadline; pin it to its upper bound
+    monkeypatch.setattr(rate_limiter.random, "uniform", lambda low, high: high)
+
+    class Overloaded(Exception):
+        status_code = 503
+
+    attempts = []
+
+    def send():
+        attempts.append(1)
+        raise Overloaded()
+
+    with deadline_scope(0.2):
+        try:
+            limiter.run(send)
+            assert False, "expected DeadlineExceeded"
+        except DeadlineExceeded:
+            pass
+    assert len(attempts) <= 2
+
+
+def test_hedge_returns_faster_backup():
+    hedger = RequestHedger(percentile=50, min_samples=3)
+    for _ in range(5):
+        hedger.latencies.observe("chat:gpt", 0.02)
+
+    calls = []
+    lock = threading.Lock()
+
+    def attempt():
+        with lock:
+            calls.append(1)
+            slow = len(calls) == 1
+        time.sleep(0.5 if slow else 0.01)
+        return "slow" if slow else "fast"
+
+    start_time = time.perf_counter()
+    assert hedger.run("chat:gpt", attempt) == "fast"
+    assert time.perf_counter() - start_time < 0.4
+    assert hedger.stats == {"hedged": 1, "hedge_wins": 1}
+
+
+def test_hedging_disabled_runs_once():
+    hedger = RequestHedger(percentile=0)
+    assert hedger.run("chat:gpt", lambda: "only") == "only"
+    assert hedger.stats["hedged"] == 0
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the batched, cached embedding service
+"""
+
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+
+import utils.openai_helper as openai_helper
+from utils.embedding_service import EmbeddingService, LocalHashingBackend, OpenAIEmbeddingBackend
+from utils.vector_index import PersistentVectorIndex
+
+
+class RecordingBackend(LocalHashingBackend):
+    def __init__(self):
+        super().__init__(dim=32)
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return super().embed(texts)
+
+
+def test_duplicates_are_embedded_once_and_batched(tmp_path):
+    backend = RecordingBackend()
+    service = EmbeddingService(backend, PersistentVectorIndex(str(tmp_path)), batch_size=2)
+
+    vectors = service.embed(["python", "sql", "python", "spark", "sql"])
+    assert vectors.shape == (5, 32)
+    np.testing.assert_array_equal(vectors[0], vectors[2])
+    assert [len(batch) for batch in backend.calls] == [2, 1]
+
+    service.embed(["spark", "python"])
+    assert len(backend.calls) == 2
+    assert service.stats["embedded"] == 3
+    assert service.stats["cache_hits"] == 2
+
+
+def test_cache_survives_restart(tmp_path):
+    EmbeddingService(RecordingBackend(), PersistentVectorIndex(str(tmp_path))).embed(["kubernetes operator"])
+
+    backend = RecordingBackend()
+    EmbeddingService(backend, PersistentVectorIndex(str(tmp_path))).embed(["kubernetes operator"])
+    assert backend.calls == []
+
+
+def test_concurrent_callers_share_one_upstream_call(tmp_path):
+    gate = threading.Event()
+
+    class SlowBackend(RecordingBackend):
+        def embed(self, texts):
+            gate.wait(1)
+            return super().embed(texts)
+
+    backend = SlowBackend()
+    service = EmbeddingService(backend, PersistentVectorIndex(str(tmp_path)))
+    threads = [threading.Thread(target=service.embed, args=(["terraform"],)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert backend.calls == [["terraform"]]
+
+
+def test_openai_backend_goes_through_shared_call_path(monkeypatch):
+    requests = []
+
+    def create(model, input, **kwargs):
+        requests.append(input)
+        data = [SimpleNamespace(index=i, embedding=[float(len(text)), 1.0]) for i, text in enumerate(input)]
+        return SimpleNamespace(data=list(reversed(data)))
+
+    monkeypatch.setattr(openai_helper, "client", SimpleNamespace(embeddings=SimpleNamespace(create=create)))
+    calls = []
+    real_call_upstream = openai_helper.call_upstream
+    monkeypatch.setattr(openai_helper, "call_upstream", lambda *args: calls.append(args[0]) or real_call_upstream(*args))
+
+    assert OpenAIEmbeddingBackend("test-embedding").embed(["ab", "abcd"]) == [[2.0, 1.0], [4.0, 1.0]]
+    assert calls == ["embeddings"]
+    assert requests == [["ab", "abcd"]]
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for the local job-market knowledge base and tool grounding
+"""
+
+import utils.knowledge_base as knowledge_base
+from utils.knowledge_base import KnowledgeBase, DEFAULT_DATA_DIR, detect_level, is_factual_lookup
+
+
+def loaded(db_path=":memory:"):
+    kb = KnowledgeBase(db_path)
+    kb.ingest_directory(DEFAULT_DATA_DIR)
+    return kb
+
+
+def test_factual_salary_lookup_is_answered_directly():
+    result = loaded().lookup("compensation_research_analyst", "Senior data engineer salary in Austin")
+    assert result["answer"]
+    assert "Senior Data Engineer, Austin" in result["answer"]
+
+
+def test_advice_queries_are_grounded_not_answered():
+    kb = loaded()
+    result = kb.lookup("compensation_research_analyst", "ML engineer, 4 years, New York - how should I negotiate?")
+    assert result["answer"] is None
+    assert result["facts"] == [fact for fact in result["facts"] if "Mid Machine Learning Engineer, New York" in fact]
+    assert kb.stats["grounded"] == 1
+
+
+def test_unknown_topics_fall_back_to_llm():
+    kb = loaded()
+    assert kb.lookup("industry_trend_analyzer", "Pastry and baking") == {"facts": [], "answer": None}
+    assert kb.lookup("compensation_research_analyst", "engineer pay") == {"facts": [], "answer": None}
+    assert kb.stats["misses"] == 2
+
+
+def test_inverted_index_fallback_without_fts(monkeypatch):
+    monkeypatch.setattr(knowledge_base, "_fts_available", lambda conn: False)
+    kb = loaded()
+    assert not kb.use_fts
+    assert kb.find_role("looking at SRE jobs") == "DevOps Engineer"
+    assert kb.find_industry("fintech") == "Finance"
+
+
+def test_ingest_is_skipped_when_data_unchanged(tmp_path):
+    db_path = str(tmp_path / "kb.db")
+    loaded(db_path)
+    assert KnowledgeBase(db_path).ingest_directory(DEFAULT_DATA_DIR) is False
+
+
+def test_compensation_tool_skips_llm_for_lookups(monkeypatch):
+    from agents.career_agent import CareerAgentLangChain
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(knowledge_base, "_knowledge_base", loaded())
+    agent = CareerAgentLangChain()
+    monkeypatch.setattr(agent.cascade, "invoke", lambda tool_name, prompt: f"LLM:{prompt}")
+    tool = next(tool for tool in agent.tools if tool.name == "compensation_research_analyst")
+
+    assert tool.func("Registered nurse salary in Chicago").startswith("Salary bands from the local market dataset")
+    grounded = tool.func("Registered nurse in Chicago, should I negotiate?")
+    assert grounded.startswith("LLM:") and "Known market data" in grounded
+
+
+def test_level_and_lookup_detection():
+    assert detect_level("junior analyst") == "entry"
+    assert detect_level("7 years of experience") == "senior"
+    assert is_factual_lookup("nurse salary Chicago")
+    assert not is_factual_lookup("what offer should I accept")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
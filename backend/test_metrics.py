@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script for the Prometheus-style metrics registry
+"""
+
+import os
+import time
+
+import pytest
+
+from utils.metrics import Registry, instrument_tools, record_usage, timed, TOOL_CALL_SECONDS, UPSTREAM_TOKENS
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.histogram("demo_seconds", "Demo latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.labels("/a").observe(value)
+
+    text = registry.render()
+    worker = f'worker="{os.getpid()}"'
+    assert "# TYPE demo_seconds histogram" in text
+    assert f'demo_seconds_bucket{{route="/a",{worker},le="0.1"}} 2' in text
+    assert f'demo_seconds_bucket{{route="/a",{worker},le="1"}} 3' in text
+    assert f'demo_seconds_bucket{{route="/a",{worker},le="+Inf"}} 4' in text
+    assert f'demo_seconds_count{{route="/a",{worker}}} 4' in text
+    assert f'demo_seconds_sum{{route="/a",{worker}}} 3.65' in text
+
+
+def test_counters_callbacks_and_label_escaping():
+    registry = Registry()
+    registry.counter("demo_total", "Demo count", ("name",)).labels('say "hi"\n').inc(2)
+    gauge = registry.callback("demo_depth", "Demo depth", ("queue",))
+    gauge.add_source(lambda: {("agent",): 3})
+    gauge.add_source(lambda: 1 / 0)  # a failing source is skipped, not fatal
+
+    registry.counter("demo_unlabelled_total", "Demo count").inc()
+
+    text = registry.render()
+    worker = f'worker="{os.getpid()}"'
+    assert f'demo_total{{name="say \\"hi\\"\\n",{worker}}} 2' in text
+    assert f'demo_depth{{queue="agent",{worker}}} 3' in text
+    assert f'demo_unlabelled_total{{{worker}}} 1' in text
+    assert text.endswith("\n")
+
+
+def test_timed_labels_outcome():
+    registry = Registry()
+    histogram = registry.histogram("demo_seconds", "Demo latency", ("tool", "outcome"))
+    with timed(histogram, "ok_tool"):
+        pass
+    with pytest.raises(ValueError):
+        with timed(histogram, "bad_tool"):
+            raise ValueError("boom")
+
+    assert histogram.labels("ok_tool", "ok").snapshot()[0][0] == 1
+    assert histogram.labels("bad_tool", "error").snapshot()[0][0] == 1
+
+
+def test_instrument_tools_and_usage():
+    from langchain.tools import Tool
+
+    tools = instrument_tools([Tool(name="metrics_test_tool", func=lambda text: text.upper(), description="demo")])
+    assert tools[0].run("hi") == "HI"
+    counts, _ = TOOL_CALL_SECONDS.labels("metrics_test_tool", "ok").snapshot()
+    assert sum(counts) == 1
+
+    record_usage("metrics-test-model", {"prompt_tokens": 12, "completion_tokens": 5})
+    assert UPSTREAM_TOKENS.labels("metrics-test-model", "prompt").value == 12
+    assert UPSTREAM_TOKENS.labels("metrics-test-model", "completion").value == 5
+
+
+def test_recording_costs_microseconds():
+    registry = Registry()
+    histogram = registry.histogram("demo_seconds", "Demo latency", ("route", "method", "status"))
+    observations = 20000
+    start = time.perf_counter()
+    for i in range(observations):
+        histogram.labels("/career-advice", "POST", "200").observe(i / observations)
+    per_observation = (time.perf_counter() - start) / observations
+    assert per_observation < 20e-6
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
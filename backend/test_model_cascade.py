@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for the tool model cascade
+Uses the local stub tier so no upstream calls are made
+"""
+
+import json
+
+from utils.model_cascade import LocalStubChatModel, ModelCascade, CascadeStats, load_cascade_config
+import utils.model_cascade as model_cascade
+
+
+def stub_config(min_quality_score):
+    config = load_cascade_config()
+    config["tiers"]["stub_strong"] = {"model": "local-stub"}
+    config["default"] = {"tiers": ["stub", "stub_strong"], "min_quality_score": min_quality_score}
+    return config
+
+
+def test_good_enough_answer_stays_on_cheap_tier(monkeypatch):
+    monkeypatch.setattr(model_cascade, "CASCADE_STATS", CascadeStats())
+    cascade = ModelCascade("career-advice", stub_config(min_quality_score=0))
+
+    assert cascade.invoke("industry_trend_analyzer", "Fintech outlook").startswith("[local-stub]")
+    report = model_cascade.cascade_report()
+    assert report["stub"]["calls"] == 1
+    assert "stub_strong" not in report
+
+
+def test_low_quality_answer_escalates(monkeypatch):
+    monkeypatch.setattr(model_cascade, "CASCADE_STATS", CascadeStats())
+    cascade = ModelCascade("career-advice", stub_config(min_quality_score=101))
+
+    cascade.invoke("industry_trend_analyzer", "Fintech outlook")
+    report = model_cascade.cascade_report()
+    assert report["stub"]["escalations"] == 1
+    assert report["stub_strong"]["calls"] == 1
+    assert report["stub_strong"]["escalations"] == 0
+    assert abs(report["stub"]["latency_share"] + report["stub_strong"]["latency_share"] - 1.0) < 0.01
+
+
+def test_default_config_escalates_except_for_single_tier_tools():
+    cascade = ModelCascade("career-advice", load_cascade_config())
+    assert cascade.tool_settings("industry_trend_analyzer")["tiers"] == ["fast", "strong"]
+    assert cascade.tool_settings("question_generator")["tiers"] == ["fast"]
+
+
+class FixedReplyModel:
+    def __init__(self, content):
+        self.content = content
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return LocalStubChatModel._Reply(self.content)
+
+
+ATS_CHECK = """ATS compatibility: 82/100
+- Headings use standard names (Summary, Experience, Education)
+- Add the keywords "Kubernetes" and "Terraform" from the posting
+- Move contact details out of the page header so parsers can read them
+"""
+
+
+def test_default_config_keeps_well_formed_tool_answers_on_the_fast_tier(monkeypatch):
+    monkeypatch.setattr(model_cascade, "CASCADE_STATS", CascadeStats())
+    cascade = ModelCascade("generate-resume", load_cascade_config())
+    fast, strong = FixedReplyModel(ATS_CHECK), FixedReplyModel("strong answer")
+    cascade._models.update(fast=fast, strong=strong)
+
+    assert cascade.invoke("ats_optimizer", "Check this resume") == ATS_CHECK
+    assert (fast.calls, strong.calls) == (1, 0)
+
+    fast.content = "I apologize, but I can't help with that."
+    assert cascade.invoke("ats_optimizer", "Check this resume") == "strong answer"
+    fast.content = "   "
+    assert cascade.invoke("ats_optimizer", "Check this resume") == "strong answer"
+    assert strong.calls == 2
+
+
+def test_agent_tools_use_configured_cascade(monkeypatch, tmp_path):
+    from agents.career_agent import CareerAgentLangChain
+
+    config_file = tmp_path / "cascade.json"
+    config_file.write_text(json.dumps({"default": {"tiers": ["stub"]}}))
+    monkeypatch.setenv("MODEL_CASCADE_CONFIG", str(config_file))
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    agent = CareerAgentLangChain()
+    tool = next(tool for tool in agent.tools if tool.name == "industry_trend_analyzer")
+    assert tool.func("Artisan bakeries").startswith("[local-stub]")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
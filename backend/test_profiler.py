@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for the sampling profiler
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from utils.profiler import ProfilerBusy, SamplingProfiler, collapsed, speedscope
+
+
+def busy_scoring_loop(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(i * i for i in range(200))
+    return total
+
+
+def profiled_request(profiler, seconds, label="POST /career-advice"):
+    profiler.enter_request(label)
+    try:
+        busy_scoring_loop(seconds)
+    finally:
+        profiler.exit_request()
+
+
+def test_session_samples_request_threads_and_writes_files(tmp_path):
+    profiler = SamplingProfiler(output_dir=str(tmp_path))
+    profiler.start(seconds=5, interval=0.002)
+    worker = threading.Thread(target=profiled_request, args=(profiler, 0.3))
+    worker.start()
+    worker.join()
+    result = profiler.stop()
+
+    assert result["samples"] > 10
+    assert result["requests_profiled"] == 1
+    assert any("busy_scoring_loop" in frame["frame"] or "genexpr" in frame["frame"] for frame in result["top_frames"])
+
+    lines = open(result["collapsed_file"]).read().splitlines()
+    assert all(line.startswith("POST /career-advice;") for line in lines)
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == result["samples"]
+
+    profile = json.load(open(result["speedscope_file"]))
+    assert profile["profiles"][0]["type"] == "sampled"
+    assert len(profile["profiles"][0]["samples"]) == len(profile["profiles"][0]["weights"]) == len(lines)
+    assert not profiler.status()["active"]
+    assert result["worker"] == profiler.status()["worker"] == os.getpid()
+
+
+def test_unsampled_requests_and_idle_threads_are_not_recorded(tmp_path):
+    profiler = SamplingProfiler(output_dir=str(tmp_path))
+    profiler.start(seconds=5, sample_rate=0.0, interval=0.002)
+    profiled_request(profiler, 0.05)
+    result = profiler.stop()
+    assert result["samples"] == 0 and result["requests_profiled"] == 0
+
+
+def test_background_work_is_sampled_regardless_of_sample_rate(tmp_path):
+    profiler = SamplingProfiler(output_dir=str(tmp_path))
+    profiler.start(seconds=5, sample_rate=0.0, interval=0.002)
+
+    def persist():
+        with profiler.background_work("persist"):
+            busy_scoring_loop(0.2)
+        time.sleep(0.1)  # idle between units is not recorded
+
+    worker = threading.Thread(target=persist)
+    worker.start()
+    worker.join()
+    result = profiler.stop()
+
+    lines = open(result["collapsed_file"]).read().splitlines()
+    assert result["samples"] > 10 and result["requests_profiled"] == 0
+    assert all(line.startswith("persist;") for line in lines)
+    assert not any(line.rsplit(" ", 1)[0].split(";")[-1].startswith("persist (") for line in lines)
+
+
+def test_one_session_at_a_time(tmp_path):
+    profiler = SamplingProfiler(output_dir=str(tmp_path))
+    profiler.start(seconds=5)
+    with pytest.raises(ProfilerBusy):
+        profiler.start(seconds=5)
+    profiler.stop()
+    profiler.start(seconds=0.1)
+    time.sleep(0.3)
+    assert not profiler.status()["active"]
+
+
+def test_output_formats():
+    stacks = Counter({"GET /;app;handler": 3, "GET /;app;save": 1})
+    assert collapsed(stacks) == "GET /;app;handler 3\nGET /;app;save 1\n"
+
+    profile = speedscope(stacks, 0.01, "demo")
+    assert [frame["name"] for frame in profile["shared"]["frames"]] == ["GET /", "app", "handler", "save"]
+    assert profile["profiles"][0]["samples"] == [[0, 1, 2], [0, 1, 3]]
+    assert profile["profiles"][0]["weights"] == [0.03, 0.01]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the interview question bank
+"""
+
+import utils.question_bank as question_bank
+from utils.question_bank import QuestionBank, parse_questions, DEFAULT_MIX
+
+GENERATED = """### TECHNICAL QUESTIONS
+1. How do you laminate dough without the butter breaking through?
+2. **What proofing temperature do you use for croissants, and why?** (easy)
+3. How would you scale a pastry recipe from 20 to 200 portions?
+4. How do you stabilize a meringue in a humid kitchen?
+5. How do you plan mise en place for a six-course tasting menu?
+
+### Behavioral Questions
+- Tell me about a time a service went badly wrong in the kitchen?
+"""
+
+
+def seeded():
+    bank = QuestionBank()
+    bank.seed(history_path=None)
+    return bank
+
+
+def test_parse_questions_uses_section_types():
+    questions = parse_questions(GENERATED)
+    assert [q["type"] for q in questions] == ["technical"] * 5 + ["behavioral"]
+    assert questions[1]["question"] == "What proofing temperature do you use for croissants, and why?"
+
+
+def test_common_roles_are_served_from_the_bank():
+    bank = seeded()
+    questions = bank.sample("Data Engineer")
+
+    assert bank.has_coverage("Data Engineer")
+    assert {q["type"] for q in questions} == set(DEFAULT_MIX)
+    assert all(q["role"] == "Data Engineer" for q in questions if q["type"] == "technical")
+    assert len({q["question"] for q in questions}) == len(questions)
+    behavioral = [q["competency"] for q in questions if q["type"] == "behavioral"]
+    assert len(set(behavioral)) == len(behavioral)  # one per competency while others remain
+
+
+def test_coverage_counts_only_questions_for_the_level():
+    bank = QuestionBank()
+    bank.add(parse_questions(GENERATED), "Pastry Chef", "senior")
+
+    assert bank.coverage("Pastry Chef") == 5
+    assert bank.has_coverage("Pastry Chef", "senior")
+    assert not bank.has_coverage("Pastry Chef", "entry")
+    bank.add([{"type": "technical", "question": f"Which {item} would you bake first, and why?"}
+              for item in ("bread", "tart", "cake", "choux", "brioche")], "Pastry Chef")
+    assert bank.has_coverage("Pastry Chef", "entry")  # questions without a level fit every level
+
+
+def test_repeat_requests_rotate_through_questions():
+    bank = seeded()
+    first = {q["question"] for q in bank.sample("Software Engineer", mix={"behavioral": 4})}
+    second = {q["question"] for q in bank.sample("Software Engineer", mix={"behavioral": 4})}
+    assert not first & second
+
+
+def test_near_duplicates_and_exact_duplicates_are_skipped():
+    bank = QuestionBank()
+    added = bank.add([
+        {"type": "reverse", "question": "What does success look like in this role?"},
+        {"type": "reverse", "question": "What does success look like in this role?!"},
+        {"type": "reverse", "question": "What does success look like in this role after a year?"}
+    ], "any")
+    assert added == 2
+    assert len(bank.sample("Any", mix={"reverse": 3})) == 1
+
+
+def test_unseen_role_fills_gap_once_and_is_written_back():
+    bank = seeded()
+    prompts = []
+
+    def generate(prompt):
+        prompts.append(prompt)
+        return GENERATED
+
+    assert bank.fill_gap("Pastry Chef", None, generate)
+    assert bank.fill_gap("Pastry Chef", None, generate)
+    assert len(prompts) == 1
+    assert "Pastry Chef" in prompts[0]
+    assert any(q["role"] == "Pastry Chef" for q in bank.sample("Pastry Chef"))
+
+
+def test_question_tool_skips_llm_for_covered_roles(monkeypatch):
+    from agents.interview_agent import InterviewAgentLangChain
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(question_bank, "_question_bank", seeded())
+    agent = InterviewAgentLangChain()
+    calls = []
+    monkeypatch.setattr(agent.cascade, "invoke", lambda tool_name, prompt: calls.append(prompt) or GENERATED)
+    tools = {tool.name: tool for tool in agent.tools}
+
+    assert tools["question_generator"].func("Senior Product Manager at Acme").startswith("Interview questions for Product Manager")
+    assert tools["mock_interview_simulator"].func("Pastry chef, 45 minute panel").startswith("Mock interview: Pastry Chef (")
+    assert len(calls) == 1
+
+
+
+def test_covered_roles_make_no_upstream_calls(monkeypatch):
+    from openai.resources.chat.completions import Completions
+    import agents.interview_agent as interview_agent
+
+    calls = []
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(question_bank, "_question_bank", seeded())
+    monkeypatch.setattr(Completions, "create", lambda self, **kwargs: calls.append(kwargs))
+    monkeypatch.setattr(interview_agent, "InterviewAgentLangChain", lambda: calls.append("agent built"))
+
+    answer = interview_agent.get_interview_questions("Senior Data Engineer")
+    assert answer.startswith("Interview questions for Data Engineer")
+    assert "Mock interview: Data Engineer" in answer
+    assert calls == []
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
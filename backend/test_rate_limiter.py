@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared upstream limiter
+Covers AIMD adjustment, fair queuing across routes and retry-after handling
+"""
+
+import threading
+import time
+
+from utils.rate_limiter import (
+    FairConcurrencyLimiter, TokenBucket, UpstreamLimiter, retry_after_seconds, upstream_queue
+)
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, headers=None):
+        super().__init__("rate limited")
+        self.response = FakeResponse(headers or {})
+
+
+def test_aimd_limit_adjusts():
+    limiter = FairConcurrencyLimiter(initial_limit=8, min_limit=1, max_limit=16, decrease_window=0)
+
+    limiter.acquire()
+    limiter.release(rate_limited=True)
+    assert limiter.limit == 4
+
+    for _ in range(8):
+        limiter.acquire()
+        limiter.release()
+    assert 5 < limiter.limit < 6
+
+
+def test_fair_queuing_alternates_between_queues():
+    limiter = FairConcurrencyLimiter(initial_limit=1, max_limit=1)
+    limiter.acquire("holder")
+    served = []
+
+    def worker(queue):
+        limiter.acquire(queue)
+        served.append(queue)
+        limiter.release()
+
+    # A burst on one route queues up before a single request on another
+    threads = [threading.Thread(target=worker, args=("career-advice",)) for _ in range(4)]
+    threads.append(threading.Thread(target=worker, args=("mock-interview",)))
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+
+    limiter.release()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert served.index("mock-interview") <= 1
+
+
+def test_retry_after_is_respected():
+    assert retry_after_seconds(FakeRateLimitError({"retry-after-ms": "250"})) == 0.25
+    assert retry_after_seconds(FakeRateLimitError({"retry-after": "2"})) == 2.0
+    assert retry_after_seconds(FakeRateLimitError({})) is None
+
+    limiter = UpstreamLimiter(max_retries=3, backoff_base=0.01, backoff_max=0.05)
+    attempts = []
+
+    def send():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise FakeRateLimitError({"retry-after": "0.02"})
+        return "ok"
+
+    with upstream_queue("career-advice"):
+        assert limiter.run(send) == "ok"
+
+    assert len(attempts) == 3
+    assert attempts[1] - attempts[0] >= 0.02
+    assert limiter.stats["rate_limited"] == 2
+    assert limiter.concurrency.limit < 8
+
+
+def test_non_transient_errors_are_not_retried():
+    limiter = UpstreamLimiter(max_retries=3)
+    attempts = []
+
+    def send():
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    try:
+        limiter.run(send)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert len(attempts) == 1
+
+
+def test_token_bucket_paces_requests():
+    bucket = TokenBucket(rate=100, capacity=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() > 0
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for agent request validation and size limits
+"""
+
+import io
+import json
+
+import pytest
+from flask import Flask
+
+import utils.request_validation as request_validation
+from utils.agent_pipeline import AgentEndpoint, AgentPipeline, BackgroundPersistence, ResponseCache
+from utils.request_validation import InputValidator, count_tokens
+from utils.structured_logging import configure_logging, flush_logging
+
+
+@pytest.fixture(autouse=True)
+def estimated_tokens(monkeypatch):
+    # No tokenizer download in tests: use the character estimate
+    monkeypatch.setattr(request_validation, "_encoding", None)
+    monkeypatch.setattr(request_validation, "_encoding_loaded", True)
+
+
+def make_client(validator, max_bytes=None):
+    app = Flask(__name__)
+    if max_bytes:
+        app.config["MAX_CONTENT_LENGTH"] = max_bytes
+    calls = []
+    pipeline = AgentPipeline(lambda evaluation, metadata: None, cache=ResponseCache(ttl=0),
+                             persistence=BackgroundPersistence(enabled=False))
+    pipeline.add_validator(validator)
+    pipeline.register(app, AgentEndpoint("mock-interview", "role", "questions",
+                                         lambda role, data, extras: calls.append(role) or "questions"))
+    return app.test_client(), calls
+
+
+def test_missing_and_malformed_input_is_a_400():
+    client, calls = make_client(InputValidator())
+    assert client.post("/mock-interview", data="", content_type="application/json").status_code == 400
+    assert client.post("/mock-interview", data="not json", content_type="application/json").status_code == 400
+    assert client.post("/mock-interview", json={"role": "  "}).get_json()["error"] == "'role' is required"
+    assert client.post("/mock-interview", json={"role": ["a"]}).status_code == 400
+    assert client.post("/mock-interview", json={"role": "Data Engineer"}).status_code == 200
+    assert calls == ["Data Engineer"]
+
+
+def test_oversized_fields_are_a_413_before_dispatch():
+    client, calls = make_client(InputValidator(limits={"role": 50, "context": 100}))
+    response = client.post("/mock-interview", json={"role": "x" * 51})
+    assert response.status_code == 413
+    assert response.get_json()["field"] == "role" and response.get_json()["limit"] == 50
+
+    response = client.post("/mock-interview", json={"role": "Engineer", "context": {"notes": "y" * 200}})
+    assert response.status_code == 413 and response.get_json()["field"] == "context"
+    assert not calls
+
+
+def test_token_budget_counts_input_and_context():
+    client, calls = make_client(InputValidator(limits={"role": 10_000, "context": 10_000}, token_budget=100))
+    assert client.post("/mock-interview", json={"role": "word " * 70}).status_code == 200
+    response = client.post("/mock-interview", json={"role": "word " * 70, "context": {"notes": "more " * 40}})
+    assert response.status_code == 413 and "tokens" in response.get_json()["error"]
+    assert len(calls) == 1
+
+
+def test_token_count_uses_tokenizer_when_available(monkeypatch):
+    class Encoding:
+        def encode(self, text, disallowed_special=()):
+            return list(text)
+
+    assert count_tokens("abcd" * 10) == 10
+    monkeypatch.setattr(request_validation, "_encoding", Encoding())
+    assert count_tokens("abcd" * 10) == 40
+
+
+
+def test_missing_tokenizer_is_reported_once(monkeypatch):
+    monkeypatch.setattr(request_validation, "_encoding_loaded", False)
+    monkeypatch.setattr(request_validation, "TOKENIZER_ENCODING", "no_such_encoding")
+    stream = io.StringIO()
+    configure_logging(level="INFO", log_format="json", stream=stream)
+
+    assert [count_tokens("one two three") for _ in range(3)] == [4, 4, 4]
+    flush_logging()
+    events = [json.loads(line)["event"] for line in stream.getvalue().splitlines()]
+    assert events.count("tokenizer.unavailable") == 1
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the learning resource catalog
+"""
+
+import time
+
+import utils.resource_catalog as resource_catalog
+from utils.resource_catalog import ResourceCatalog, format_resources, get_resource_catalog
+
+RESOURCES = [
+    {"title": "Intro to Pastry", "provider": "Bake School", "url": "https://example.com/pastry", "format": "course",
+     "level": "beginner", "topics": ["pastry", "baking"], "skills": [], "popularity": 100, "rating": 4.0},
+    {"title": "Intro to Pastry!", "provider": "Mirror Site", "format": "course",
+     "level": "beginner", "topics": ["pastry"], "skills": [], "popularity": 5, "rating": 3.0},
+    {"title": "Advanced Viennoiserie", "provider": "Bake School", "format": "book",
+     "level": "advanced", "topics": ["pastry", "lamination"], "skills": [], "popularity": 10, "rating": 4.9},
+    {"title": "Bread Baking Basics", "provider": "Crumb Club", "format": "practice",
+     "level": "beginner", "topics": ["bread", "baking"], "skills": [], "popularity": 100000, "rating": 4.5}
+]
+
+
+def test_duplicate_titles_are_indexed_once():
+    catalog = ResourceCatalog(RESOURCES)
+    assert [r["title"] for r in catalog.resources].count("Intro to Pastry") == 1
+    assert len(catalog.resources) == 3
+
+
+def test_ranking_uses_relevance_level_format_and_popularity():
+    catalog = ResourceCatalog(RESOURCES)
+    assert [r["title"] for r in catalog.search("pastry")][0] == "Intro to Pastry"
+    assert [r["title"] for r in catalog.search("pastry books")][0] == "Advanced Viennoiserie"
+    # Both match "baking" equally well; the far more popular one wins
+    assert [r["title"] for r in catalog.search("baking")][0] == "Bread Baking Basics"
+    assert [r["title"] for r in catalog.search("baking", level="advanced")] == []
+    assert [r["title"] for r in catalog.search("pastry", resource_format="book")] == ["Advanced Viennoiserie"]
+
+
+def test_level_or_format_words_alone_do_not_match():
+    catalog = ResourceCatalog(RESOURCES)
+    assert catalog.search("beginner courses") == []
+    assert catalog.search("underwater basket weaving") == []
+    assert catalog.stats == {"searches": 2, "hits": 0, "misses": 2}
+
+
+def test_seed_catalog_expands_skill_aliases_and_is_fast():
+    catalog = get_resource_catalog()
+    assert all("Kubernetes" in r["skills"] for r in catalog.search("k8s"))
+    assert catalog.search("k8s")
+
+    start = time.perf_counter()
+    for _ in range(200):
+        catalog.search("beginner python courses for data analysis")
+    assert (time.perf_counter() - start) / 200 < 0.005
+    assert format_resources(catalog.search("sql")[:1]).startswith("Recommended resources")
+
+
+def test_catalog_topics_only_ask_the_llm_to_sequence(monkeypatch):
+    import agents.learning_agent as learning_agent
+
+    prompts = []
+    monkeypatch.setattr(learning_agent, "sequence_resources",
+                        lambda topic, resources, context=None: prompts.append(resources) or "pathway")
+    monkeypatch.setattr(learning_agent, "LearningAgentLangChain", None)  # the agent must not be built
+
+    assert learning_agent.get_learning_resources("machine learning") == "pathway"
+    assert prompts[0][0]["title"] in {r["title"] for r in get_resource_catalog().search("machine learning")}
+
+
+def test_curator_tool_answers_from_catalog(monkeypatch):
+    from agents.learning_agent import LearningAgentLangChain
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(resource_catalog, "_catalog", ResourceCatalog(RESOURCES))
+    agent = LearningAgentLangChain()
+    calls = []
+    monkeypatch.setattr(agent.cascade, "invoke", lambda tool_name, prompt: calls.append(prompt) or "ok")
+    tools = {tool.name: tool for tool in agent.tools}
+
+    assert "1. Intro to Pastry (Bake School)" in tools["resource_curator"].func("pastry")
+    assert not calls
+    tools["learning_pathway_architect"].func("pastry")
+    assert "Advanced Viennoiserie" in calls[0] and "Bread Baking Basics" not in calls[0]
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for the once-per-response evaluation shared by the agent endpoints
+"""
+
+import os
+
+import utils.evaluation as evaluation
+from utils.evaluation import ResponseEvaluation, calculate_response_metrics
+from utils.analytics_store import AnalyticsStore, set_analytics_store
+
+ADVICE = """### Next steps
+1. Build one ML project end to end; it raised interview callbacks by 30% for past learners.
+2. **Practice** system design and consider a mentor in the industry.
+"""
+
+
+def test_evaluation_is_computed_once_and_shared(monkeypatch):
+    calls = []
+    original = evaluation.calculate_response_metrics
+    monkeypatch.setattr(evaluation, "calculate_response_metrics", lambda *args: calls.append(args) or original(*args))
+
+    result = ResponseEvaluation("career-advice", "Move into ML?", ADVICE, 1.234)
+    summary = result.summary()
+    stored = result.evaluation_entry({"user_id": "u1"})
+    conversation = result.conversation_entry()
+
+    assert len(calls) == 1
+    assert summary == {"quality_score": result.quality["quality_score"], "quality_grade": result.quality["quality_grade"],
+                       "response_time": 1.23, "response_id": result.response_id}
+    assert stored["metrics"]["response_id"] == result.response_id
+    assert stored["timestamp"] == conversation["timestamp"] == result.timestamp
+    assert result.metrics == calculate_response_metrics("Move into ML?", ADVICE, 1.234)
+
+
+def test_quantified_data_detection():
+    assert calculate_response_metrics("q", "grew revenue 12 %", 1)["has_quantified_data"]
+    assert not calculate_response_metrics("q", "grew revenue 12 points, then %", 1)["has_quantified_data"]
+
+
+def test_endpoint_persists_and_returns_the_same_evaluation(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.chdir(tmp_path)
+    import app as app_module
+
+    store = AnalyticsStore(os.path.join(tmp_path, "analytics.db"), flush_interval=0)
+    set_analytics_store(store)
+    import utils.agent_pipeline as agent_pipeline
+    monkeypatch.setattr(app_module, "get_career_advice", lambda query: ADVICE)
+    created = []
+    monkeypatch.setattr(agent_pipeline, "ResponseEvaluation", lambda *args: created.append(ResponseEvaluation(*args)) or created[-1])
+
+    client = app_module.app.test_client()
+    body = client.post("/career-advice", json={"query": "Move into ML?", "trace": True}).get_json()
+    app_module.AGENT_PIPELINE.persistence.drain()
+    try:
+        assert len(created) == 1
+        assert body["evaluation"] == created[0].summary()
+        assert store.evaluations(limit=1)[0]["metrics"]["response_id"] == body["evaluation"]["response_id"]
+        assert store.recent_conversations(1)[0]["ai_response"] == ADVICE
+        feedback = client.post("/feedback", json={"response_id": body["evaluation"]["response_id"], "rating": 5})
+        assert feedback.status_code == 200
+    finally:
+        set_analytics_store(None)
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for the pluggable JSON serializers and record schemas
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+from flask import Flask, jsonify, request
+
+from utils.evaluation import METRICS_SCHEMA, QUALITY_SCHEMA, ResponseEvaluation
+from utils.serialization import SERIALIZERS, RecordSchema, SerializerJSONProvider, create_serializer
+
+EVALUATION = ResponseEvaluation("career-advice", "How do I grow? ✓", "### Plan\n1. **Grow** 20% — practice\n" * 20, 1.5)
+
+
+@pytest.mark.parametrize("backend", sorted(SERIALIZERS))
+def test_backends_round_trip_like_the_json_module(backend):
+    serializer = create_serializer(backend)
+    record = EVALUATION.evaluation_entry({"user_context": {"role": "engineer"}}, {"framework": "LangChain"})
+
+    encoded = serializer.dumps(record)
+    assert isinstance(encoded, bytes) and b": " not in encoded  # compact
+    assert "✓" in serializer.dumps_text(record)  # UTF-8, not \\u escapes
+    assert serializer.loads(encoded) == json.loads(json.dumps(record))
+    assert serializer.loads(encoded.decode()) == serializer.loads(encoded)
+
+
+@pytest.mark.parametrize("backend", sorted(SERIALIZERS))
+def test_backends_handle_unusual_values_and_bad_input(backend):
+    serializer = create_serializer(backend)
+    when = datetime(2024, 1, 2, 3, 4, 5)
+    decoded = serializer.loads(serializer.dumps({"when": when, 3: "three"}))
+    assert decoded["3"] == "three"
+    assert decoded["when"].startswith("2024-01-02")
+    with pytest.raises(ValueError):
+        serializer.loads(b"{not json")
+
+
+def test_unknown_backend_falls_back():
+    assert create_serializer("no-such-backend").name in SERIALIZERS
+
+
+def test_record_schema_fixes_order_fills_defaults_and_keeps_extras():
+    schema = RecordSchema("example", {"score": 0, "tags": [], "grade": "D"})
+    assert list(json.loads(schema.encode({"grade": "A", "extra": 1, "score": 9}))) == ["score", "tags", "grade", "extra"]
+
+    first, second = schema.decode('{"score": 3}'), schema.decode(None)
+    assert first == {"score": 3, "tags": [], "grade": "D"}
+    first["tags"].append("x")
+    assert second["tags"] == [] and schema.fields["tags"] == []
+
+
+def test_evaluation_schemas_match_the_evaluation_record():
+    assert list(METRICS_SCHEMA.fields) == list(EVALUATION.metrics)
+    assert list(QUALITY_SCHEMA.fields) == list(EVALUATION.quality)
+    assert METRICS_SCHEMA.decode(METRICS_SCHEMA.encode(EVALUATION.metrics)) == EVALUATION.metrics
+
+
+def test_flask_provider_serves_compact_json_and_parses_requests():
+    app = Flask(__name__)
+    app.json = SerializerJSONProvider(app)
+
+    @app.route("/echo", methods=["POST"])
+    def echo():
+        data = request.get_json(silent=True)
+        return jsonify({"received": data, "zeta": 1, "alpha": 2})
+
+    client = app.test_client()
+    response = client.post("/echo", json={"query": "héllo"})
+    assert response.get_data(as_text=True) == '{"received":{"query":"héllo"},"zeta":1,"alpha":2}\n'
+    assert response.mimetype == "application/json"
+
+    bad = client.post("/echo", data="{oops", content_type="application/json")
+    assert bad.get_json()["received"] is None
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for session record/replay
+Records upstream calls against a stubbed OpenAI client, then replays them offline
+"""
+
+from openai.resources.chat.completions import Completions
+from openai.types.chat import ChatCompletion
+
+import utils.openai_helper as openai_helper
+from utils.session_replay import SessionRecorder, ReplayMissError, set_session_recorder, MODE_RECORD, MODE_REPLAY
+
+
+def fake_completion(content):
+    return ChatCompletion.model_validate({
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-3.5-turbo",
+        "choices": [{
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": content}
+        }],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+    })
+
+
+def stub_upstream(monkeypatch, calls):
+    def create(self, **kwargs):
+        calls.append(kwargs)
+        return fake_completion(f"Answer #{len(calls)} for: {kwargs['messages'][-1]['content'][:40]}")
+
+    monkeypatch.setattr(Completions, "create", create)
+
+
+def block_upstream(monkeypatch):
+    def create(self, **kwargs):
+        raise AssertionError("replay mode must not reach the network")
+
+    monkeypatch.setattr(Completions, "create", create)
+
+
+def test_agentic_completion_record_then_replay(monkeypatch, tmp_path):
+    """Recorded completions replay identically without touching the network"""
+    session_file = str(tmp_path / "session.jsonl")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    openai_helper.setup_openai()
+
+    calls = []
+    stub_upstream(monkeypatch, calls)
+    set_session_recorder(SessionRecorder(MODE_RECORD, session_file))
+    try:
+        first = openai_helper.agentic_completion("system", "How do I become a data engineer?")
+        second = openai_helper.agentic_completion("system", "How do I become a data engineer?")
+        assert len(calls) == 2
+
+        block_upstream(monkeypatch)
+        replayer = SessionRecorder(MODE_REPLAY, session_file)
+        set_session_recorder(replayer)
+
+        # Identical requests replay in recorded order
+        assert openai_helper.agentic_completion("system", "How do I become a data engineer?") == first
+        assert openai_helper.agentic_completion("system", "How do I become a data engineer?") == second
+        assert replayer.stats["replayed"] == 2
+
+        try:
+            openai_helper.agentic_completion("system", "An unrecorded question")
+            assert False, "expected a replay miss"
+        except ReplayMissError:
+            pass
+    finally:
+        set_session_recorder(None)
+
+
+def test_agent_session_replays_offline(monkeypatch, tmp_path):
+    """A full LangChain agent run replays from the recorded session"""
+    from agents.career_agent import get_career_advice
+
+    session_file = str(tmp_path / "session.jsonl")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    calls = []
+    stub_upstream(monkeypatch, calls)
+    set_session_recorder(SessionRecorder(MODE_RECORD, session_file))
+    try:
+        recorded = get_career_advice("Should I move from QA into DevOps?")
+        assert calls, "agent should have called the upstream model"
+
+        block_upstream(monkeypatch)
+        monkeypatch.delenv("OPENAI_API_KEY")
+        set_session_recorder(SessionRecorder(MODE_REPLAY, session_file, latency_scale=0.0))
+
+        assert get_career_advice("Should I move from QA into DevOps?") == recorded
+    finally:
+        set_session_recorder(None)
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
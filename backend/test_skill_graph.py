@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script for the skill taxonomy graph and structured gap lookups
+"""
+
+from utils.skill_graph import SkillGraph, get_skill_graph, gap_facts
+
+SKILLS = [
+    {"skill": "Python", "aliases": ["py"]},
+    {"skill": "Statistics"},
+    {"skill": "Machine Learning", "aliases": ["scikit-learn"], "prerequisites": ["Python", "Statistics"]},
+    {"skill": "Deep Learning", "aliases": ["pytorch"], "prerequisites": ["Machine Learning"]},
+    {"skill": "Docker", "prerequisites": ["Linux"]},
+    {"skill": "MLOps", "prerequisites": ["Deep Learning", "Docker"]}
+]
+ROLES = [{"role": "ML Engineer", "aliases": ["machine learning engineer"], "must_have_skills": ["MLOps", "Deep Learning"], "preferred_skills": ["Docker"]}]
+
+
+def test_prerequisite_closure_is_transitive():
+    graph = SkillGraph(SKILLS, ROLES)
+    assert graph.prerequisites_of("MLOps") == ["Python", "Statistics", "Linux", "Machine Learning", "Docker", "Deep Learning"]
+
+
+def test_gap_orders_missing_skills_by_prerequisites():
+    gap = SkillGraph(SKILLS, ROLES).gap("Python and statistics, some scikit-learn", "Senior Machine Learning Engineer")
+
+    assert gap["role"] == "ML Engineer"
+    assert gap["skills_detected"] == ["Python", "Statistics", "Machine Learning"]
+    assert gap["missing_must_have"] == ["Deep Learning", "MLOps"]
+    assert gap["missing_foundations"] == ["Linux", "Docker"]
+    assert gap["learning_path"] == ["Linux", "Docker", "Deep Learning", "MLOps"]
+    assert gap["coverage"] == 0.43  # 3 of 7 required skills, prerequisites included
+
+
+def test_listed_skills_imply_their_prerequisites():
+    gap = SkillGraph(SKILLS, ROLES).gap("PyTorch", "ML Engineer")
+    assert "Machine Learning" not in gap["missing_foundations"]
+    assert gap["missing_must_have"] == ["MLOps"]
+
+
+def test_unknown_role_returns_none():
+    assert SkillGraph(SKILLS, ROLES).gap("Python", "Pastry chef") is None
+
+
+def test_bundled_graph_covers_role_requirements():
+    graph = get_skill_graph()
+    gap = graph.gap("Python, SQL, Excel, statistics", "data scientist")
+    assert gap["matched_must_have"] == ["Python", "SQL", "Statistics"]
+    assert "Machine Learning" in gap["missing_must_have"]
+    assert gap_facts(gap)[0].startswith("Target role: Data Scientist")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
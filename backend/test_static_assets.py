@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for fingerprinted, precompressed static asset serving
+"""
+
+import gzip
+
+import pytest
+from flask import Flask
+
+from utils.compression import BROTLI_AVAILABLE
+from utils.static_assets import IMMUTABLE_CACHE_CONTROL, AssetRegistry
+
+SCRIPT = "function greet(name) { return 'Hello, ' + name; }\n" * 40
+PAGE = """<html><head><link href="css/site.css" rel="stylesheet"></head>
+<body><script src="/js/app.js"></script><script src="https://cdn.example.com/lib.js"></script>
+<script src="js/missing.js"></script></body></html>
+"""
+
+
+@pytest.fixture
+def frontend(tmp_path):
+    (tmp_path / "js").mkdir()
+    (tmp_path / "css").mkdir()
+    (tmp_path / "index.html").write_text(PAGE)
+    (tmp_path / "js" / "app.js").write_text(SCRIPT)
+    (tmp_path / "css" / "site.css").write_text("body { margin: 0; }\n")
+    return tmp_path
+
+
+def make_client(frontend):
+    registry = AssetRegistry([("", str(frontend), False), ("css/", str(frontend / "css"), True),
+                              ("js/", str(frontend / "js"), True)])
+    app = Flask(__name__)
+    app.add_url_rule("/<path:path>", "asset", lambda path: registry.serve(path))
+    return app.test_client(), registry
+
+
+def test_pages_reference_fingerprinted_assets(frontend):
+    client, registry = make_client(frontend)
+    page = client.get("/index.html").get_data(as_text=True)
+    assert f'src="/js/app.js?v={registry.version("js/app.js")}"' in page
+    assert f'href="css/site.css?v={registry.version("css/site.css")}"' in page
+    assert 'src="https://cdn.example.com/lib.js"' in page
+    assert 'src="js/missing.js"' in page
+
+
+def test_versioned_urls_are_immutable_and_others_revalidate(frontend):
+    client, registry = make_client(frontend)
+    version = registry.version("js/app.js")
+    assert client.get(f"/js/app.js?v={version}").headers["Cache-Control"] == IMMUTABLE_CACHE_CONTROL
+    assert client.get("/js/app.js").headers["Cache-Control"] == "no-cache"
+    assert client.get("/js/app.js?v=stale").headers["Cache-Control"] == "no-cache"
+    assert client.get("/index.html").headers["Cache-Control"] == "no-cache"
+
+
+def test_precompressed_variant_is_negotiated(frontend):
+    client, _ = make_client(frontend)
+    response = client.get("/js/app.js", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(response.get_data()).decode() == SCRIPT
+
+    plain = client.get("/js/app.js")
+    assert "Content-Encoding" not in plain.headers
+    assert plain.get_data(as_text=True) == SCRIPT
+    assert plain.headers["ETag"] != response.headers["ETag"]
+
+    # Too small to be worth compressing
+    small = client.get("/css/site.css", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers and "Vary" not in small.headers
+
+
+@pytest.mark.skipif(not BROTLI_AVAILABLE, reason="brotli is not installed")
+def test_brotli_is_preferred_when_available(frontend):
+    client, _ = make_client(frontend)
+    response = client.get("/js/app.js", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+
+
+def test_matching_etag_gets_304(frontend):
+    client, registry = make_client(frontend)
+    etag = client.get("/js/app.js", headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    response = client.get("/js/app.js", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304 and response.get_data() == b""
+    assert response.headers["ETag"] == etag
+    # Any representation of the same content validates, as does a weak comparison
+    assert client.get("/js/app.js", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+    assert client.get("/js/app.js", headers={"If-None-Match": '"other"'}).status_code == 200
+    assert registry.stats["not_modified"] == 2
+
+
+def test_unknown_paths_are_404_and_changes_are_detected(frontend):
+    client, registry = make_client(frontend)
+    assert client.get("/js/nope.js").status_code == 404
+    assert client.get("/../secrets.txt").status_code == 404
+    assert not registry.stale()
+    (frontend / "js" / "new.js").write_text("console.log(1);")
+    assert registry.stale()
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script for structured, queue-based logging
+"""
+
+import io
+import json
+import queue
+import logging
+from types import SimpleNamespace
+
+import utils.structured_logging as structured_logging
+from utils.structured_logging import (
+    NonBlockingQueueHandler, agent_trace_scope, configure_logging, flush_logging, get_logger, trace_config
+)
+
+
+def captured_lines(stream):
+    flush_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_json_with_truncated_fields():
+    stream = io.StringIO()
+    configure_logging(level="DEBUG", log_format="json", sample_rate=1.0, stream=stream)
+    log = get_logger("test")
+    log.debug("request.received", endpoint="career-advice", query="x" * 5000, chars=12)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        log.warning("request.failed", exc_info=True)
+
+    first, second = captured_lines(stream)
+    assert first["event"] == "request.received" and first["level"] == "DEBUG"
+    assert first["logger"] == "career_agent.test" and first["chars"] == 12
+    assert first["query"].startswith("xxx") and first["query"].endswith("(+4700 chars)")
+    assert second["level"] == "WARNING" and "ValueError: boom" in second["exception"]
+
+
+def test_level_and_sampling_drop_only_low_severity_records():
+    stream = io.StringIO()
+    configure_logging(level="INFO", sample_rate=0.0, stream=stream)
+    log = get_logger("test")
+    log.debug("hidden.by_level")
+    for _ in range(50):
+        log.info("hidden.by_sampling")
+    log.error("always.kept")
+
+    assert [line["event"] for line in captured_lines(stream)] == ["always.kept"]
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(2))
+    logger = logging.getLogger("career_agent.test.queue")
+    logger.propagate = False
+    logger.addHandler(handler)
+    for i in range(5):
+        logger.warning("event %d", i)
+    logger.removeHandler(handler)
+    assert handler.queue.qsize() == 2 and handler.dropped == 3
+
+
+def test_agent_trace_is_opt_in_per_request(monkeypatch):
+    monkeypatch.setattr(structured_logging, "AGENT_VERBOSE", False)
+    assert trace_config("career") == {}
+    with agent_trace_scope(True):
+        callbacks = trace_config("career")["config"]["callbacks"]
+    assert trace_config("career") == {}
+
+    stream = io.StringIO()
+    configure_logging(level="INFO", sample_rate=1.0, stream=stream)
+    callbacks[0].on_agent_action(SimpleNamespace(tool="salary_lookup", tool_input="data engineer"))
+    callbacks[0].on_agent_finish(SimpleNamespace(return_values={"output": "done"}))
+    lines = captured_lines(stream)
+    assert [line["event"] for line in lines] == ["agent.action", "agent.finish"]
+    assert lines[0]["tool"] == "salary_lookup" and lines[0]["agent"] == "career"
+
+
+def teardown_module():
+    configure_logging()
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
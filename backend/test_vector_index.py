@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent vector index and resume matcher
+Uses a deterministic bag-of-words embedder so no upstream calls are made
+"""
+
+import re
+import zlib
+
+import numpy as np
+
+from utils.embedding_service import EmbeddingService
+from utils.vector_index import PersistentVectorIndex, ResumeMatcher, content_hash
+
+RESUME = """
+Senior data engineer with 6 years building Spark and Airflow pipelines on AWS.
+Led migration of the analytics warehouse to Snowflake, cutting query costs by 40%.
+Mentored four engineers and introduced data quality checks with Great Expectations.
+"""
+
+JOB_DESCRIPTION = """
+We are hiring a data engineer to own Airflow pipelines and our Snowflake warehouse on AWS.
+Experience with data quality tooling and mentoring engineers is a plus.
+"""
+
+UNRELATED_JOB = """
+Pastry chef wanted for a busy bakery. Laminated doughs, croissants and wedding cakes.
+"""
+
+
+class CountingEmbedder:
+    def __init__(self, dim=64):
+        self.dim = dim
+        self.name = "counting"
+        self.texts_embedded = 0
+
+    def embed(self, texts):
+        self.texts_embedded += len(texts)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"[a-z]+", text.lower()):
+                vectors[row, zlib.crc32(word.encode()) % self.dim] += 1.0
+        return vectors
+
+
+def test_repeat_analysis_needs_no_new_embeddings(tmp_path):
+    embedder = CountingEmbedder()
+    matcher = ResumeMatcher(EmbeddingService(embedder, PersistentVectorIndex(str(tmp_path))))
+
+    first = matcher.analyze(RESUME, JOB_DESCRIPTION)
+    embedded_once = embedder.texts_embedded
+    assert embedded_once > 0
+
+    second = matcher.analyze(RESUME, JOB_DESCRIPTION)
+    assert embedder.texts_embedded == embedded_once
+    assert second["match_score"] == first["match_score"]
+
+
+def test_index_persists_across_processes(tmp_path):
+    PersistentVectorIndex(str(tmp_path)).add(["a", "b"], np.eye(2, dtype=np.float32))
+
+    reopened = PersistentVectorIndex(str(tmp_path))
+    assert len(reopened) == 2
+    assert reopened.missing(["a", "c"]) == ["c"]
+    np.testing.assert_array_equal(reopened.get(["b"]), [[0.0, 1.0]])
+
+
+def test_indexes_sharing_a_directory_see_each_others_rows(tmp_path):
+    worker_a, worker_b = PersistentVectorIndex(str(tmp_path)), PersistentVectorIndex(str(tmp_path))
+    worker_a.add(["a"], [[1.0, 0.0, 0.0]])
+    worker_b.add(["b"], [[0.0, 1.0, 0.0]])
+    worker_a.add(["b", "c"], [[9.0, 9.0, 9.0], [0.0, 0.0, 1.0]])
+
+    reopened = PersistentVectorIndex(str(tmp_path))
+    assert len(reopened) == 3
+    np.testing.assert_array_equal(reopened.get(["a", "b", "c"]), np.eye(3, dtype=np.float32))
+
+
+def test_torn_vector_write_is_discarded(tmp_path):
+    PersistentVectorIndex(str(tmp_path)).add(["a"], [[1.0, 2.0]])
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(b"\x00" * 5)  # a crash after writing vectors, before their keys
+
+    index = PersistentVectorIndex(str(tmp_path))
+    index.add(["b"], [[3.0, 4.0]])
+    np.testing.assert_array_equal(PersistentVectorIndex(str(tmp_path)).get(["a", "b"]), [[1.0, 2.0], [3.0, 4.0]])
+
+
+def test_related_job_scores_higher(tmp_path):
+    matcher = ResumeMatcher(EmbeddingService(CountingEmbedder(), PersistentVectorIndex(str(tmp_path))))
+
+    related = matcher.analyze(RESUME, JOB_DESCRIPTION)
+    unrelated = matcher.analyze(RESUME, UNRELATED_JOB)
+    assert related["match_score"] > unrelated["match_score"]
+    assert related["strongest_alignments"][0]["evidence"]
+
+
+def test_content_hash_is_stable():
+    assert content_hash("python") == content_hash("python")
+    assert content_hash("python") != content_hash("Python")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,178 @@
+"""
+Admission Control
+Per-client token buckets weighted by endpoint cost, plus a ceiling on concurrent
+agent runs, so one client or a burst cannot monopolize upstream capacity
+"""
+
+import os
+import math
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from flask import request, session
+
+from utils.agent_pipeline import RequestRejected
+from utils.analytics_store import BACKEND_DIR, open_database
+from utils.metrics import ADMISSION_REJECTIONS
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+# Budget units refilled per minute and the most a client can bank for a burst
+RATE_PER_MINUTE = float(os.getenv("ADMISSION_RATE_PER_MINUTE", "60"))
+BURST = float(os.getenv("ADMISSION_BURST", "30"))
+# Every admitted request pays this; a request that runs its agent pays the rest of its endpoint cost
+CACHE_HIT_COST = float(os.getenv("ADMISSION_CACHE_HIT_COST", "1"))
+# Ceiling on concurrent agent runs across all workers; each worker enforces an equal share
+MAX_CONCURRENT_AGENT_RUNS = int(os.getenv("ADMISSION_MAX_CONCURRENT", "8"))
+SLOT_WAIT_SECONDS = float(os.getenv("ADMISSION_SLOT_WAIT", "2"))
+ADMISSION_BACKEND = os.getenv("ADMISSION_BACKEND", "memory")  # "memory" or "sqlite"
+# Resolved against the backend directory so every worker opens the same quota file
+ADMISSION_DB = os.path.join(BACKEND_DIR, os.getenv("ADMISSION_DB", "quotas.db"))
+TRUST_PROXY = os.getenv("ADMISSION_TRUST_PROXY", "false").lower() in ("1", "true", "yes")
+
+MAX_MEMORY_CLIENTS = 50000
+
+
+class MemoryQuotaStore:
+    """Token buckets for this process"""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def apply(self, key: str, cost: float, rate: float, capacity: float, enforce: bool) -> Tuple[bool, float]:
+        """Refill `key`'s bucket and take `cost`; returns (taken, seconds until it would be)
+
+        With `enforce` off the cost is always taken and may leave the bucket
+        in debt (down to -capacity), which delays the client's next request.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens, allowed, retry_after = _take(tokens, updated, now, cost, rate, capacity, enforce)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > MAX_MEMORY_CLIENTS:
+                self._prune(now, rate, capacity)
+        return allowed, retry_after
+
+    def _prune(self, now: float, rate: float, capacity: float):
+        # Buckets that have refilled completely are indistinguishable from new ones
+        self._buckets = {key: (tokens, updated) for key, (tokens, updated) in self._buckets.items()
+                         if tokens + (now - updated) * rate < capacity}
+
+
+class SQLiteQuotaStore:
+    """Token buckets in a SQLite file shared by every worker process"""
+
+    def __init__(self, db_path: str = ADMISSION_DB):
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = open_database(self.db_path)
+            self._conn.isolation_level = None
+            self._conn.execute("CREATE TABLE IF NOT EXISTS quotas (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+            self._pid = os.getpid()
+        return self._conn
+
+    def apply(self, key: str, cost: float, rate: float, capacity: float, enforce: bool) -> Tuple[bool, float]:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated FROM quotas WHERE key = ?", (key,)).fetchone()
+                tokens, updated = row if row else (capacity, now)
+                tokens, allowed, retry_after = _take(tokens, updated, now, cost, rate, capacity, enforce)
+                conn.execute("INSERT OR REPLACE INTO quotas (key, tokens, updated) VALUES (?, ?, ?)", (key, tokens, now))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return allowed, retry_after
+
+
+def _take(tokens: float, updated: float, now: float, cost: float, rate: float, capacity: float,
+          enforce: bool) -> Tuple[float, bool, float]:
+    tokens = min(capacity, tokens + max(now - updated, 0.0) * rate)
+    if enforce and tokens < cost:
+        return tokens, False, (cost - tokens) / rate if rate > 0 else math.inf
+    return max(tokens - cost, -capacity), True, 0.0
+
+
+def client_key() -> str:
+    """The logged-in user, else the client address (the first X-Forwarded-For hop behind a trusted proxy)"""
+    user_id = session.get("user_id")
+    if user_id:
+        return f"user:{user_id}"
+    address = request.remote_addr or "unknown"
+    if TRUST_PROXY and request.headers.get("X-Forwarded-For"):
+        address = request.headers["X-Forwarded-For"].split(",")[0].strip()
+    return f"ip:{address}"
+
+
+class AdmissionController:
+    """Pipeline admission stage
+
+    admit() charges the cache-hit cost up front and rejects clients that
+    cannot afford it; charge_dispatch() bills the rest of the endpoint cost
+    once the agent actually runs. worker_slot() bounds concurrent agent
+    runs in this worker to its share of `max_concurrent`: the semaphore is
+    per process, so set_workers() splits the ceiling after a fork.
+    """
+
+    def __init__(self, store=None, rate_per_minute: float = RATE_PER_MINUTE, burst: float = BURST,
+                 cache_hit_cost: float = CACHE_HIT_COST, max_concurrent: int = MAX_CONCURRENT_AGENT_RUNS,
+                 slot_wait: float = SLOT_WAIT_SECONDS, workers: int = 1):
+        self.store = store or MemoryQuotaStore()
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.cache_hit_cost = cache_hit_cost
+        self.slot_wait = slot_wait
+        self.max_concurrent = max_concurrent
+        self.set_workers(workers)
+        self.stats = {"admitted": 0, "rejected_quota": 0, "rejected_busy": 0}
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        store = SQLiteQuotaStore() if ADMISSION_BACKEND == "sqlite" else MemoryQuotaStore()
+        return cls(store)
+
+    def set_workers(self, workers: int):
+        """Give this worker its share of the concurrency ceiling; call before it serves requests"""
+        self.max_concurrent_per_worker = max(self.max_concurrent // max(workers, 1), 1)
+        self._worker_slots = threading.BoundedSemaphore(self.max_concurrent_per_worker)
+
+    def admit(self, endpoint: str) -> str:
+        client = client_key()
+        allowed, retry_after = self.store.apply(client, self.cache_hit_cost, self.rate, self.burst, enforce=True)
+        if not allowed:
+            self.stats["rejected_quota"] += 1
+            ADMISSION_REJECTIONS.labels(endpoint, "quota").inc()
+            retry = max(1, math.ceil(retry_after))
+            raise RequestRejected("Too many requests, please retry later", status=429,
+                                  headers={"Retry-After": str(retry)}, retry_after=retry)
+        self.stats["admitted"] += 1
+        return client
+
+    def charge_dispatch(self, client: str, endpoint_cost: float):
+        extra = endpoint_cost - self.cache_hit_cost
+        if extra > 0:
+            self.store.apply(client, extra, self.rate, self.burst, enforce=False)
+
+    @contextmanager
+    def worker_slot(self, endpoint: str):
+        if not self._worker_slots.acquire(timeout=self.slot_wait):
+            self.stats["rejected_busy"] += 1
+            ADMISSION_REJECTIONS.labels(endpoint, "busy").inc()
+            raise RequestRejected("Server is busy, please retry shortly", status=429,
+                                  headers={"Retry-After": "1"}, retry_after=1)
+        try:
+            yield
+        finally:
+            self._worker_slots.release()
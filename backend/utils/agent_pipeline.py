@@ -0,0 +1,338 @@
+"""
+Agent Endpoint Pipeline
+One request path for every agent route: parse, validate, cache lookup,
+dispatch, evaluate, persist in the background and respond
+"""
+
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from flask import Flask, jsonify, request
+
+from utils.deadline import deadline_scope, time_left
+from utils.evaluation import ResponseEvaluation
+from utils.metrics import CACHE_LOOKUPS
+from utils.profiler import get_profiler
+from utils.rate_limiter import upstream_queue
+from utils.structured_logging import agent_trace_scope, get_logger
+
+REQUEST_DEADLINE_SECONDS = float(os.getenv("AGENT_REQUEST_DEADLINE", "45"))
+RESPONSE_CACHE_TTL = float(os.getenv("AGENT_RESPONSE_CACHE_TTL", "600"))  # 0 disables the cache
+RESPONSE_CACHE_SIZE = int(os.getenv("AGENT_RESPONSE_CACHE_SIZE", "512"))
+PERSIST_ASYNC = os.getenv("AGENT_PERSIST_ASYNC", "true").lower() in ("1", "true", "yes")
+# Responses graded below this are answered but never cached (errors, apologies, empty answers)
+UNCACHEABLE_GRADES = {"D"}
+
+_WHITESPACE = re.compile(r"\s+")
+
+log = get_logger("pipeline")
+
+
+class RequestRejected(Exception):
+    """Raised by a pipeline stage to answer the request with `status` instead of running the agent"""
+
+    def __init__(self, message: str, status: int = 400, headers: Optional[Dict[str, str]] = None, **details: Any):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+        self.details = details
+
+
+def request_deadline(data: Dict[str, Any]) -> float:
+    """Deadline for an agent request: the configured ceiling, or a shorter one asked for by the client"""
+    try:
+        requested = float(data.get("deadline_seconds") or REQUEST_DEADLINE_SECONDS)
+    except (TypeError, ValueError):
+        requested = REQUEST_DEADLINE_SECONDS
+    return max(min(requested, REQUEST_DEADLINE_SECONDS), 1.0)
+
+
+def trace_requested(data: Dict[str, Any]) -> bool:
+    """Per-request agent step tracing: "trace": true in the body or an X-Agent-Trace: 1 header"""
+    return bool(data.get("trace")) or request.headers.get("X-Agent-Trace") == "1"
+
+
+class AgentEndpoint:
+    """Registration for one agent route
+
+    `dispatch(user_input, data, extras)` produces the answer text. `prepare`
+    runs before the cache lookup and returns extra response fields that the
+    dispatcher can also use (e.g. locally ranked resources). `cache_fields`
+    name the request options that change the answer, and `metadata(data)`
+    is stored with the conversation and evaluation. `cost` is the admission
+    budget an agent run uses.
+    """
+
+    def __init__(self, name: str, input_field: str, result_key: str,
+                 dispatch: Callable[[str, Dict[str, Any], Dict[str, Any]], str],
+                 prepare: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]] = None,
+                 cache_fields: Sequence[str] = (),
+                 metadata: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+                 cost: float = 5.0):
+        self.name = name
+        self.input_field = input_field
+        self.result_key = result_key
+        self.dispatch = dispatch
+        self.prepare = prepare
+        self.cache_fields = tuple(cache_fields)
+        self.metadata = metadata or (lambda data: {"user_context": data.get("context", {})})
+        self.cost = cost
+
+
+class ResponseCache:
+    """LRU of answer texts with a time-to-live, keyed by endpoint, normalized input and options"""
+
+    def __init__(self, ttl: float = RESPONSE_CACHE_TTL, max_entries: int = RESPONSE_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> (expiry on the monotonic clock, answer)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    @staticmethod
+    def key(endpoint: str, user_input: str, options: Sequence[Any] = ()) -> str:
+        normalized = _WHITESPACE.sub(" ", user_input).strip().lower()
+        return hashlib.sha256(repr((endpoint, normalized, tuple(options))).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, result: str):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            self.stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class BackgroundPersistence:
+    """Runs persistence off the request thread on a single worker, recreated after fork"""
+
+    def __init__(self, enabled: bool = PERSIST_ASYNC):
+        self.enabled = enabled
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persist")
+                self._pid = os.getpid()
+            return self._executor
+
+    def submit(self, fn: Callable, *args: Any):
+        if not self.enabled:
+            fn(*args)
+            return
+        self._get_executor().submit(self._run, fn, *args)
+
+    @staticmethod
+    def _run(fn: Callable, *args: Any):
+        try:
+            with get_profiler().background_work("persist"):
+                fn(*args)
+        except Exception as e:
+            log.warning("persistence.failed", error=e)
+
+    def drain(self, timeout: Optional[float] = 10.0):
+        """Wait until everything submitted so far has been persisted"""
+        if self.enabled and self._executor is not None and self._pid == os.getpid():
+            self._executor.submit(lambda: None).result(timeout=timeout)
+
+
+class AgentPipeline:
+    """parse -> validate -> cache lookup -> dispatch -> evaluate -> persist (async) -> respond
+
+    Validators are called with (endpoint, data, user_input) and raise
+    RequestRejected to stop a request before any agent work; the optional
+    admission controller then charges the client and bounds concurrent
+    agent runs. Identical requests that arrive while one is already running
+    wait for its answer instead of dispatching again.
+    """
+
+    def __init__(self, persist: Callable[[ResponseEvaluation, Dict[str, Any]], None],
+                 cache: Optional[ResponseCache] = None, persistence: Optional[BackgroundPersistence] = None,
+                 admission=None):
+        self.persist = persist
+        self.admission = admission
+        self.cache = cache or ResponseCache()
+        self.persistence = persistence or BackgroundPersistence()
+        self.validators: List[Callable[[AgentEndpoint, Dict[str, Any], str], None]] = []
+        self.endpoints: Dict[str, AgentEndpoint] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "rejected": 0, "coalesced": 0}
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def add_validator(self, validator: Callable[[AgentEndpoint, Dict[str, Any], str], None]):
+        self.validators.append(validator)
+
+    def register(self, app: Flask, endpoint: AgentEndpoint):
+        """Serve `endpoint` at POST /<name>"""
+        self.endpoints[endpoint.name] = endpoint
+        app.add_url_rule(f"/{endpoint.name}", endpoint=endpoint.name.replace("-", "_"),
+                         view_func=lambda: self.handle(endpoint), methods=["POST"])
+
+    def handle(self, endpoint: AgentEndpoint):
+        start_time = time.time()
+        self._count("requests")
+
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            data = {}
+        # The deadline covers every stage, so waiting on a coalesced request only gets the time left
+        with deadline_scope(request_deadline(data)):
+            return self._process(endpoint, data, start_time)
+
+    def _process(self, endpoint: AgentEndpoint, data: Dict[str, Any], start_time: float):
+        user_input = data.get(endpoint.input_field) or ""
+        if not isinstance(user_input, str):
+            user_input = str(user_input)
+        try:
+            for validate in self.validators:
+                validate(endpoint, data, user_input)
+            client = self.admission.admit(endpoint.name) if self.admission else None
+        except RequestRejected as rejection:
+            return self._reject(endpoint, rejection)
+        log.debug("request.received", endpoint=endpoint.name, user_input=user_input)
+
+        extras = endpoint.prepare(user_input, data) if endpoint.prepare else {}
+        trace = trace_requested(data)
+        key = None
+        if self.cache.enabled and not trace:
+            key = self.cache.key(endpoint.name, user_input, [data.get(field) for field in endpoint.cache_fields])
+        result = self.cache.get(key) if key else None
+        cached = result is not None
+
+        if not cached:
+            def run():
+                with upstream_queue(endpoint.name), agent_trace_scope(trace):
+                    return endpoint.dispatch(user_input, data, extras)
+
+            if self.admission:
+                run = self._admitted(run, endpoint, client)
+            try:
+                result = self._coalesced(key, run) if key else run()
+            except RequestRejected as rejection:
+                return self._reject(endpoint, rejection)
+
+        evaluation = ResponseEvaluation(endpoint.name, user_input, result, time.time() - start_time)
+        log.debug("request.completed", endpoint=endpoint.name, chars=len(result), cached=cached,
+                  seconds=round(evaluation.processing_time, 2))
+        if key and not cached and evaluation.quality["quality_grade"] not in UNCACHEABLE_GRADES:
+            self.cache.put(key, result)
+
+        metadata = endpoint.metadata(data)
+        if cached:
+            metadata["cached"] = True
+        self.persistence.submit(self.persist, evaluation, metadata)
+
+        return jsonify({
+            endpoint.result_key: result,
+            **extras,
+            "prompt": user_input,
+            "timestamp": evaluation.timestamp,
+            "response_length": len(result),
+            "cached": cached,
+            "evaluation": evaluation.summary()
+        })
+
+    def _reject(self, endpoint: AgentEndpoint, rejection: RequestRejected):
+        self._count("rejected")
+        log.info("request.rejected", endpoint=endpoint.name, status=rejection.status, reason=str(rejection))
+        return jsonify({"error": str(rejection), **rejection.details}), rejection.status, rejection.headers
+
+    def _admitted(self, run: Callable[[], str], endpoint: AgentEndpoint, client: str) -> Callable[[], str]:
+        """`run` in one of this worker's agent slots, billed to `client` once it has run
+
+        Only the request that actually runs the agent goes through this;
+        coalesced followers neither hold a slot nor pay the endpoint cost.
+        """
+        def admitted_run():
+            with self.admission.worker_slot(endpoint.name):
+                result = run()
+            self.admission.charge_dispatch(client, endpoint.cost)
+            return result
+        return admitted_run
+
+    def _coalesced(self, key: str, run: Callable[[], str]) -> str:
+        """Run `run` once for concurrent requests with the same key; the others wait for its answer
+
+        A follower waits only for the time left before its own deadline; if
+        that passes before the leader finishes, it is answered with 504.
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            self._count("coalesced")
+            remaining = time_left()
+            try:
+                return future.result(timeout=max(remaining, 0.0) if remaining is not None else None)
+            except FutureTimeoutError:
+                raise RequestRejected("Timed out waiting for an identical request in progress", status=504)
+
+        try:
+            result = run()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+
+_pipelines: List[AgentPipeline] = []
+
+
+def create_pipeline(persist: Callable[[ResponseEvaluation, Dict[str, Any]], None], **kwargs: Any) -> AgentPipeline:
+    pipeline = AgentPipeline(persist, **kwargs)
+    _pipelines.append(pipeline)
+    return pipeline
+
+
+def _cache_lookups() -> Dict[tuple, int]:
+    hits = sum(pipeline.cache.stats["hits"] for pipeline in _pipelines)
+    misses = sum(pipeline.cache.stats["misses"] for pipeline in _pipelines)
+    return {("agent_responses", "hit"): hits, ("agent_responses", "miss"): misses} if _pipelines else {}
+
+
+CACHE_LOOKUPS.add_source(_cache_lookups)
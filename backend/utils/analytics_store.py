@@ -0,0 +1,477 @@
+"""
+Shared Analytics Store
+Conversations, model evaluations and feedback in one indexed SQLite database
+in WAL mode, shared by every worker process and queried with aggregate SQL;
+prompt and response bodies are stored once each, compressed, by content hash
+"""
+
+import os
+import json
+import time
+import zlib
+import atexit
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.evaluation import METRICS_SCHEMA, QUALITY_SCHEMA
+from utils.metrics import PERSISTENCE_FLUSH_SECONDS, PERSISTENCE_ROWS
+from utils.profiler import get_profiler
+from utils.serialization import dumps_text, loads
+from utils.structured_logging import get_logger
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Relative paths are resolved against the backend directory, not the working directory
+DEFAULT_ANALYTICS_DB = os.path.join(BACKEND_DIR, os.getenv("ANALYTICS_DB", "analytics.db"))
+BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+# Writes are buffered and inserted in batches; 0 writes every record immediately
+FLUSH_INTERVAL = float(os.getenv("ANALYTICS_FLUSH_INTERVAL", "0.2"))
+FLUSH_BATCH_SIZE = int(os.getenv("ANALYTICS_FLUSH_BATCH_SIZE", "64"))
+MAX_PENDING = 10000
+# zstd when the zstandard package is installed, zlib otherwise; each body records its own codec
+BODY_CODEC = os.getenv("ANALYTICS_BODY_CODEC", "zstd" if ZSTD_AVAILABLE else "zlib")
+# Shorter bodies are stored as-is: compression would not pay for its framing
+MIN_COMPRESS_BYTES = 128
+KNOWN_BODIES_LIMIT = 100000
+# Pre-SQLite history files, imported once
+LEGACY_CONVERSATIONS_JSON = os.path.join(BACKEND_DIR, "conversation_history.json")
+LEGACY_EVALUATIONS_JSON = os.path.join(BACKEND_DIR, "model_evaluation_data.json")
+
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS bodies (hash TEXT PRIMARY KEY, codec TEXT NOT NULL, size INTEGER, data BLOB);
+CREATE TABLE IF NOT EXISTS conversations (
+    id INTEGER PRIMARY KEY, timestamp TEXT NOT NULL, endpoint TEXT NOT NULL, user_id TEXT,
+    input_hash TEXT, response_hash TEXT, response_length INTEGER, metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_conversations_endpoint ON conversations (endpoint, timestamp);
+CREATE INDEX IF NOT EXISTS idx_conversations_timestamp ON conversations (timestamp);
+CREATE INDEX IF NOT EXISTS idx_conversations_user ON conversations (user_id, timestamp);
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY, response_id TEXT NOT NULL, timestamp TEXT NOT NULL, endpoint TEXT NOT NULL,
+    user_id TEXT, input_hash TEXT, response_hash TEXT, processing_time REAL, output_length INTEGER,
+    quality_score REAL, quality_grade TEXT, metrics TEXT, quality_evaluation TEXT, metadata TEXT, model_info TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_evaluations_response ON evaluations (response_id);
+CREATE INDEX IF NOT EXISTS idx_evaluations_endpoint ON evaluations (endpoint, timestamp);
+CREATE INDEX IF NOT EXISTS idx_evaluations_timestamp ON evaluations (timestamp);
+CREATE INDEX IF NOT EXISTS idx_evaluations_user ON evaluations (user_id, timestamp);
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY, response_id TEXT NOT NULL, rating INTEGER, feedback_text TEXT, timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_response ON feedback (response_id);
+"""
+
+# Statements are fixed strings with placeholders, so sqlite3's statement cache prepares each once
+INSERT_BODY = "INSERT OR IGNORE INTO bodies (hash, codec, size, data) VALUES (?, ?, ?, ?)"
+INSERT_CONVERSATION = (
+    "INSERT INTO conversations (timestamp, endpoint, user_id, input_hash, response_hash, response_length, metadata) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+INSERT_EVALUATION = (
+    "INSERT INTO evaluations (response_id, timestamp, endpoint, user_id, input_hash, response_hash, processing_time, "
+    "output_length, quality_score, quality_grade, metrics, quality_evaluation, metadata, model_info) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+INSERT_FEEDBACK = "INSERT INTO feedback (response_id, rating, feedback_text, timestamp) VALUES (?, ?, ?, ?)"
+SELECT_CONVERSATIONS = (
+    "SELECT c.timestamp, c.endpoint, i.codec, i.data, r.codec, r.data, c.response_length, c.metadata FROM conversations c "
+    "LEFT JOIN bodies i ON i.hash = c.input_hash LEFT JOIN bodies r ON r.hash = c.response_hash "
+    "ORDER BY c.id DESC LIMIT ?"
+)
+SELECT_EVALUATIONS = (
+    "SELECT e.timestamp, e.endpoint, i.codec, i.data, r.codec, r.data, e.processing_time, e.metrics, e.quality_evaluation, "
+    "e.metadata, e.model_info, f.rating, f.feedback_text, f.timestamp FROM evaluations e "
+    "LEFT JOIN bodies i ON i.hash = e.input_hash LEFT JOIN bodies r ON r.hash = e.response_hash "
+    "LEFT JOIN feedback f ON f.id = (SELECT MAX(id) FROM feedback WHERE response_id = e.response_id) "
+)
+
+
+log = get_logger("analytics_store")
+
+
+def open_database(path: str) -> sqlite3.Connection:
+    """Connection set up for several processes sharing one file
+
+    WAL lets readers run alongside a writer, and the busy timeout makes a
+    writer wait for another process's transaction instead of failing.
+    """
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=BUSY_TIMEOUT_MS / 1000, cached_statements=256)
+    if path != ":memory:":
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    return conn
+
+
+def _user_id(entry: Dict[str, Any]) -> Optional[str]:
+    user_id = (entry.get("metadata") or {}).get("user_id")
+    return str(user_id) if user_id is not None else None
+
+
+def body_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def encode_body(text: str, codec: str = BODY_CODEC) -> Tuple[str, int, bytes]:
+    """(codec, uncompressed size, stored bytes) for a prompt or response body"""
+    raw = text.encode("utf-8")
+    if len(raw) < MIN_COMPRESS_BYTES:
+        return "raw", len(raw), raw
+    if codec == "zstd" and ZSTD_AVAILABLE:
+        data = zstandard.ZstdCompressor(level=3).compress(raw)
+    else:
+        codec, data = "zlib", zlib.compress(raw, 6)
+    if len(data) >= len(raw):
+        return "raw", len(raw), raw
+    return codec, len(raw), data
+
+
+def decode_body(codec: Optional[str], data: Optional[bytes]) -> Optional[str]:
+    if codec is None:
+        return None
+    if codec == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("History contains zstd-compressed bodies; install zstandard to read them")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == "zlib":
+        data = zlib.decompress(data)
+    return bytes(data).decode("utf-8")
+
+
+def _conversation_record(row: Tuple) -> Dict[str, Any]:
+    return {
+        "timestamp": row[0],
+        "endpoint": row[1],
+        "user_input": decode_body(row[2], row[3]),
+        "ai_response": decode_body(row[4], row[5]),
+        "response_length": row[6],
+        "metadata": loads(row[7])
+    }
+
+
+def _evaluation_record(row: Tuple) -> Dict[str, Any]:
+    record = {
+        "timestamp": row[0],
+        "endpoint": row[1],
+        "user_input": decode_body(row[2], row[3]),
+        "ai_response": decode_body(row[4], row[5]),
+        "processing_time": row[6],
+        "metrics": METRICS_SCHEMA.decode(row[7]),
+        "quality_evaluation": QUALITY_SCHEMA.decode(row[8]),
+        "metadata": loads(row[9]),
+        "model_info": loads(row[10])
+    }
+    if row[11] is not None or row[12] is not None:
+        record["user_feedback"] = {"rating": row[11], "feedback_text": row[12], "timestamp": row[13]}
+    return record
+
+
+class AnalyticsStore:
+    """Conversation history, model evaluations and feedback shared across worker processes
+
+    Each process opens its own connection on first use (a connection must
+    not cross a fork), so the store can be created before workers fork.
+    Records are buffered and written in batches by a background flush;
+    reads from this process flush first, and other workers see a record
+    within `flush_interval` seconds.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_ANALYTICS_DB, flush_interval: float = FLUSH_INTERVAL,
+                 batch_size: int = FLUSH_BATCH_SIZE):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.batch_size = max(batch_size, 1)
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        # Bodies first, so a flushed record never references a body that is not stored yet
+        self._pending: Dict[str, List[Tuple]] = {INSERT_BODY: [], INSERT_CONVERSATION: [], INSERT_EVALUATION: []}
+        # Hashes this process has already stored or queued, so repeated bodies are not compressed again
+        self._known_bodies: set = set()
+        self._flusher: Optional[threading.Thread] = None
+        self.stats = {"flushes": 0, "rows_written": 0, "flush_failures": 0, "bodies_stored": 0, "bodies_reused": 0}
+
+    # -- connection and schema ---------------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            if self._pid != os.getpid():
+                # Rows buffered by the parent are the parent's to write
+                self._pending = {statement: [] for statement in self._pending}
+                self._known_bodies = set()
+                self._flusher = None
+            self._conn = open_database(self.db_path)
+            self._pid = os.getpid()
+            self._migrate(self._conn)
+        return self._conn
+
+    def _body_key(self, text: Optional[str], bodies: List[Tuple]) -> Optional[str]:
+        """Content hash for `text`, queueing the compressed body on `bodies` the first time it is seen"""
+        if text is None:
+            return None
+        key = body_hash(text)
+        if key in self._known_bodies:
+            self.stats["bodies_reused"] += 1
+            return key
+        if len(self._known_bodies) >= KNOWN_BODIES_LIMIT:
+            self._known_bodies.clear()
+        self._known_bodies.add(key)
+        bodies.append((key, *encode_body(text)))
+        self.stats["bodies_stored"] += 1
+        return key
+
+    def _conversation_row(self, entry: Dict[str, Any], bodies: List[Tuple]) -> Tuple:
+        return (
+            entry["timestamp"], entry["endpoint"], _user_id(entry),
+            self._body_key(entry.get("user_input"), bodies), self._body_key(entry.get("ai_response"), bodies),
+            entry.get("response_length", len(entry.get("ai_response") or "")), dumps_text(entry.get("metadata") or {})
+        )
+
+    def _evaluation_row(self, entry: Dict[str, Any], bodies: List[Tuple]) -> Tuple:
+        metrics = entry.get("metrics") or {}
+        quality = entry.get("quality_evaluation") or {}
+        return (
+            metrics["response_id"], entry["timestamp"], entry["endpoint"], _user_id(entry),
+            self._body_key(entry.get("user_input"), bodies), self._body_key(entry.get("ai_response"), bodies),
+            entry.get("processing_time"), metrics.get("output_length"), quality.get("quality_score"),
+            quality.get("quality_grade"), METRICS_SCHEMA.encode(metrics), QUALITY_SCHEMA.encode(quality),
+            dumps_text(entry.get("metadata") or {}), dumps_text(entry.get("model_info") or {})
+        )
+
+    def _insert_entries(self, conn: sqlite3.Connection, conversations: List[Dict[str, Any]],
+                        evaluations: List[Dict[str, Any]]):
+        """Insert whole records inside the caller's transaction"""
+        bodies: List[Tuple] = []
+        try:
+            conversation_rows = [self._conversation_row(entry, bodies) for entry in conversations]
+            evaluation_rows = [self._evaluation_row(entry, bodies) for entry in evaluations]
+            conn.executemany(INSERT_BODY, bodies)
+            conn.executemany(INSERT_CONVERSATION, conversation_rows)
+            conn.executemany(INSERT_EVALUATION, evaluation_rows)
+            conn.executemany(INSERT_FEEDBACK, self._feedback_rows(evaluations))
+        except Exception:
+            # The transaction rolls back, so these bodies may not be stored after all
+            self._known_bodies.clear()
+            raise
+
+    def _migrate(self, conn: sqlite3.Connection):
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= SCHEMA_VERSION:
+                return
+            # Statement by statement: executescript() would commit the open transaction
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    @staticmethod
+    def _feedback_rows(evaluations: List[Dict[str, Any]]) -> List[Tuple]:
+        return [
+            (entry["metrics"]["response_id"], entry["user_feedback"].get("rating"),
+             entry["user_feedback"].get("feedback_text"), entry["user_feedback"].get("timestamp"))
+            for entry in evaluations if entry.get("user_feedback")
+        ]
+
+    def import_json_history(self, conversations_path: str = LEGACY_CONVERSATIONS_JSON,
+                            evaluations_path: str = LEGACY_EVALUATIONS_JSON) -> Dict[str, int]:
+        """One-time import of the old whole-file JSON history; later calls are no-ops"""
+        imported = {"conversations": 0, "evaluations": 0}
+        with self._lock:
+            conn = self._connection()
+            for kind, path in (("conversations", conversations_path), ("evaluations", evaluations_path)):
+                if not path or not os.path.exists(path):
+                    continue
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    key = f"imported:{os.path.basename(path)}"
+                    if conn.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone():
+                        continue
+                    with open(path, "r") as f:
+                        entries = json.load(f)
+                    if kind == "conversations":
+                        self._insert_entries(conn, entries, [])
+                    else:
+                        self._insert_entries(conn, [], entries)
+                    conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (key, str(len(entries))))
+                    imported[kind] = len(entries)
+        if any(imported.values()):
+            log.info("analytics.history_imported", conversations=imported["conversations"], evaluations=imported["evaluations"])
+        return imported
+
+    # -- writes ------------------------------------------------------------
+
+    def _enqueue(self, statement: str, entry: Dict[str, Any]):
+        with self._lock:
+            self._connection()
+            if statement == INSERT_CONVERSATION:
+                row = self._conversation_row(entry, self._pending[INSERT_BODY])
+            else:
+                row = self._evaluation_row(entry, self._pending[INSERT_BODY])
+            self._pending[statement].append(row)
+            queued = len(self._pending[INSERT_CONVERSATION]) + len(self._pending[INSERT_EVALUATION])
+            due = self.flush_interval <= 0 or queued >= self.batch_size
+            if not due and (self._flusher is None or not self._flusher.is_alive()):
+                self._flusher = threading.Thread(target=self._flush_loop, name="analytics-flush", daemon=True)
+                self._flusher.start()
+        if due:
+            self.flush()
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while self._flusher is threading.current_thread() and self._pid == pid:
+            time.sleep(self.flush_interval)
+            with get_profiler().background_work("analytics-flush"):
+                self.flush()
+
+    def flush(self) -> int:
+        """Write buffered records in one transaction; returns the number of records written"""
+        with self._lock:
+            batches = {statement: rows for statement, rows in self._pending.items() if rows}
+            if not batches:
+                return 0
+            self._pending = {statement: [] for statement in self._pending}
+            start = time.perf_counter()
+            try:
+                conn = self._connection()
+                with conn:
+                    for statement, rows in batches.items():
+                        conn.executemany(statement, rows)
+            except sqlite3.Error as e:
+                PERSISTENCE_FLUSH_SECONDS.labels("error").observe(time.perf_counter() - start)
+                self.stats["flush_failures"] += 1
+                log.warning("analytics.flush_failed", error=e)
+                for statement, rows in batches.items():
+                    limit = 2 * MAX_PENDING if statement == INSERT_BODY else MAX_PENDING
+                    self._pending[statement] = (rows + self._pending[statement])[-limit:]
+                    if len(rows) > limit:
+                        # Dropped bodies are no longer stored or queued
+                        self._known_bodies.clear()
+                return 0
+            PERSISTENCE_FLUSH_SECONDS.labels("ok").observe(time.perf_counter() - start)
+            written = sum(len(rows) for statement, rows in batches.items() if statement != INSERT_BODY)
+            PERSISTENCE_ROWS.inc(written)
+            self.stats["flushes"] += 1
+            self.stats["rows_written"] += written
+            return written
+
+    def add_conversation(self, entry: Dict[str, Any]):
+        self._enqueue(INSERT_CONVERSATION, entry)
+
+    def add_evaluation(self, entry: Dict[str, Any]):
+        self._enqueue(INSERT_EVALUATION, entry)
+
+    def set_feedback(self, response_id: str, feedback: Dict[str, Any]) -> bool:
+        """Record user feedback for `response_id`; False if no evaluation has that id"""
+        self.flush()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                if not conn.execute("SELECT 1 FROM evaluations WHERE response_id = ? LIMIT 1", (response_id,)).fetchone():
+                    return False
+                conn.execute(INSERT_FEEDBACK, (response_id, feedback.get("rating"), feedback.get("feedback_text"), feedback.get("timestamp")))
+        return True
+
+    # -- reads -------------------------------------------------------------
+
+    def _read(self, query: str, params: Tuple = ()) -> List[Tuple]:
+        self.flush()
+        with self._lock:
+            return self._connection().execute(query, params).fetchall()
+
+    def body_stats(self) -> Dict[str, Any]:
+        """Stored body count and bytes before/after compression"""
+        count, raw_bytes, stored_bytes = self._read("SELECT COUNT(*), SUM(size), SUM(LENGTH(data)) FROM bodies")[0]
+        codecs = dict(self._read("SELECT codec, COUNT(*) FROM bodies GROUP BY codec"))
+        return {"bodies": count, "raw_bytes": raw_bytes or 0, "stored_bytes": stored_bytes or 0, "codecs": codecs}
+
+    def conversation_count(self) -> int:
+        return self._read("SELECT COUNT(*) FROM conversations")[0][0]
+
+    def recent_conversations(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Latest `limit` conversations, oldest first"""
+        return [_conversation_record(row) for row in reversed(self._read(SELECT_CONVERSATIONS, (limit,)))]
+
+    def evaluations(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Evaluation records with their latest feedback, oldest first (the last `limit` if given)"""
+        rows = self._read(SELECT_EVALUATIONS + "ORDER BY e.id DESC LIMIT ?", (limit if limit is not None else -1,))
+        return [_evaluation_record(row) for row in reversed(rows)]
+
+    def evaluation_summary(self, endpoint: Optional[str] = None, since: Optional[str] = None) -> Dict[str, Any]:
+        """Aggregates behind /model-evaluation, computed in SQL over the indexed columns"""
+        clauses, params = [], []
+        if endpoint:
+            clauses.append("endpoint = ?")
+            params.append(endpoint)
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        params = tuple(params)
+
+        total, avg_quality, avg_time, avg_length = self._read(
+            f"SELECT COUNT(*), AVG(quality_score), AVG(processing_time), AVG(output_length) FROM evaluations {where}", params
+        )[0]
+        grades = self._read(f"SELECT quality_grade, COUNT(*) FROM evaluations {where}GROUP BY quality_grade ORDER BY quality_grade", params)
+        endpoints = self._read(
+            f"SELECT endpoint, COUNT(*), AVG(quality_score), AVG(processing_time) FROM evaluations {where}GROUP BY endpoint", params
+        )
+        recent_quality, recent_time = self._read(
+            f"SELECT AVG(quality_score), AVG(processing_time) FROM "
+            f"(SELECT quality_score, processing_time FROM evaluations {where}ORDER BY id DESC LIMIT 10)", params
+        )[0]
+        return {
+            "total_evaluations": total,
+            "average_quality_score": avg_quality or 0,
+            "average_response_time": avg_time or 0,
+            "average_response_length": avg_length or 0,
+            "quality_grade_distribution": {grade: count for grade, count in grades},
+            "endpoint_performance": {
+                name: {"count": count, "avg_quality": quality, "avg_response_time": response_time}
+                for name, count, quality, response_time in endpoints
+            },
+            "recent_trend": {"avg_quality": recent_quality or 0, "avg_response_time": recent_time or 0}
+        }
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._flusher = None
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+_analytics_store: Optional[AnalyticsStore] = None
+_analytics_store_lock = threading.Lock()
+
+
+def get_analytics_store() -> AnalyticsStore:
+    """Shared store at ANALYTICS_DB; the old JSON history is imported on first open"""
+    global _analytics_store
+    with _analytics_store_lock:
+        if _analytics_store is None:
+            store = AnalyticsStore()
+            try:
+                store.import_json_history()
+            except Exception as e:
+                log.warning("analytics.history_import_failed", error=e)
+            atexit.register(store.flush)
+            _analytics_store = store
+        return _analytics_store
+
+
+def set_analytics_store(store: Optional[AnalyticsStore]):
+    global _analytics_store
+    with _analytics_store_lock:
+        _analytics_store = store
@@ -0,0 +1,189 @@
+"""
+Circuit Breakers for Agents and Upstream Calls
+Stops repeating slow or failing agent runs and upstream calls, sends callers
+straight to their fallback for a cool-down period, then probes for recovery
+"""
+
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from utils.structured_logging import get_logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+log = get_logger("circuit_breaker")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of running a call while its breaker is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a latency budget
+
+    A call that raises, or succeeds slower than `latency_threshold`, counts as
+    a failure. After `failure_threshold` consecutive failures the breaker opens
+    for `cool_down` seconds, then half-opens and lets `half_open_max_calls`
+    probes through: a good probe closes it, a bad one re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, latency_threshold: Optional[float] = None,
+                 cool_down: float = 30.0, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.cool_down = cool_down
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.stats = {"successes": 0, "failures": 0, "latency_breaches": 0, "rejected": 0, "opened": 0}
+
+    def _refresh_state(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.cool_down:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh_state()
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls are being short-circuited (does not consume a probe)"""
+        return self.state == OPEN
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            self._refresh_state()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probes_in_flight = 0
+        self.stats["opened"] += 1
+        log.warning("circuit.opened", circuit=self.name, cool_down=self.cool_down, failures=self._consecutive_failures)
+
+    def record_success(self, latency: float = 0.0):
+        if self.latency_threshold is not None and latency > self.latency_threshold:
+            with self._lock:
+                self.stats["latency_breaches"] += 1
+            self.record_failure()
+            return
+
+        with self._lock:
+            self.stats["successes"] += 1
+            self._consecutive_failures = 0
+            if self._state == HALF_OPEN:
+                log.info("circuit.closed", circuit=self.name)
+            self._state = CLOSED
+            self._probes_in_flight = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.stats["failures"] += 1
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._consecutive_failures >= self.failure_threshold):
+                self._open()
+
+    def release_probe(self):
+        """Give back a half-open probe whose outcome says nothing about the upstream"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes_in_flight:
+                self._probes_in_flight -= 1
+
+    def call(self, func: Callable[[], Any], neutral_errors: Tuple[Type[BaseException], ...] = ()) -> Any:
+        """Run `func` under the breaker; `neutral_errors` count as neither success nor failure"""
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+
+        start_time = time.perf_counter()
+        try:
+            result = func()
+        except neutral_errors:
+            self.release_probe()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success(time.perf_counter() - start_time)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh_state()
+            retry_in = max(self.cool_down - (time.monotonic() - self._opened_at), 0.0) if self._state == OPEN else 0.0
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "latency_threshold": self.latency_threshold,
+                "cool_down": self.cool_down,
+                "retry_in_seconds": round(retry_in, 2),
+                **self.stats
+            }
+
+
+def _env_float(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+# Defaults per breaker kind: the prefix before ':' in the breaker name ("agent", "upstream")
+BREAKER_DEFAULTS = {
+    "agent": {
+        "failure_threshold": int(os.getenv("AGENT_BREAKER_FAILURES", "3")),
+        "latency_threshold": _env_float("AGENT_BREAKER_LATENCY") or 40.0,
+        "cool_down": float(os.getenv("AGENT_BREAKER_COOL_DOWN", "60"))
+    },
+    "upstream": {
+        "failure_threshold": int(os.getenv("UPSTREAM_BREAKER_FAILURES", "5")),
+        "latency_threshold": _env_float("UPSTREAM_BREAKER_LATENCY") or 30.0,
+        "cool_down": float(os.getenv("UPSTREAM_BREAKER_COOL_DOWN", "30"))
+    }
+}
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Shared breaker for `name`, created with its kind's defaults on first use"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                defaults = BREAKER_DEFAULTS.get(name.split(":", 1)[0], {})
+                breaker = CircuitBreaker(name, **defaults)
+                _breakers[name] = breaker
+    return breaker
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every breaker, for monitoring"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+
+def reset_breakers():
+    with _breakers_lock:
+        _breakers.clear()
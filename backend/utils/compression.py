@@ -0,0 +1,128 @@
+"""
+Response Compression
+gzip/brotli content coding for API responses, negotiated from Accept-Encoding,
+with a size threshold and levels chosen for latency over ratio. Streamed
+responses are compressed chunk by chunk and flushed so events are not held back
+"""
+
+import os
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from flask import Flask, Response, request
+
+from utils.metrics import COMPRESSION_BYTES
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+COMPRESSION_ENABLED = os.getenv("RESPONSE_COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+# Smaller bodies go out as-is: they fit in a packet or two and compressing them only adds latency
+MIN_COMPRESS_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+# Low levels get most of the ratio on JSON and markdown at a fraction of the CPU of the maximum
+GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4"))
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/plain", "text/event-stream", "application/x-ndjson"}
+# Preferred first
+ENCODINGS = ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",)
+
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def negotiate_encoding(accept_encodings, available: Iterable[str] = ENCODINGS) -> Optional[str]:
+    """The most preferred of our encodings that the client accepts, or None for identity"""
+    available = set(available)
+    for encoding in ENCODINGS:
+        if encoding in available and accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def compress(encoding: str, data: bytes, level: Optional[int] = None) -> bytes:
+    """One-shot compression; `level` defaults to the latency-tuned response level"""
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY if level is None else level)
+    compressor = zlib.compressobj(GZIP_LEVEL if level is None else level, zlib.DEFLATED, _GZIP_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+class StreamCompressor:
+    """Incremental compressor whose output for each chunk is immediately decodable"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, _GZIP_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def _compressed_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    compressor = StreamCompressor(encoding)
+    raw = sent = 0
+    try:
+        for data in chunks:
+            if not data:
+                continue
+            out = compressor.chunk(data)
+            raw += len(data)
+            sent += len(out)
+            yield out
+        out = compressor.finish()
+        sent += len(out)
+        yield out
+    finally:
+        COMPRESSION_BYTES.labels(encoding, "raw").inc(raw)
+        COMPRESSION_BYTES.labels(encoding, "sent").inc(sent)
+
+
+def compress_response(response: Response) -> Response:
+    """after_request hook: compress eligible responses in the client's preferred encoding"""
+    if (not COMPRESSION_ENABLED or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers or request.method == "HEAD"):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        original = response.response
+        response.response = _compressed_stream(response.iter_encoded(), encoding)
+        if hasattr(original, "close"):
+            response.call_on_close(original.close)
+        response.direct_passthrough = False
+        response.headers.pop("Content-Length", None)
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_BYTES:
+        return response
+    compressed = compress(encoding, data)
+    if len(compressed) >= len(data):
+        return response
+    COMPRESSION_BYTES.labels(encoding, "raw").inc(len(data))
+    COMPRESSION_BYTES.labels(encoding, "sent").inc(len(compressed))
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def init_compression(app: Flask):
+    """Register the hook; hooks run in reverse order, so registered last it runs before request timing"""
+    app.after_request(compress_response)
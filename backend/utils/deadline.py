@@ -0,0 +1,96 @@
+"""
+Request Deadlines
+Carries a per-request deadline through agent steps, tool calls and upstream LLM requests
+"""
+
+import os
+import time
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from utils.metrics import AGENT_RUN_SECONDS, timed
+from utils.structured_logging import trace_config
+
+# Time kept back from the agent run so the direct llm.invoke fallback can still answer
+FALLBACK_RESERVE_SECONDS = float(os.getenv("AGENT_FALLBACK_RESERVE", "8"))
+
+AGENT_STOPPED_PREFIX = "Agent stopped due to"
+
+_current_deadline: contextvars.ContextVar = contextvars.ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request has no time left for the next step"""
+
+
+class InsufficientTimeBudget(DeadlineExceeded):
+    """Raised before starting work that cannot fit in the time left"""
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """Run the block under a deadline `seconds` from now (never later than an enclosing one)"""
+    if seconds is None:
+        yield
+        return
+
+    deadline = time.monotonic() + seconds
+    enclosing = _current_deadline.get()
+    if enclosing is not None:
+        deadline = min(deadline, enclosing)
+
+    token = _current_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+
+def time_left() -> Optional[float]:
+    """Seconds until the current deadline, or None when the request has no deadline"""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_deadline(step: str = "upstream call"):
+    remaining = time_left()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"Deadline exceeded before {step}")
+
+
+def upstream_timeout_kwargs() -> Dict[str, Any]:
+    """Per-request HTTP timeout matching the time left (empty when there is no deadline)"""
+    remaining = time_left()
+    if remaining is None:
+        return {}
+    return {"timeout": max(remaining, 0.001)}
+
+
+def invoke_agent(agent_executor, inputs: Dict[str, Any], agent: str = "agent") -> str:
+    """Run an AgentExecutor within the current deadline, minus the fallback reserve
+
+    The executor stops scheduling new steps once its budget is spent, and tool
+    calls that would start past it raise DeadlineExceeded, so callers can drop
+    straight to their direct llm.invoke fallback with the reserved time. Run
+    time is recorded per `agent` in the agent_run_duration_seconds histogram,
+    and steps are logged when tracing is on for the request.
+    """
+    options = trace_config(agent)
+    remaining = time_left()
+    if remaining is None:
+        with timed(AGENT_RUN_SECONDS, agent):
+            return agent_executor.invoke(inputs, **options)["output"]
+
+    budget = remaining - FALLBACK_RESERVE_SECONDS
+    if budget <= 0:
+        raise InsufficientTimeBudget("Not enough time left to run agent steps")
+
+    agent_executor.max_execution_time = budget
+    with timed(AGENT_RUN_SECONDS, agent), deadline_scope(budget):
+        output = agent_executor.invoke(inputs, **options)["output"]
+        if output.startswith(AGENT_STOPPED_PREFIX) and time_left() <= 0:
+            raise DeadlineExceeded("Agent steps cut at the request deadline")
+    return output
@@ -0,0 +1,182 @@
+"""
+Embedding Service
+Batches, de-duplicates and caches embedding calls so cost scales with unique
+text rather than request count; vectors persist in a memory-mapped store
+"""
+
+import os
+import re
+import zlib
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.vector_index import PersistentVectorIndex, content_hash
+from utils.metrics import CACHE_LOOKUPS
+
+DEFAULT_EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai")
+DEFAULT_EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
+DEFAULT_EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+DEFAULT_EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.getenv("VECTOR_INDEX_DIR", "vector_index"))
+LOCAL_EMBEDDING_DIM = int(os.getenv("LOCAL_EMBEDDING_DIM", "512"))
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+
+class OpenAIEmbeddingBackend:
+    """Embeds through the shared upstream call path (limiter, breaker, replay)"""
+
+    def __init__(self, model: str = DEFAULT_EMBEDDING_MODEL):
+        self.model = model
+        self.name = model
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        import utils.openai_helper as openai_helper
+        from utils.deadline import upstream_timeout_kwargs
+
+        request_payload = {"model": self.model, "input": texts}
+
+        def send():
+            if openai_helper.client is None:
+                openai_helper.setup_openai()
+            response = openai_helper.client.embeddings.create(**request_payload, **upstream_timeout_kwargs())
+            ordered = sorted(response.data, key=lambda item: item.index)
+            return {"embeddings": [item.embedding for item in ordered]}
+
+        return openai_helper.call_upstream("embeddings", request_payload, send)["embeddings"]
+
+
+class LocalHashingBackend:
+    """Offline embedder: hashed word and word-bigram counts, no network needed
+
+    Quality is well below a trained model, but similarity still tracks shared
+    vocabulary, which is enough for development, tests and air-gapped runs.
+    """
+
+    def __init__(self, dim: int = LOCAL_EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"local-hashing-{dim}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = _TOKEN_PATTERN.findall(text.lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                vectors[row, zlib.crc32(feature.encode("utf-8")) % self.dim] += 1.0
+        return vectors
+
+
+def create_backend(backend: str = DEFAULT_EMBEDDING_BACKEND, model: str = DEFAULT_EMBEDDING_MODEL):
+    if backend == "local":
+        return LocalHashingBackend()
+    if backend == "openai":
+        return OpenAIEmbeddingBackend(model)
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+class EmbeddingService:
+    """Cached, batched embeddings for a single backend
+
+    Texts are keyed by content hash; only hashes missing from the on-disk
+    store are sent to the backend, in batches of up to `batch_size`.
+    Concurrent callers asking for the same text share one upstream call.
+    """
+
+    def __init__(self, backend, store: PersistentVectorIndex, batch_size: int = DEFAULT_EMBEDDING_BATCH_SIZE):
+        self.backend = backend
+        self.store = store
+        self.batch_size = max(batch_size, 1)
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, threading.Event] = {}
+        self.stats = {"requested": 0, "unique": 0, "cache_hits": 0, "embedded": 0, "batches": 0}
+
+    def _claim(self, keys: List[str]):
+        """Split missing keys into ones this caller embeds and ones another caller is already embedding"""
+        with self._lock:
+            owned, waiting = [], []
+            for key in self.store.missing(keys):
+                if key in self._in_flight:
+                    waiting.append(self._in_flight[key])
+                else:
+                    self._in_flight[key] = threading.Event()
+                    owned.append(key)
+            return owned, waiting
+
+    def _release(self, keys: List[str]):
+        with self._lock:
+            for key in keys:
+                self._in_flight.pop(key).set()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Vectors for `texts`, in input order, as a float32 matrix"""
+        if not texts:
+            return np.zeros((0, self.store.dim or 0), dtype=np.float32)
+
+        keys = [content_hash(text) for text in texts]
+        by_key = dict(zip(keys, texts))
+        owned, waiting = self._claim(list(by_key))
+
+        try:
+            for start in range(0, len(owned), self.batch_size):
+                batch = owned[start:start + self.batch_size]
+                vectors = np.asarray(self.backend.embed([by_key[key] for key in batch]), dtype=np.float32)
+                self.store.add(batch, vectors)
+                with self._lock:
+                    self.stats["batches"] += 1
+                    self.stats["embedded"] += len(batch)
+        finally:
+            self._release(owned)
+
+        for event in waiting:
+            event.wait()
+
+        missing = self.store.missing(keys)
+        if missing:
+            # Another caller's embed failed; embed the leftovers ourselves
+            return self.embed(texts)
+
+        with self._lock:
+            self.stats["requested"] += len(keys)
+            self.stats["unique"] += len(by_key)
+            self.stats["cache_hits"] += len(by_key) - len(owned)
+        return self.store.get(keys)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """LangChain Embeddings interface"""
+        return self.embed(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed([text])[0].tolist()
+
+
+_services: Dict[str, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def get_embedding_service(backend: Optional[str] = None, model: Optional[str] = None,
+                          directory: str = DEFAULT_EMBEDDING_CACHE_DIR) -> EmbeddingService:
+    """Shared service per backend; each backend/model gets its own on-disk store"""
+    embedder = create_backend(backend or DEFAULT_EMBEDDING_BACKEND, model or DEFAULT_EMBEDDING_MODEL)
+    with _services_lock:
+        if embedder.name not in _services:
+            store = PersistentVectorIndex(os.path.join(directory, embedder.name))
+            _services[embedder.name] = EmbeddingService(embedder, store)
+        return _services[embedder.name]
+
+
+def reset_embedding_services():
+    with _services_lock:
+        _services.clear()
+
+
+def _cache_lookups() -> Dict[tuple, int]:
+    with _services_lock:
+        services = list(_services.values())
+    hits = sum(service.stats["cache_hits"] for service in services)
+    misses = sum(service.stats["embedded"] for service in services)
+    return {("embeddings", "hit"): hits, ("embeddings", "miss"): misses}
+
+
+CACHE_LOOKUPS.add_source(_cache_lookups)
@@ -0,0 +1,184 @@
+"""
+Response Evaluation
+Metrics and rule-based quality scoring shared by the API endpoints and the model cascade
+"""
+
+import re
+import hashlib
+from datetime import datetime
+
+from utils.serialization import RecordSchema
+
+# A digit with a '%' within the next nine characters
+_QUANTIFIED_PATTERN = re.compile(r"\d.{0,8}%", re.S)
+
+def calculate_response_metrics(user_input, ai_response, processing_time):
+    """Calculate comprehensive response quality metrics"""
+    input_words = len(user_input.split())
+    output_words = len(ai_response.split())
+    metrics = {
+        "response_time_seconds": processing_time,
+        "input_length": len(user_input),
+        "output_length": len(ai_response),
+        "input_word_count": input_words,
+        "output_word_count": output_words,
+        "compression_ratio": len(ai_response) / max(len(user_input), 1),
+        "words_per_second": output_words / max(processing_time, 0.1),
+        "has_structured_format": bool(any(marker in ai_response for marker in ['###', '**', '1.', '2.', '•', '-'])),
+        "has_quantified_data": bool(_QUANTIFIED_PATTERN.search(ai_response)),
+        "response_completeness_score": min(len(ai_response) / 500, 1.0),  # Normalized completeness
+        "response_id": hashlib.md5(f"{user_input}{ai_response}".encode()).hexdigest()[:8]
+    }
+    return metrics
+
+def evaluate_response_quality(ai_response, endpoint):
+    """Evaluate response quality based on content analysis"""
+    quality_score = 0
+    quality_factors = []
+    lowered = ai_response.lower()
+    
+    # Length appropriateness (20 points)
+    if 200 <= len(ai_response) <= 3000:
+        quality_score += 20
+        quality_factors.append("appropriate_length")
+    elif len(ai_response) > 100:
+        quality_score += 10
+        quality_factors.append("minimal_length")
+    
+    # Structure and formatting (25 points)
+    structure_indicators = ['###', '**', '1.', '2.', '3.', '•', '-', '\n\n']
+    structure_count = sum(1 for indicator in structure_indicators if indicator in ai_response)
+    if structure_count >= 5:
+        quality_score += 25
+        quality_factors.append("well_structured")
+    elif structure_count >= 2:
+        quality_score += 15
+        quality_factors.append("basic_structure")
+    
+    # Specific content quality by endpoint (30 points)
+    if endpoint == "career-advice":
+        career_keywords = ['skill', 'experience', 'growth', 'opportunity', 'market', 'salary', 'trend']
+        keyword_count = sum(1 for keyword in career_keywords if keyword in lowered)
+        quality_score += min(keyword_count * 4, 30)
+        if keyword_count >= 5:
+            quality_factors.append("comprehensive_career_advice")
+    
+    elif endpoint == "generate-resume":
+        resume_keywords = ['achieved', 'led', 'managed', 'improved', 'increased', '%', 'result']
+        keyword_count = sum(1 for keyword in resume_keywords if keyword in lowered)
+        quality_score += min(keyword_count * 5, 30)
+        if keyword_count >= 4:
+            quality_factors.append("quantified_achievements")
+    
+    elif endpoint == "mock-interview":
+        interview_keywords = ['question', 'behavior', 'technical', 'experience', 'situation', 'challenge']
+        keyword_count = sum(1 for keyword in interview_keywords if keyword in lowered)
+        quality_score += min(keyword_count * 5, 30)
+        if keyword_count >= 4:
+            quality_factors.append("comprehensive_interview_prep")
+    
+    elif endpoint == "learning-resources":
+        learning_keywords = ['course', 'book', 'tutorial', 'practice', 'project', 'skill', 'learn']
+        keyword_count = sum(1 for keyword in learning_keywords if keyword in lowered)
+        quality_score += min(keyword_count * 4, 30)
+        if keyword_count >= 5:
+            quality_factors.append("diverse_learning_resources")
+    
+    # Actionability (15 points)
+    actionable_indicators = ['step', 'action', 'recommendation', 'should', 'consider', 'try', 'start']
+    actionable_count = sum(1 for indicator in actionable_indicators if indicator in lowered)
+    if actionable_count >= 5:
+        quality_score += 15
+        quality_factors.append("highly_actionable")
+    elif actionable_count >= 2:
+        quality_score += 8
+        quality_factors.append("somewhat_actionable")
+    
+    # Professional tone (10 points)
+    professional_indicators = ['professional', 'industry', 'best practice', 'recommend', 'suggest']
+    if any(indicator in lowered for indicator in professional_indicators):
+        quality_score += 10
+        quality_factors.append("professional_tone")
+    
+    return {
+        "quality_score": quality_score,
+        "quality_grade": "A" if quality_score >= 80 else "B" if quality_score >= 60 else "C" if quality_score >= 40 else "D",
+        "quality_factors": quality_factors,
+        "max_possible_score": 100
+    }
+
+
+# Stored shapes of the metrics and quality columns, in the order the functions above produce them
+METRICS_SCHEMA = RecordSchema("response_metrics", {
+    "response_time_seconds": 0.0,
+    "input_length": 0,
+    "output_length": 0,
+    "input_word_count": 0,
+    "output_word_count": 0,
+    "compression_ratio": 0.0,
+    "words_per_second": 0.0,
+    "has_structured_format": False,
+    "has_quantified_data": False,
+    "response_completeness_score": 0.0,
+    "response_id": None
+})
+QUALITY_SCHEMA = RecordSchema("quality_evaluation", {
+    "quality_score": 0,
+    "quality_grade": "D",
+    "quality_factors": [],
+    "max_possible_score": 100
+})
+
+
+class ResponseEvaluation:
+    """Metrics and quality of one agent response, computed once
+
+    The same object feeds the stored conversation and evaluation rows, the
+    `evaluation` block of the API response and, through `response_id`, the
+    feedback lookup.
+    """
+
+    def __init__(self, endpoint, user_input, ai_response, processing_time):
+        self.endpoint = endpoint
+        self.user_input = user_input
+        self.ai_response = ai_response
+        self.processing_time = processing_time
+        self.timestamp = datetime.now().isoformat()
+        self.metrics = calculate_response_metrics(user_input, ai_response, processing_time)
+        self.quality = evaluate_response_quality(ai_response, endpoint)
+
+    @property
+    def response_id(self):
+        return self.metrics["response_id"]
+
+    def summary(self):
+        """The `evaluation` block returned to the client"""
+        return {
+            "quality_score": self.quality["quality_score"],
+            "quality_grade": self.quality["quality_grade"],
+            "response_time": round(self.processing_time, 2),
+            "response_id": self.response_id
+        }
+
+    def conversation_entry(self, metadata=None):
+        return {
+            "timestamp": self.timestamp,
+            "endpoint": self.endpoint,
+            "user_input": self.user_input,
+            "ai_response": self.ai_response,
+            "response_length": len(self.ai_response),
+            "metadata": metadata or {}
+        }
+
+    def evaluation_entry(self, metadata=None, model_info=None):
+        return {
+            "timestamp": self.timestamp,
+            "endpoint": self.endpoint,
+            "user_input": self.user_input,
+            "ai_response": self.ai_response,
+            "processing_time": self.processing_time,
+            "metrics": self.metrics,
+            "quality_evaluation": self.quality,
+            "metadata": metadata or {},
+            "model_info": model_info or {}
+        }
@@ -0,0 +1,137 @@
+"""
+Hedged Upstream Requests
+Sends a duplicate request when the first one runs past a latency percentile
+and keeps whichever answer arrives first
+"""
+
+import os
+import time
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Deque, Dict, Optional
+
+from utils.deadline import DeadlineExceeded, time_left
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies per key"""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, key: str, percentile: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < max(min_samples, 1):
+            return None
+        index = min(int(len(samples) * percentile / 100.0), len(samples) - 1)
+        return samples[index]
+
+
+class RequestHedger:
+    """Issue a backup attempt when the first one is slower than the tracked percentile
+
+    Python threads cannot be interrupted, so the losing attempt is abandoned:
+    a hedge that has not started yet is cancelled, and one already in flight
+    runs to completion with its result discarded.
+    """
+
+    def __init__(self, percentile: float = 0.0, min_samples: int = 20, window: int = 200, max_workers: int = 16):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.latencies = LatencyTracker(window)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge") if percentile else None
+        self._stats_lock = threading.Lock()
+        self.stats = {"hedged": 0, "hedge_wins": 0}
+
+    @classmethod
+    def from_env(cls) -> "RequestHedger":
+        return cls(
+            percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "0")),
+            min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self._executor is not None
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _timed(self, key: str, attempt: Callable[[], Any]) -> Callable[[], Any]:
+        def run():
+            start_time = time.perf_counter()
+            result = attempt()
+            self.latencies.observe(key, time.perf_counter() - start_time)
+            return result
+        return run
+
+    def run(self, key: str, attempt: Callable[[], Any]) -> Any:
+        hedge_after = self.latencies.percentile(key, self.percentile, self.min_samples) if self.enabled else None
+        if hedge_after is None:
+            return self._timed(key, attempt)()
+
+        remaining = time_left()
+        if remaining is not None and remaining <= hedge_after:
+            # No room for a backup before the deadline; a hedge would only add load
+            return self._timed(key, attempt)()
+
+        # Each attempt runs in its own copy of the caller's context (deadline, queue)
+        primary = self._executor.submit(contextvars.copy_context().run, self._timed(key, attempt))
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        self._count("hedged")
+        backup = self._executor.submit(contextvars.copy_context().run, self._timed(key, attempt))
+        pending = {primary, backup}
+        last_error = None
+
+        while pending:
+            remaining = time_left()
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded("Deadline exceeded waiting for hedged upstream call")
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    if future is backup:
+                        self._count("hedge_wins")
+                    return future.result()
+                last_error = future.exception()
+
+        raise last_error
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {"enabled": self.enabled, "percentile": self.percentile, **self.stats}
+
+
+_hedger: Optional[RequestHedger] = None
+_hedger_lock = threading.Lock()
+
+
+def get_request_hedger() -> RequestHedger:
+    """Process-wide hedger, configured from the environment on first use"""
+    global _hedger
+    if _hedger is None:
+        with _hedger_lock:
+            if _hedger is None:
+                _hedger = RequestHedger.from_env()
+    return _hedger
+
+
+def set_request_hedger(hedger: Optional[RequestHedger]):
+    global _hedger
+    with _hedger_lock:
+        _hedger = hedger
@@ -0,0 +1,386 @@
+"""
+Local Job-Market Knowledge Base
+Role, skill, industry and salary datasets ingested into an indexed SQLite store
+so career research tools can ground (or skip) their LLM calls with retrieved facts
+"""
+
+import os
+import re
+import csv
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+from utils.analytics_store import open_database
+from utils.metrics import CACHE_LOOKUPS
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DATA_DIR = os.getenv("KNOWLEDGE_BASE_DATA", os.path.join(BACKEND_DIR, "data", "knowledge_base"))
+DEFAULT_DB_PATH = os.path.join(BACKEND_DIR, os.getenv("KNOWLEDGE_BASE_DB", "knowledge_base.db"))
+
+LEVELS = ("entry", "mid", "senior", "lead")
+DEFAULT_LOCATION = "United States"
+
+_WORD_PATTERN = re.compile(r"[a-z0-9+#]+")
+_LEVEL_PATTERNS = [
+    (re.compile(r"\b(entry|junior|jr\.?|graduate|intern|new grad)\b", re.I), "entry"),
+    (re.compile(r"\b(lead|principal|staff|head of|manager of)\b", re.I), "lead"),
+    (re.compile(r"\b(senior|sr\.?)\b", re.I), "senior"),
+    (re.compile(r"\b(mid|mid-level|intermediate)\b", re.I), "mid")
+]
+_YEARS_PATTERN = re.compile(r"(\d+)\+?\s*(?:years|yrs|yoe)", re.I)
+# Queries asking for advice rather than data always go to the LLM
+_ADVICE_PATTERN = re.compile(r"\b(negotiat\w*|strategy|should|how (?:do|can|to)|plan|advice|offer|compare|vs|versus|why)\b", re.I)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS roles (
+    role TEXT PRIMARY KEY, industry TEXT, summary TEXT, outlook TEXT,
+    growth_rate REAL, remote_share REAL, certifications TEXT
+);
+CREATE TABLE IF NOT EXISTS role_skills (
+    role TEXT, skill TEXT, importance TEXT, PRIMARY KEY (role, skill)
+);
+CREATE INDEX IF NOT EXISTS idx_role_skills_skill ON role_skills (skill);
+CREATE TABLE IF NOT EXISTS industries (
+    industry TEXT PRIMARY KEY, outlook TEXT, trends TEXT, emerging_roles TEXT,
+    in_demand_skills TEXT, remote_share REAL, hot_locations TEXT, challenges TEXT
+);
+CREATE TABLE IF NOT EXISTS entity_names (kind TEXT, name TEXT, names TEXT, PRIMARY KEY (kind, name));
+CREATE TABLE IF NOT EXISTS salaries (
+    role TEXT, location TEXT, level TEXT, p25 INTEGER, p50 INTEGER, p75 INTEGER, p90 INTEGER,
+    currency TEXT, year INTEGER, PRIMARY KEY (role, location, level)
+);
+"""
+
+
+def _fts_available(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS entity_fts USING fts5(kind UNINDEXED, name UNINDEXED, body)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_PATTERN.findall(text.lower())
+
+
+def detect_level(text: str) -> Optional[str]:
+    for pattern, level in _LEVEL_PATTERNS:
+        if pattern.search(text):
+            return level
+    years = _YEARS_PATTERN.search(text)
+    if years:
+        count = int(years.group(1))
+        return "entry" if count <= 2 else "mid" if count <= 5 else "senior" if count <= 10 else "lead"
+    return None
+
+
+def is_factual_lookup(query: str, max_words: int = 12) -> bool:
+    """Short data questions ("data engineer salary in Austin") with no request for advice"""
+    return len(_words(query)) <= max_words and not _ADVICE_PATTERN.search(query)
+
+
+def _money(value: int, currency: str) -> str:
+    return f"{'$' if currency == 'USD' else currency + ' '}{value:,}"
+
+
+class KnowledgeBase:
+    """SQLite-backed store with a full-text index over roles and industries
+
+    Uses FTS5 when the SQLite build has it, otherwise an in-memory inverted
+    index over the same documents. Ingestion is skipped when the data files
+    have not changed since the last load.
+    """
+
+    def __init__(self, db_path: str = ":memory:"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = open_database(db_path)
+        self._conn.executescript(SCHEMA)
+        self.use_fts = _fts_available(self._conn)
+        self._inverted: Dict[str, Dict[tuple, int]] = {}
+        self._names: Dict[tuple, str] = {}
+        self._locations: List[str] = []
+        self.stats = {"lookups": 0, "direct_answers": 0, "grounded": 0, "misses": 0}
+        self._refresh_caches()
+
+    # -- ingestion ---------------------------------------------------------
+
+    @staticmethod
+    def _fingerprint(data_dir: str) -> str:
+        entries = []
+        for name in sorted(os.listdir(data_dir)):
+            stat = os.stat(os.path.join(data_dir, name))
+            entries.append(f"{name}:{stat.st_size}:{int(stat.st_mtime)}")
+        return "|".join(entries)
+
+    def ingest_directory(self, data_dir: str = DEFAULT_DATA_DIR, force: bool = False) -> bool:
+        """Load roles.json, industries.json and salaries.csv; returns False if already current"""
+        fingerprint = self._fingerprint(data_dir)
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+            if row and row[0] == fingerprint and not force:
+                return False
+
+            with self._conn:
+                for table in ("roles", "role_skills", "industries", "salaries", "entity_names"):
+                    self._conn.execute(f"DELETE FROM {table}")
+                if self.use_fts:
+                    self._conn.execute("DELETE FROM entity_fts")
+
+                roles_path = os.path.join(data_dir, "roles.json")
+                if os.path.exists(roles_path):
+                    with open(roles_path, "r") as f:
+                        self._ingest_roles(json.load(f))
+
+                industries_path = os.path.join(data_dir, "industries.json")
+                if os.path.exists(industries_path):
+                    with open(industries_path, "r") as f:
+                        self._ingest_industries(json.load(f))
+
+                salaries_path = os.path.join(data_dir, "salaries.csv")
+                if os.path.exists(salaries_path):
+                    with open(salaries_path, "r", newline="") as f:
+                        self._ingest_salaries(csv.DictReader(f))
+
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)", (fingerprint,))
+
+        self._refresh_caches()
+        return True
+
+    def _ingest_roles(self, roles: List[Dict[str, Any]]):
+        for role in roles:
+            self._conn.execute(
+                "INSERT INTO roles VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (role["role"], role.get("industry"), role.get("summary"), role.get("outlook"),
+                 role.get("growth_rate"), role.get("remote_share"), json.dumps(role.get("certifications", [])))
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO role_skills VALUES (?, ?, ?)",
+                [(role["role"], skill, "must") for skill in role.get("must_have_skills", [])] +
+                [(role["role"], skill, "preferred") for skill in role.get("preferred_skills", [])]
+            )
+            self._index_entity("role", role["role"], [role["role"]] + role.get("aliases", []))
+
+    def _ingest_industries(self, industries: List[Dict[str, Any]]):
+        for industry in industries:
+            self._conn.execute(
+                "INSERT INTO industries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (industry["industry"], industry.get("outlook"),
+                 json.dumps(industry.get("trends", [])), json.dumps(industry.get("emerging_roles", [])),
+                 json.dumps(industry.get("in_demand_skills", [])), industry.get("remote_share"),
+                 json.dumps(industry.get("hot_locations", [])), json.dumps(industry.get("challenges", [])))
+            )
+            self._index_entity("industry", industry["industry"], [industry["industry"]] + industry.get("aliases", []))
+
+    def _ingest_salaries(self, rows):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO salaries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(row["role"], row["location"], row["level"], int(row["p25"]), int(row["p50"]),
+              int(row["p75"]), int(row["p90"]), row.get("currency", "USD"), int(row.get("year") or 0))
+             for row in rows]
+        )
+
+    def _index_entity(self, kind: str, name: str, names: List[str]):
+        self._conn.execute("INSERT OR REPLACE INTO entity_names VALUES (?, ?, ?)", (kind, name, " | ".join(names)))
+        if self.use_fts:
+            self._conn.execute("INSERT INTO entity_fts (kind, name, body) VALUES (?, ?, ?)", (kind, name, " | ".join(names)))
+
+    def _refresh_caches(self):
+        """Rebuild the fallback inverted index and the known-location list"""
+        with self._lock:
+            self._locations = sorted(
+                (row[0] for row in self._conn.execute("SELECT DISTINCT location FROM salaries")),
+                key=len, reverse=True
+            )
+            if self.use_fts:
+                return
+            self._inverted = {}
+            self._names = {}
+            for kind, name, names in self._conn.execute("SELECT kind, name, names FROM entity_names"):
+                self._names[(kind, name)] = names
+                for word in _words(names):
+                    postings = self._inverted.setdefault(word, {})
+                    postings[(kind, name)] = postings.get((kind, name), 0) + 1
+
+    # -- retrieval ---------------------------------------------------------
+
+    def _search(self, kind: str, text: str) -> Optional[str]:
+        words = list(dict.fromkeys(_words(text)))
+        if not words:
+            return None
+
+        with self._lock:
+            if self.use_fts:
+                match = " OR ".join(f'"{word}"' for word in words)
+                candidates = self._conn.execute(
+                    "SELECT name, body FROM entity_fts WHERE entity_fts MATCH ? AND kind = ? ORDER BY bm25(entity_fts) LIMIT 10",
+                    (match, kind)
+                ).fetchall()
+            else:
+                scores: Dict[str, int] = {}
+                for word in words:
+                    for (entry_kind, name), count in self._inverted.get(word, {}).items():
+                        if entry_kind == kind:
+                            scores[name] = scores.get(name, 0) + count
+                candidates = [(name, self._names[(kind, name)]) for name in sorted(scores, key=scores.get, reverse=True)[:10]]
+
+        # Only accept a candidate whose full name or an alias occurs in the query;
+        # a partial match ("engineer") is not enough to ground on
+        lowered = f" {' '.join(words)} "
+        for name, body in candidates:
+            if any(f" {' '.join(_words(alias))} " in lowered for alias in body.split("|") if alias.strip()):
+                return name
+        return None
+
+    def find_role(self, text: str) -> Optional[str]:
+        return self._search("role", text)
+
+    def find_industry(self, text: str) -> Optional[str]:
+        return self._search("industry", text)
+
+    def find_location(self, text: str) -> Optional[str]:
+        lowered = text.lower()
+        for location in self._locations:
+            if location.lower() in lowered:
+                return location
+        return None
+
+    def role_profile(self, role: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT role, industry, summary, outlook, growth_rate, remote_share, certifications FROM roles WHERE role = ?",
+                (role,)
+            ).fetchone()
+            if not row:
+                return None
+            skills = self._conn.execute("SELECT skill, importance FROM role_skills WHERE role = ? ORDER BY rowid", (role,)).fetchall()
+        return {
+            "role": row[0], "industry": row[1], "summary": row[2], "outlook": row[3],
+            "growth_rate": row[4], "remote_share": row[5], "certifications": json.loads(row[6] or "[]"),
+            "must_have_skills": [skill for skill, importance in skills if importance == "must"],
+            "preferred_skills": [skill for skill, importance in skills if importance == "preferred"]
+        }
+
+    def industry_profile(self, industry: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM industries WHERE industry = ?", (industry,)).fetchone()
+        if not row:
+            return None
+        keys = ("industry", "outlook", "trends", "emerging_roles", "in_demand_skills", "remote_share", "hot_locations", "challenges")
+        profile = dict(zip(keys, row))
+        for key in ("trends", "emerging_roles", "in_demand_skills", "hot_locations", "challenges"):
+            profile[key] = json.loads(profile[key] or "[]")
+        return profile
+
+    def salary_bands(self, role: str, location: Optional[str] = None, level: Optional[str] = None) -> List[Dict[str, Any]]:
+        location = location or DEFAULT_LOCATION
+        query = "SELECT role, location, level, p25, p50, p75, p90, currency, year FROM salaries WHERE role = ? AND location = ?"
+        params: List[Any] = [role, location]
+        if level:
+            query += " AND level = ?"
+            params.append(level)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        keys = ("role", "location", "level", "p25", "p50", "p75", "p90", "currency", "year")
+        bands = [dict(zip(keys, row)) for row in rows]
+        return sorted(bands, key=lambda band: LEVELS.index(band["level"]) if band["level"] in LEVELS else len(LEVELS))
+
+    # -- tool grounding ----------------------------------------------------
+
+    def _salary_facts(self, role: str, location: Optional[str], level: Optional[str]) -> List[str]:
+        return [
+            f"{band['level'].title()} {role}, {band['location']} ({band['year']}): "
+            f"p25 {_money(band['p25'], band['currency'])}, median {_money(band['p50'], band['currency'])}, "
+            f"p75 {_money(band['p75'], band['currency'])}, p90 {_money(band['p90'], band['currency'])}"
+            for band in self.salary_bands(role, location, level)
+        ]
+
+    def _industry_facts(self, industry: str) -> List[str]:
+        profile = self.industry_profile(industry)
+        return [
+            f"{industry} outlook: {profile['outlook']}",
+            f"Trends: {'; '.join(profile['trends'])}",
+            f"Emerging roles: {', '.join(profile['emerging_roles'])}",
+            f"Skills in demand: {', '.join(profile['in_demand_skills'])}",
+            f"Remote-eligible share: about {profile['remote_share']:.0%}",
+            f"Hiring hotspots: {', '.join(profile['hot_locations'])}",
+            f"Challenges: {'; '.join(profile['challenges'])}"
+        ]
+
+    def lookup(self, tool_name: str, query: str) -> Dict[str, Any]:
+        """Facts for a tool call, plus a complete answer when the query is a pure data lookup
+
+        Returns {"facts": [...], "answer": str or None}; no facts means the
+        tool should fall back to its full prompt.
+        """
+        facts: List[str] = []
+        answer = None
+
+        if tool_name == "compensation_research_analyst":
+            role = self.find_role(query)
+            if role:
+                location, level = self.find_location(query), detect_level(query)
+                facts = self._salary_facts(role, location, level) or self._salary_facts(role, None, level)
+                if facts and is_factual_lookup(query):
+                    answer = "Salary bands from the local market dataset:\n" + "\n".join(f"- {fact}" for fact in facts)
+
+        elif tool_name == "industry_trend_analyzer":
+            industry = self.find_industry(query)
+            if industry:
+                facts = self._industry_facts(industry)
+                if is_factual_lookup(query, max_words=4):
+                    answer = f"{industry} market snapshot (local dataset):\n" + "\n".join(f"- {fact}" for fact in facts)
+
+        with self._lock:
+            self.stats["lookups"] += 1
+            self.stats["direct_answers" if answer else "grounded" if facts else "misses"] += 1
+        return {"facts": facts, "answer": answer}
+
+
+def grounded_prompt(task: str, query: str, facts: List[str], source: str = "Known market data (use it; do not invent other figures)") -> str:
+    """Compact prompt that asks the model to reason over retrieved facts instead of recalling them"""
+    fact_lines = "\n".join(f"- {fact}" for fact in facts)
+    return (
+        f"{task}\nRequest: {query}\n"
+        f"{source}:\n{fact_lines}\n"
+        "Answer concisely with specific, actionable guidance."
+    )
+
+
+_knowledge_base: Optional[KnowledgeBase] = None
+_knowledge_base_lock = threading.Lock()
+
+
+def get_knowledge_base() -> KnowledgeBase:
+    """Shared knowledge base, ingested from KNOWLEDGE_BASE_DATA on first use"""
+    global _knowledge_base
+    with _knowledge_base_lock:
+        if _knowledge_base is None:
+            knowledge_base = KnowledgeBase(DEFAULT_DB_PATH)
+            if os.path.isdir(DEFAULT_DATA_DIR):
+                knowledge_base.ingest_directory(DEFAULT_DATA_DIR)
+            _knowledge_base = knowledge_base
+        return _knowledge_base
+
+
+def set_knowledge_base(knowledge_base: Optional[KnowledgeBase]):
+    global _knowledge_base
+    with _knowledge_base_lock:
+        _knowledge_base = knowledge_base
+
+
+def _cache_lookups() -> Dict[tuple, int]:
+    knowledge_base = _knowledge_base
+    if knowledge_base is None:
+        return {}
+    stats = knowledge_base.stats
+    return {("knowledge_base", "direct"): stats["direct_answers"],
+            ("knowledge_base", "grounded"): stats["grounded"],
+            ("knowledge_base", "miss"): stats["misses"]}
+
+
+CACHE_LOOKUPS.add_source(_cache_lookups)
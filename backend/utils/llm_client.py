@@ -0,0 +1,75 @@
+"""
+LangChain Chat Model Factory
+Builds ChatOpenAI models whose upstream calls go through utils.openai_helper.call_upstream,
+so agents and their tools share the same call path as agentic_completion
+"""
+
+import os
+from typing import Any, Iterator, List, Optional
+from utils.openai_helper import call_upstream
+from utils.deadline import upstream_timeout_kwargs
+from utils.session_replay import get_session_recorder, MODE_REPLAY
+
+try:
+    from langchain_openai import ChatOpenAI
+    from langchain_core.messages import AIMessageChunk, BaseMessage
+    from langchain_core.outputs import ChatGenerationChunk, ChatResult
+    LANGCHAIN_AVAILABLE = True
+except ImportError:
+    LANGCHAIN_AVAILABLE = False
+
+
+if LANGCHAIN_AVAILABLE:
+    class GatewayChatOpenAI(ChatOpenAI):
+        """ChatOpenAI that sends each completion request through the shared upstream call path
+
+        Every request is made as a single non-streaming completion, so the
+        agent executor's streamed planning calls are recorded and replayed too.
+        """
+
+        def _generate(
+            self,
+            messages: List[BaseMessage],
+            stop: Optional[List[str]] = None,
+            run_manager: Any = None,
+            **kwargs: Any
+        ) -> ChatResult:
+            message_dicts, params = self._create_message_dicts(messages, stop)
+            request_payload = {"messages": message_dicts, **params, **kwargs, "stream": False}
+
+            def send():
+                response = self.client.create(**request_payload, **upstream_timeout_kwargs())
+                return response if isinstance(response, dict) else response.model_dump()
+
+            return self._create_chat_result(call_upstream("chat.completions", request_payload, send))
+
+        def _stream(
+            self,
+            messages: List[BaseMessage],
+            stop: Optional[List[str]] = None,
+            run_manager: Any = None,
+            **kwargs: Any
+        ) -> Iterator[ChatGenerationChunk]:
+            result = self._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            for generation in result.generations:
+                message = generation.message
+                chunk = AIMessageChunk(content=message.content, additional_kwargs=message.additional_kwargs)
+                yield ChatGenerationChunk(message=chunk, generation_info=generation.generation_info)
+
+
+def create_chat_model(model: str = "gpt-3.5-turbo", temperature: float = 0.7, **kwargs: Any):
+    """Create the chat model used by agents and tools"""
+    if not LANGCHAIN_AVAILABLE:
+        raise ImportError("LangChain not installed. Install with: pip install langchain langchain-openai")
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key and get_session_recorder().mode == MODE_REPLAY:
+        api_key = "replay-session"  # never sent; replayed calls stay offline
+
+    return GatewayChatOpenAI(
+        model=model,
+        temperature=temperature,
+        openai_api_key=api_key,
+        max_retries=0,  # retries are owned by the shared upstream limiter
+        **kwargs
+    )
@@ -0,0 +1,299 @@
+"""
+Metrics
+Counters and fixed-bucket histograms rendered in the Prometheus text exposition
+format at /metrics. Recording is a dict lookup, a bisect and one locked add.
+"""
+
+import bisect
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils.structured_logging import get_logger
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers in-memory lookups up to slow agent runs
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[str, ...]
+
+
+log = get_logger("metrics")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], *extra: str) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(pair for pair in extra if pair)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _CounterValue:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Labels, Any] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: Any):
+        """Child series for these label values, created on first use"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _series(self) -> List[Tuple[Labels, Any]]:
+        with self._lock:
+            return [(tuple(str(value) for value in values), child) for values, child in self._children.items()]
+
+    def samples(self, worker: str = "") -> List[str]:
+        """Sample lines; `worker` is a label pair added to every series"""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterValue()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def samples(self, worker: str = "") -> List[str]:
+        return [f"{self.name}{_label_text(self.labelnames, labels, worker)} {_format_value(child.value)}"
+                for labels, child in self._series()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def samples(self, worker: str = "") -> List[str]:
+        lines = []
+        for labels, child in self._series():
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, labels, worker, le)} {cumulative}")
+            label_text = _label_text(self.labelnames, labels, worker)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Values read from existing component stats at scrape time
+
+    Each source returns {label values: value}; nothing is recorded on the hot
+    path. `kind` is "counter" for monotonic totals and "gauge" otherwise.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), kind: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self._sources: List[Callable[[], Dict[Labels, float]]] = []
+
+    def add_source(self, source: Callable[[], Dict[Labels, float]]):
+        with self._lock:
+            self._sources.append(source)
+
+    def samples(self, worker: str = "") -> List[str]:
+        with self._lock:
+            sources = list(self._sources)
+        lines = []
+        for source in sources:
+            try:
+                values = source()
+            except Exception as e:
+                log.warning("metrics.source_failed", metric=self.name, error=e)
+                continue
+            for labels, value in values.items():
+                labels = tuple(str(label) for label in labels)
+                lines.append(f"{self.name}{_label_text(self.labelnames, labels, worker)} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, labelnames: Sequence[str] = (), kind: str = "gauge") -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, labelnames, kind))
+
+    def render(self) -> str:
+        """All metrics in the text exposition format (version 0.0.4)
+
+        Every series carries a worker="<pid>" label: each Gunicorn worker
+        keeps its own values, so series from different workers must not
+        be mistaken for one another when scrapes land on different workers.
+        The pid is read at render time, so it is right after a fork.
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        worker = f'worker="{os.getpid()}"'
+        lines = []
+        for metric in metrics:
+            samples = metric.samples(worker)
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "Flask route latency", ("route", "method", "status"))
+AGENT_RUN_SECONDS = REGISTRY.histogram(
+    "agent_run_duration_seconds", "LangChain agent executor run time", ("agent", "outcome"))
+TOOL_CALL_SECONDS = REGISTRY.histogram(
+    "agent_tool_duration_seconds", "Agent tool call latency", ("tool", "outcome"))
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "llm_upstream_duration_seconds", "Upstream LLM call latency, including queueing and retries",
+    ("endpoint", "model", "outcome"))
+UPSTREAM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total", "Tokens reported by upstream LLM responses", ("model", "kind"))
+CACHE_LOOKUPS = REGISTRY.callback(
+    "cache_lookups_total", "Local cache and index lookups by result", ("cache", "result"), kind="counter")
+UPSTREAM_QUEUE_DEPTH = REGISTRY.callback(
+    "llm_queue_depth", "Upstream calls waiting for a concurrency slot", ("queue",))
+UPSTREAM_IN_FLIGHT = REGISTRY.callback(
+    "llm_in_flight", "Upstream calls currently running")
+ADMISSION_REJECTIONS = REGISTRY.counter(
+    "admission_rejections_total", "Agent requests turned away with a 429", ("endpoint", "reason"))
+COMPRESSION_BYTES = REGISTRY.counter(
+    "http_compression_bytes_total", "Compressed API response bytes before (raw) and after (sent) encoding",
+    ("encoding", "stage"))
+PERSISTENCE_FLUSH_SECONDS = REGISTRY.histogram(
+    "analytics_flush_duration_seconds", "Analytics store batch write time", ("outcome",))
+PERSISTENCE_ROWS = REGISTRY.counter(
+    "analytics_rows_written_total", "Conversation and evaluation rows written by the analytics store")
+
+
+@contextmanager
+def timed(histogram: Histogram, *labels: Any):
+    """Observe the duration of the block, with an extra outcome label of ok/error"""
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        histogram.labels(*labels, outcome).observe(time.perf_counter() - start)
+
+
+def record_usage(model: Optional[str], usage: Optional[Dict[str, Any]]):
+    """Count prompt and completion tokens from an OpenAI-style usage dict"""
+    if not usage:
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        tokens = usage.get(kind)
+        if tokens:
+            UPSTREAM_TOKENS.labels(model or "unknown", kind[:-len("_tokens")]).inc(tokens)
+
+
+def instrument_tools(tools: Iterable[Any]) -> List[Any]:
+    """Wrap each LangChain Tool's function to record its latency by tool name"""
+    tools = list(tools)
+    for tool in tools:
+        func = tool.func
+
+        def run(*args, _func=func, _name=tool.name, **kwargs):
+            with timed(TOOL_CALL_SECONDS, _name):
+                return _func(*args, **kwargs)
+
+        tool.func = run
+    return tools
+
+
+def render() -> str:
+    return REGISTRY.render()
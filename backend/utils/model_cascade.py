@@ -0,0 +1,194 @@
+"""
+Model Cascade for Tool Calls
+Answers each tool prompt with a fast, cheap model first and escalates to a
+stronger model only when the reply failed or, where configured, scores too low
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+from utils.evaluation import evaluate_response_quality
+from utils.structured_logging import get_logger
+
+try:
+    from langchain.schema import HumanMessage
+    LANGCHAIN_AVAILABLE = True
+except ImportError:
+    LANGCHAIN_AVAILABLE = False
+
+# USD per 1K tokens as (prompt, completion); used for the per-tier cost report
+MODEL_PRICING = {
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4": (0.03, 0.06),
+    "local-stub": (0.0, 0.0)
+}
+
+DEFAULT_CASCADE_CONFIG = {
+    "tiers": {
+        "fast": {"model": "gpt-3.5-turbo", "temperature": 0.7},
+        "strong": {"model": "gpt-4", "temperature": 0.7},
+        "stub": {"model": "local-stub"}
+    },
+    # Every tool tries the fast tier first and escalates only empty, refused or error replies.
+    # The endpoint keyword scores do not fit sub-tool outputs (ATS checks, company research,
+    # answer coaching), so a score threshold is opt-in per tool via "min_quality_score".
+    "default": {"tiers": ["fast", "strong"], "min_quality_score": 0},
+    # Single-tier tools never escalate: question lists for the bank, progress check-ins
+    "tools": {
+        "question_generator": {"tiers": ["fast"]},
+        "learning_progress_tracker": {"tiers": ["fast"]}
+    }
+}
+
+
+# Openings of replies that carry no answer; compared lowercased
+FAILED_REPLY_PREFIXES = ("i apologize", "i'm sorry", "i am sorry", "sorry,", "i cannot", "i can't", "error")
+
+
+log = get_logger("model_cascade")
+
+
+def failed_reply(content: str) -> bool:
+    """Empty, refused or error replies, worth retrying on a stronger tier whatever the tool"""
+    text = content.strip().lower()
+    return not text or text.startswith(FAILED_REPLY_PREFIXES)
+
+
+def load_cascade_config() -> Dict[str, Any]:
+    """Default cascade config, overlaid with the JSON file named by MODEL_CASCADE_CONFIG"""
+    config = json.loads(json.dumps(DEFAULT_CASCADE_CONFIG))
+    path = os.getenv("MODEL_CASCADE_CONFIG")
+    if path:
+        with open(path, "r") as f:
+            overrides = json.load(f)
+        config["tiers"].update(overrides.get("tiers", {}))
+        config["default"].update(overrides.get("default", {}))
+        config["tools"].update(overrides.get("tools", {}))
+    return config
+
+
+class LocalStubChatModel:
+    """Deterministic offline model for tests and local development"""
+
+    class _Reply:
+        def __init__(self, content: str):
+            self.content = content
+            self.response_metadata = {"token_usage": {}}
+
+    def invoke(self, messages: List[Any]):
+        prompt = messages[-1].content.strip()
+        return self._Reply(f"[local-stub] {prompt[:200]}")
+
+
+class CascadeStats:
+    """Per-tier call counts, escalations, latency, tokens and estimated cost"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiers: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, tier: str, model: str, latency: float, usage: Dict[str, Any], escalated: bool):
+        prompt_tokens = usage.get("prompt_tokens") or 0
+        completion_tokens = usage.get("completion_tokens") or 0
+        prompt_price, completion_price = MODEL_PRICING.get(model, (0.0, 0.0))
+        cost = (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+        with self._lock:
+            stats = self._tiers.setdefault(tier, {
+                "model": model,
+                "calls": 0,
+                "escalations": 0,
+                "total_latency_seconds": 0.0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "estimated_cost_usd": 0.0
+            })
+            stats["calls"] += 1
+            stats["escalations"] += int(escalated)
+            stats["total_latency_seconds"] += latency
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["estimated_cost_usd"] += cost
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            tiers = {name: dict(stats) for name, stats in self._tiers.items()}
+
+        total_latency = sum(stats["total_latency_seconds"] for stats in tiers.values()) or 1.0
+        total_cost = sum(stats["estimated_cost_usd"] for stats in tiers.values()) or 1.0
+        for stats in tiers.values():
+            stats["avg_latency_seconds"] = round(stats["total_latency_seconds"] / max(stats["calls"], 1), 3)
+            stats["latency_share"] = round(stats["total_latency_seconds"] / total_latency, 3)
+            stats["cost_share"] = round(stats["estimated_cost_usd"] / total_cost, 3)
+            stats["total_latency_seconds"] = round(stats["total_latency_seconds"], 3)
+            stats["estimated_cost_usd"] = round(stats["estimated_cost_usd"], 6)
+        return tiers
+
+
+CASCADE_STATS = CascadeStats()
+
+
+class ModelCascade:
+    """Tiered models for one agent's tools
+
+    `endpoint` selects the keyword set used by evaluate_response_quality for
+    tools configured with a "min_quality_score".
+    """
+
+    def __init__(self, endpoint: str, config: Optional[Dict[str, Any]] = None):
+        self.endpoint = endpoint
+        self.config = config or load_cascade_config()
+        self._models: Dict[str, Any] = {}
+
+    def _model_for(self, tier: str):
+        if tier not in self._models:
+            spec = self.config["tiers"][tier]
+            if spec["model"] == "local-stub":
+                self._models[tier] = LocalStubChatModel()
+            else:
+                from utils.llm_client import create_chat_model
+                self._models[tier] = create_chat_model(model=spec["model"], temperature=spec.get("temperature", 0.7))
+        return self._models[tier]
+
+    def tool_settings(self, tool_name: str) -> Dict[str, Any]:
+        return {**self.config["default"], **self.config["tools"].get(tool_name, {})}
+
+    def invoke(self, tool_name: str, prompt: str) -> str:
+        """Answer `prompt` with the cheapest tier whose reply did not fail (and meets the tool's score, if set)"""
+        settings = self.tool_settings(tool_name)
+        tiers = settings["tiers"]
+        content = ""
+
+        for index, tier in enumerate(tiers):
+            model_name = self.config["tiers"][tier]["model"]
+            start_time = time.perf_counter()
+            response = self._model_for(tier).invoke([HumanMessage(content=prompt)])
+            latency = time.perf_counter() - start_time
+            content = response.content
+
+            is_last = index == len(tiers) - 1
+            quality = None
+            escalate = False
+            if not is_last:
+                escalate = failed_reply(content)
+                if not escalate and settings.get("min_quality_score"):
+                    quality = evaluate_response_quality(content, self.endpoint)["quality_score"]
+                    escalate = quality < settings["min_quality_score"]
+
+            CASCADE_STATS.record(tier, model_name, latency, response.response_metadata.get("token_usage") or {}, escalate)
+            if not escalate:
+                return content
+
+            log.info("cascade.escalated", tool=tool_name, tier=tier, quality_score=quality, next_tier=tiers[index + 1])
+
+        return content
+
+
+def cascade_report() -> Dict[str, Any]:
+    """Latency and cost split per tier, for the evaluation dashboard"""
+    return CASCADE_STATS.report()
@@ -1,38 +1,82 @@
-
 import os
 from openai import OpenAI
+from utils.session_replay import get_session_recorder, ReplayMissError, MODE_REPLAY
+from utils.rate_limiter import get_upstream_limiter
+from utils.hedging import get_request_hedger
+from utils.deadline import DeadlineExceeded, check_deadline, upstream_timeout_kwargs
+from utils.circuit_breaker import get_breaker
+from utils.metrics import UPSTREAM_SECONDS, record_usage, timed
 
 client = None
 
 def setup_openai():
     global client
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    if get_session_recorder().mode == MODE_REPLAY and not os.getenv("OPENAI_API_KEY"):
+        # Replayed sessions never reach the network, so no key is required
+        return
+    # Retries are owned by the shared upstream limiter, not the SDK
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+
+def call_upstream(endpoint, request, send):
+    """Route a single upstream LLM call through the shared call path
+
+    `request` is the JSON-serializable request payload and `send` performs
+    the live call, returning a JSON-serializable response. Every call is
+    paced, concurrency-limited and retried by the shared upstream limiter,
+    bounded by the current request deadline, hedged when enabled and
+    short-circuited while the upstream's breaker is open.
+    """
+    check_deadline()
+    recorder = get_session_recorder()
+    limiter = get_upstream_limiter()
+    upstream = f"{endpoint}:{request.get('model')}"
+
+    def attempt():
+        return limiter.run(lambda: recorder.call(endpoint, request, send))
+
+    with timed(UPSTREAM_SECONDS, endpoint, request.get("model")):
+        response = get_breaker(f"upstream:{upstream}").call(
+            lambda: get_request_hedger().run(upstream, attempt),
+            neutral_errors=(DeadlineExceeded, ReplayMissError)
+        )
+    if isinstance(response, dict):
+        record_usage(request.get("model"), response.get("usage"))
+    return response
+
+def _usage_to_dict(usage):
+    if usage is None:
+        return None
+    if hasattr(usage, "model_dump"):
+        return usage.model_dump()
+    return dict(usage)
 
 def complete_prompt(prompt, model="gpt-3.5-turbo", max_tokens=512):
     """Legacy function for backward compatibility"""
     messages = [
         {"role": "user", "content": prompt}
     ]
-    response = client.chat.completions.create(
-        model=model,
-        messages=messages,
-        max_tokens=max_tokens
-    )
-    return response.choices[0].message.content.strip()
+    request_payload = {"model": model, "messages": messages, "max_tokens": max_tokens}
+
+    def send():
+        response = client.chat.completions.create(**request_payload, **upstream_timeout_kwargs())
+        return {"content": response.choices[0].message.content.strip()}
+
+    return call_upstream("chat.completions", request_payload, send)["content"]
 
 def agentic_completion(system_prompt, user_prompt, model="gpt-3.5-turbo", max_tokens=512):
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt}
     ]
-    response = client.chat.completions.create(
-        model=model,
-        messages=messages,
-        max_tokens=max_tokens
-    )
-    return {
-        "content": response.choices[0].message.content.strip(),
-        "usage": response.usage,
-        "id": response.id,
-        "model": response.model
-    }
+    request_payload = {"model": model, "messages": messages, "max_tokens": max_tokens}
+
+    def send():
+        response = client.chat.completions.create(**request_payload, **upstream_timeout_kwargs())
+        return {
+            "content": response.choices[0].message.content.strip(),
+            "usage": _usage_to_dict(response.usage),
+            "id": response.id,
+            "model": response.model
+        }
+
+    return call_upstream("chat.completions", request_payload, send)
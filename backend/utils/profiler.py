@@ -0,0 +1,235 @@
+"""
+Sampling Profiler
+A stack-sampling thread that records where request and background threads spend their time,
+saved as collapsed stacks (for flamegraph.pl / speedscope) and speedscope JSON
+"""
+
+import os
+import sys
+import time
+import random
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from utils.serialization import dumps
+from utils.structured_logging import get_logger
+
+DEFAULT_OUTPUT_DIR = os.getenv("PROFILER_OUTPUT_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profiles"))
+DEFAULT_INTERVAL_SECONDS = float(os.getenv("PROFILER_INTERVAL_MS", "10")) / 1000
+MAX_DURATION_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "300"))
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+log = get_logger("profiler")
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profiling session is already running"""
+
+
+def _frame_name(code, cache: Dict[Any, str]) -> str:
+    name = cache.get(code)
+    if name is None:
+        path = code.co_filename.replace("\\", "/").split("/")
+        # Collapsed stacks use ';' between frames, so keep it out of names
+        name = f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})".replace(";", ":")
+        cache[code] = name
+    return name
+
+
+class SamplingProfiler:
+    """Samples the stacks of registered threads every `interval` seconds
+
+    Request threads opt in through enter_request()/exit_request(); while a
+    session runs, each request is profiled with probability `sample_rate`.
+    Background threads wrap each unit of work in background_work(), which
+    is always profiled while a session runs. When nothing is running the
+    hooks cost a single attribute check. State is per process: under a
+    pre-forking server a session covers only the worker it was started in.
+    """
+
+    def __init__(self, output_dir: str = DEFAULT_OUTPUT_DIR):
+        self.output_dir = output_dir
+        self.active = False
+        self._lock = threading.Lock()
+        self._threads: Dict[int, str] = {}
+        self._stacks: Counter = Counter()
+        self._names: Dict[Any, str] = {}
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._session: Dict[str, Any] = {}
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    def start(self, seconds: float, sample_rate: float = 1.0, interval: float = DEFAULT_INTERVAL_SECONDS) -> Dict[str, Any]:
+        """Profile sampled requests for `seconds`, then write the output files"""
+        with self._lock:
+            if self.active:
+                raise ProfilerBusy("A profiling session is already running")
+            self.active = True
+            self._stacks = Counter()
+            self._threads = {}
+            self._stop.clear()
+            self._session = {
+                "worker": os.getpid(),
+                "started_at": datetime.now().isoformat(),
+                "seconds": min(max(float(seconds), 0.1), MAX_DURATION_SECONDS),
+                "sample_rate": min(max(float(sample_rate), 0.0), 1.0),
+                "interval_seconds": max(float(interval), 0.001),
+                "samples": 0,
+                "requests_profiled": 0
+            }
+            self._sampler = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+            self._sampler.start()
+            return dict(self._session)
+
+    def stop(self) -> Optional[Dict[str, Any]]:
+        """End the running session early; returns its result"""
+        sampler = self._sampler
+        if sampler is None:
+            return self.last_result
+        self._stop.set()
+        sampler.join()
+        return self.last_result
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"worker": os.getpid(), "active": self.active, "session": dict(self._session) if self.active else None,
+                    "last_result": self.last_result}
+
+    def enter_request(self, label: str = ""):
+        if not self.active or random.random() >= self._session.get("sample_rate", 0.0):
+            return
+        with self._lock:
+            if self.active:
+                self._threads[threading.get_ident()] = label
+                self._session["requests_profiled"] += 1
+
+    @contextmanager
+    def background_work(self, label: str):
+        """Profile one unit of work on a background thread, such as a persistence write"""
+        if self.active:
+            with self._lock:
+                if self.active:
+                    self._threads[threading.get_ident()] = label
+        try:
+            yield
+        finally:
+            self.exit_request()
+
+    def exit_request(self):
+        if self._threads:
+            with self._lock:
+                self._threads.pop(threading.get_ident(), None)
+
+    def _run(self):
+        session = self._session
+        deadline = time.monotonic() + session["seconds"]
+        interval = session["interval_seconds"]
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            self._sample()
+            self._stop.wait(interval)
+        try:
+            result = self._write(session, self._stacks)
+        except OSError as e:
+            log.warning("profiler.write_failed", error=e)
+            result = {"error": str(e), **session}
+        with self._lock:
+            self.last_result = result
+            self.active = False
+            self._threads = {}
+            self._sampler = None
+        log.info("profiler.session_finished", samples=session["samples"])
+
+    def _sample(self):
+        with self._lock:
+            threads = dict(self._threads)
+        if not threads:
+            return
+        frames = sys._current_frames()
+        for thread_id, label in threads.items():
+            frame = frames.get(thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame.f_code, self._names))
+                frame = frame.f_back
+            if label:
+                stack.append(label)
+            stack.reverse()
+            self._stacks[";".join(stack)] += 1
+            self._session["samples"] += 1
+
+    def _write(self, session: Dict[str, Any], stacks: Counter) -> Dict[str, Any]:
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+        collapsed_path = base + ".collapsed.txt"
+        speedscope_path = base + ".speedscope.json"
+
+        with open(collapsed_path, "w") as f:
+            f.write(collapsed(stacks))
+        with open(speedscope_path, "wb") as f:
+            f.write(dumps(speedscope(stacks, session["interval_seconds"], os.path.basename(base))))
+
+        top = Counter()
+        for stack, count in stacks.items():
+            top[stack.rsplit(";", 1)[-1]] += count
+        return {
+            **session,
+            "collapsed_file": collapsed_path,
+            "speedscope_file": speedscope_path,
+            "top_frames": [{"frame": frame, "samples": count} for frame, count in top.most_common(10)]
+        }
+
+
+def collapsed(stacks: Counter) -> str:
+    """Brendan Gregg's collapsed format: one "root;...;leaf count" line per stack"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def speedscope(stacks: Counter, interval: float, name: str) -> Dict[str, Any]:
+    """Speedscope "sampled" profile with each stack weighted by its sample count"""
+    frames: List[Dict[str, str]] = []
+    index: Dict[str, int] = {}
+    samples: List[List[int]] = []
+    weights: List[float] = []
+    for stack, count in stacks.most_common():
+        indices = []
+        for frame in stack.split(";"):
+            if frame not in index:
+                index[frame] = len(frames)
+                frames.append({"name": frame})
+            indices.append(index[frame])
+        samples.append(indices)
+        weights.append(round(count * interval, 6))
+    return {
+        "$schema": SPEEDSCOPE_SCHEMA,
+        "name": name,
+        "exporter": "ai-career-agent sampling profiler",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": round(sum(weights), 6),
+            "samples": samples,
+            "weights": weights
+        }]
+    }
+
+
+_profiler: Optional[SamplingProfiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> SamplingProfiler:
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = SamplingProfiler()
+        return _profiler
@@ -0,0 +1,304 @@
+"""
+Interview Question Bank
+Indexed SQLite store of interview questions by role, level, competency and
+type; requests are served by diverse sampling and the LLM only fills gaps
+"""
+
+import os
+import re
+import json
+import hashlib
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.analytics_store import open_database
+from utils.knowledge_base import BACKEND_DIR, detect_level
+from utils.skill_graph import get_skill_graph
+from utils.metrics import CACHE_LOOKUPS
+
+DEFAULT_DB_PATH = os.path.join(BACKEND_DIR, os.getenv("QUESTION_BANK_DB", "question_bank.db"))
+DEFAULT_SEED_PATH = os.getenv("QUESTION_BANK_SEED", os.path.join(BACKEND_DIR, "data", "question_bank", "seed_questions.json"))
+DEFAULT_HISTORY_PATH = os.path.join(BACKEND_DIR, "conversation_history.json")
+
+ANY_ROLE = "any"
+QUESTION_TYPES = ("behavioral", "technical", "situational", "company", "reverse")
+# Questions served per type when a request does not ask for a specific mix
+DEFAULT_MIX = {"behavioral": 5, "technical": 6, "situational": 3, "company": 2, "reverse": 3}
+# Role-specific technical questions needed before the bank answers without the LLM
+MIN_ROLE_QUESTIONS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    role TEXT NOT NULL,
+    level TEXT,
+    competency TEXT,
+    type TEXT NOT NULL,
+    question TEXT NOT NULL,
+    question_hash TEXT NOT NULL UNIQUE,
+    source TEXT,
+    created_at TEXT,
+    times_served INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_questions_role_type ON questions (role, type, level);
+CREATE INDEX IF NOT EXISTS idx_questions_competency ON questions (role, competency);
+"""
+
+_SECTION_TYPES = [
+    (re.compile(r"behaviou?ral", re.I), "behavioral"),
+    (re.compile(r"technical|coding|system design", re.I), "technical"),
+    (re.compile(r"situational|scenario", re.I), "situational"),
+    (re.compile(r"reverse|questions to ask|ask the interviewer", re.I), "reverse"),
+    (re.compile(r"company|culture|role-specific|motivation", re.I), "company")
+]
+_COMPETENCIES = [
+    (re.compile(r"\b(lead|led|leadership|influence|mentor)", re.I), "leadership"),
+    (re.compile(r"\b(conflict|disagree|feedback)", re.I), "conflict resolution"),
+    (re.compile(r"\b(fail|mistake|wrong)", re.I), "failure and learning"),
+    (re.compile(r"\b(priorit|deadline|urgent)", re.I), "prioritization"),
+    (re.compile(r"\b(design|architect|scale|scalab)", re.I), "system design"),
+    (re.compile(r"\b(debug|investigate|troubleshoot|latency|incident)", re.I), "debugging"),
+    (re.compile(r"\b(explain|present|communicat|stakeholder)", re.I), "communication"),
+    (re.compile(r"\b(why (?:do you want|this)|values|culture)", re.I), "motivation")
+]
+_QUESTION_LINE = re.compile(r"^\s*(?:[-*•]|\d+[.)]|Q\d*[:.])?\s*(?:\*\*)?\s*(.{15,300}?\?)\s*(?:\*\*)?\s*(?:\((?:easy|medium|hard)\))?\s*$", re.I)
+_HEADER_LINE = re.compile(r"^\s*(?:#+|\d+\.)?\s*\**([A-Z][A-Za-z /&()-]{3,60}?)\**\s*:?\s*$")
+_WORDS = re.compile(r"[a-z0-9]+")
+# The role title ends at the first clause ("Pastry chef at X, 45 min panel" -> "pastry chef")
+_ROLE_CUT = re.compile(r"[,;:\n(]| at | for | with | in | - ")
+_LEVEL_WORDS = {"senior", "junior", "lead", "principal", "staff", "sr", "jr", "mid", "level", "entry", "role", "interview", "position"}
+
+
+def question_hash(question: str) -> str:
+    """Hash of the normalized wording, so trivially different copies dedupe"""
+    return hashlib.sha256(" ".join(_WORDS.findall(question.lower())).encode()).hexdigest()
+
+
+def _similar(a: set, b: set, threshold: float = 0.7) -> bool:
+    return bool(a and b) and len(a & b) / len(a | b) >= threshold
+
+
+def classify_competency(question: str, default: str = "general") -> str:
+    for pattern, competency in _COMPETENCIES:
+        if pattern.search(question):
+            return competency
+    return default
+
+
+def parse_questions(text: str) -> List[Dict[str, str]]:
+    """Questions from generated text; the type comes from the nearest section header"""
+    questions = []
+    current_type = "behavioral"
+    for line in text.splitlines():
+        header = _HEADER_LINE.match(line)
+        if header and not line.strip().endswith("?"):
+            for pattern, question_type in _SECTION_TYPES:
+                if pattern.search(header.group(1)):
+                    current_type = question_type
+                    break
+            continue
+        match = _QUESTION_LINE.match(line)
+        if match:
+            question = match.group(1).strip().strip('"')
+            questions.append({"type": current_type, "competency": classify_competency(question), "question": question})
+    return questions
+
+
+class QuestionBank:
+    """Question store with per-role coverage checks and diversity-aware sampling"""
+
+    def __init__(self, db_path: str = ":memory:"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = open_database(db_path)
+        self._conn.executescript(SCHEMA)
+        self.stats = {"served_from_bank": 0, "gaps_filled": 0, "questions_added": 0}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+
+    def resolve_role(self, text: str) -> str:
+        """Canonical role name from free text; unknown roles keep their own normalized title"""
+        role = get_skill_graph().find_role(text)
+        if role:
+            return role
+        title = _ROLE_CUT.split(text.lower(), maxsplit=1)[0]
+        words = [word for word in _WORDS.findall(title) if word not in _LEVEL_WORDS]
+        return " ".join(words[:5]).title() or ANY_ROLE
+
+    def add(self, questions: List[Dict[str, str]], role: str, level: Optional[str] = None, source: str = "generated") -> int:
+        """Insert questions, skipping any whose normalized wording is already stored"""
+        now = datetime.now().isoformat()
+        rows = [
+            (question.get("role", role), question.get("level", level), question.get("competency") or classify_competency(question["question"]),
+             question.get("type", "behavioral"), question["question"], question_hash(question["question"]), source, now)
+            for question in questions
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO questions (role, level, competency, type, question, question_hash, source, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            added = self._conn.total_changes - before
+            self.stats["questions_added"] += added
+        return added
+
+    def seed(self, seed_path: str = DEFAULT_SEED_PATH, history_path: Optional[str] = DEFAULT_HISTORY_PATH) -> int:
+        """Load the curated seed set plus questions from past /mock-interview responses"""
+        added = 0
+        if seed_path and os.path.exists(seed_path):
+            with open(seed_path, "r") as f:
+                added += self.add(json.load(f), ANY_ROLE, source="seed")
+        if history_path and os.path.exists(history_path):
+            with open(history_path, "r") as f:
+                history = json.load(f)
+            for entry in history:
+                if entry.get("endpoint") == "mock-interview" and entry.get("ai_response"):
+                    role_text = entry.get("user_input", "")
+                    added += self.add(parse_questions(entry["ai_response"]), self.resolve_role(role_text), detect_level(role_text), source="history")
+        return added
+
+    def coverage(self, role: str, level: Optional[str] = None) -> int:
+        """Role-specific technical questions sample() could pick for `level` (generic questions cover the other types)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM questions WHERE role = ? AND type = 'technical' "
+                "AND (level IS NULL OR ? IS NULL OR level = ?)",
+                (role, level, level)
+            ).fetchone()[0]
+
+    def has_coverage(self, role: str, level: Optional[str] = None) -> bool:
+        return self.coverage(role, level) >= MIN_ROLE_QUESTIONS
+
+    def fill_gap(self, role: str, level: Optional[str], generate: Callable[[str], str]) -> bool:
+        """Ask the LLM for role-specific questions when the bank has too few; returns False if none could be added"""
+        if self.has_coverage(role, level):
+            return True
+        level_text = f"{level}-level " if level else ""
+        prompt = (
+            f"List 10 technical interview questions specific to a {level_text}{role} role, from fundamentals to hard.\n"
+            "Put them under a 'TECHNICAL QUESTIONS' header, one per line, each ending with a question mark."
+        )
+        self.add(parse_questions(generate(prompt)), role, level)
+        with self._lock:
+            self.stats["gaps_filled"] += 1
+        return self.coverage(role, level) > 0
+
+    def sample(self, role: str, level: Optional[str] = None, mix: Optional[Dict[str, int]] = None,
+               exclude: Optional[set] = None) -> List[Dict[str, Any]]:
+        """Pick questions per type, least-served first, spreading across competencies
+
+        Near-duplicate wordings and hashes in `exclude` are skipped; served
+        questions have their counters bumped so repeat requests rotate
+        through the bank.
+        """
+        mix = mix or DEFAULT_MIX
+        exclude = set(exclude or ())
+        picked: List[Dict[str, Any]] = []
+        picked_words: List[set] = []
+
+        with self._lock:
+            for question_type, count in mix.items():
+                # Role-specific first, then least served, random among ties
+                rows = self._conn.execute(
+                    "SELECT id, role, level, competency, type, question, question_hash, times_served FROM questions "
+                    "WHERE type = ? AND role IN (?, ?) AND (level IS NULL OR ? IS NULL OR level = ?) "
+                    "ORDER BY role != ?, times_served, RANDOM() LIMIT ?",
+                    (question_type, role, ANY_ROLE, level, level, role, count * 8)
+                ).fetchall()
+
+                competencies_used: Dict[str, int] = {}
+                candidates = [row for row in rows if row[6] not in exclude]
+                chosen = []
+                while candidates and len(chosen) < count:
+                    # Prefer the candidate whose competency has been used least so far
+                    best = min(candidates, key=lambda row: competencies_used.get(row[3], 0))
+                    candidates.remove(best)
+                    words = set(_WORDS.findall(best[5].lower()))
+                    if any(_similar(words, other) for other in picked_words):
+                        continue
+                    chosen.append(best)
+                    picked_words.append(words)
+                    competencies_used[best[3]] = competencies_used.get(best[3], 0) + 1
+
+                picked.extend(
+                    {"id": row[0], "role": row[1], "level": row[2], "competency": row[3], "type": row[4], "question": row[5]}
+                    for row in chosen
+                )
+
+            if picked:
+                with self._conn:
+                    self._conn.executemany("UPDATE questions SET times_served = times_served + 1 WHERE id = ?",
+                                           [(question["id"],) for question in picked])
+            self.stats["served_from_bank"] += 1
+        return picked
+
+
+def format_questions(role: str, questions: List[Dict[str, Any]]) -> str:
+    """Questions grouped by type, for returning straight to the user"""
+    lines = [f"Interview questions for {role} (from the question bank):"]
+    for question_type in QUESTION_TYPES:
+        group = [question for question in questions if question["type"] == question_type]
+        if group:
+            lines.append(f"\n{question_type.upper()} QUESTIONS:")
+            lines.extend(f"{index}. {question['question']} [{question['competency']}]" for index, question in enumerate(group, 1))
+    return "\n".join(lines)
+
+
+def format_mock_interview(role: str, questions: List[Dict[str, Any]]) -> str:
+    """A timed mock interview script built from sampled questions"""
+    by_type = {question_type: [q["question"] for q in questions if q["type"] == question_type] for question_type in QUESTION_TYPES}
+    segments = [
+        ("Warm-up (5 min)", by_type["company"][:1]),
+        ("Core competencies (15 min)", by_type["behavioral"][:3]),
+        ("Technical deep dive (20 min)", by_type["technical"][:3]),
+        ("Scenarios (10 min)", by_type["situational"][:2]),
+        ("Your questions for the interviewer (5 min)", by_type["reverse"][:2])
+    ]
+    lines = [f"Mock interview: {role} (55 minutes)"]
+    for title, segment in segments:
+        if segment:
+            lines.append(f"\n{title}")
+            lines.extend(f"- {question}" for question in segment)
+    lines.append(
+        "\nSelf-assessment after each answer: Was it structured (STAR for behavioral)? Did it include a "
+        "measurable result? Was it under two minutes? Note one improvement before moving on."
+    )
+    return "\n".join(lines)
+
+
+_question_bank: Optional[QuestionBank] = None
+_question_bank_lock = threading.Lock()
+
+
+def get_question_bank() -> QuestionBank:
+    """Shared bank at QUESTION_BANK_DB, seeded on first use when empty"""
+    global _question_bank
+    with _question_bank_lock:
+        if _question_bank is None:
+            bank = QuestionBank(DEFAULT_DB_PATH)
+            if not len(bank):
+                bank.seed()
+            _question_bank = bank
+        return _question_bank
+
+
+def set_question_bank(bank: Optional[QuestionBank]):
+    global _question_bank
+    with _question_bank_lock:
+        _question_bank = bank
+
+
+def _cache_lookups() -> Dict[tuple, int]:
+    bank = _question_bank
+    if bank is None:
+        return {}
+    return {("question_bank", "hit"): bank.stats["served_from_bank"],
+            ("question_bank", "miss"): bank.stats["gaps_filled"]}
+
+
+CACHE_LOOKUPS.add_source(_cache_lookups)
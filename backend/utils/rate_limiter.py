@@ -0,0 +1,321 @@
+"""
+Adaptive Upstream Rate Limiting
+Shared token-bucket pacing, AIMD concurrency control, per-endpoint fair queuing
+and rate-limit-aware retries for every upstream LLM call
+"""
+
+import os
+import time
+import random
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Deque, Dict, Optional
+
+import openai
+
+from utils.deadline import DeadlineExceeded, check_deadline, time_left
+from utils.metrics import UPSTREAM_IN_FLIGHT, UPSTREAM_QUEUE_DEPTH
+from utils.structured_logging import get_logger
+
+DEFAULT_QUEUE = "default"
+
+_current_queue: contextvars.ContextVar = contextvars.ContextVar("upstream_queue", default=DEFAULT_QUEUE)
+
+
+log = get_logger("rate_limiter")
+
+
+@contextmanager
+def upstream_queue(name: str):
+    """Attribute upstream calls made inside this block to a fair-queuing lane (e.g. an API route)"""
+    token = _current_queue.set(name)
+    try:
+        yield
+    finally:
+        _current_queue.reset(token)
+
+
+def current_queue() -> str:
+    return _current_queue.get()
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take one token, returning how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class FairConcurrencyLimiter:
+    """AIMD concurrency limit shared by all callers, served round-robin across queues
+
+    Successful calls raise the limit additively (about +1 per limit's worth of
+    successes); a rate-limit response halves it, at most once per
+    `decrease_window` seconds so one burst of 429s counts as a single
+    congestion signal. Waiting callers are grouped
+    by queue name and released one queue at a time, so a burst on one route
+    cannot starve the others.
+    """
+
+    def __init__(self, initial_limit: float, min_limit: float = 1, max_limit: float = 64,
+                 decrease_factor: float = 0.5, decrease_window: float = 1.0):
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.decrease_factor = decrease_factor
+        self.decrease_window = decrease_window
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._queues: Dict[str, Deque[object]] = {}
+        self._turns: Deque[str] = deque()
+
+    def _is_next(self, ticket: object) -> bool:
+        return bool(self._turns) and self._queues[self._turns[0]][0] is ticket
+
+    def acquire(self, queue: str = DEFAULT_QUEUE, timeout: Optional[float] = None):
+        ticket = object()
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            waiting = self._queues.setdefault(queue, deque())
+            waiting.append(ticket)
+            if queue not in self._turns:
+                self._turns.append(queue)
+
+            while not (self.in_flight < int(self.limit) and self._is_next(ticket)):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._remove(queue, ticket)
+                    raise TimeoutError(f"Timed out waiting for an upstream slot on queue '{queue}'")
+                self._cond.wait(remaining)
+
+            # Serve this queue's head, then send the queue to the back of the line
+            waiting.popleft()
+            self._turns.popleft()
+            if waiting:
+                self._turns.append(queue)
+            self.in_flight += 1
+            self._cond.notify_all()
+
+    def _remove(self, queue: str, ticket: object):
+        waiting = self._queues[queue]
+        waiting.remove(ticket)
+        if not waiting and queue in self._turns:
+            self._turns.remove(queue)
+        self._cond.notify_all()
+
+    def release(self, rate_limited: bool = False):
+        with self._cond:
+            self.in_flight -= 1
+            if rate_limited:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.decrease_window:
+                    self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / max(self.limit, 1.0))
+            self._cond.notify_all()
+
+    def queue_depths(self) -> Dict[str, int]:
+        with self._cond:
+            return {name: len(waiting) for name, waiting in self._queues.items() if waiting}
+
+
+def is_rate_limited(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, DeadlineExceeded):
+        return False
+    status_code = getattr(error, "status_code", None)
+    if status_code is not None:
+        return status_code == 429 or status_code >= 500
+    return isinstance(error, (openai.APIConnectionError, TimeoutError))
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read the server's retry hint (retry-after-ms / retry-after) from an API error"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            try:
+                return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+class UpstreamLimiter:
+    """Single choke point that paces, bounds and retries upstream LLM calls"""
+
+    def __init__(self, requests_per_minute: float = 3000, concurrency: int = 8,
+                 min_concurrency: int = 1, max_concurrency: int = 32, max_retries: int = 4,
+                 backoff_base: float = 0.5, backoff_max: float = 20.0,
+                 queue_timeout: Optional[float] = 60.0):
+        self.bucket = TokenBucket(rate=requests_per_minute / 60.0, capacity=max(concurrency, 1))
+        self.concurrency = FairConcurrencyLimiter(
+            initial_limit=concurrency,
+            min_limit=min_concurrency,
+            max_limit=max_concurrency
+        )
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.queue_timeout = queue_timeout
+        self._stats_lock = threading.Lock()
+        self.stats = {"calls": 0, "retries": 0, "rate_limited": 0, "failures": 0}
+
+    @classmethod
+    def from_env(cls) -> "UpstreamLimiter":
+        queue_timeout = os.getenv("LLM_QUEUE_TIMEOUT", "60")
+        return cls(
+            requests_per_minute=float(os.getenv("LLM_REQUESTS_PER_MINUTE", "3000")),
+            concurrency=int(os.getenv("LLM_CONCURRENCY", "8")),
+            min_concurrency=int(os.getenv("LLM_MIN_CONCURRENCY", "1")),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "32")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+            backoff_base=float(os.getenv("LLM_BACKOFF_BASE", "0.5")),
+            backoff_max=float(os.getenv("LLM_BACKOFF_MAX", "20")),
+            queue_timeout=float(queue_timeout) if queue_timeout else None
+        )
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Server-provided retry hint when present, otherwise full-jitter exponential backoff"""
+        hinted = retry_after_seconds(error)
+        if hinted is not None:
+            # A little jitter keeps callers throttled together from retrying in lockstep
+            return min(hinted, self.backoff_max) + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def run(self, send: Callable[[], Any], queue: Optional[str] = None) -> Any:
+        queue = queue or current_queue()
+        attempt = 0
+
+        while True:
+            check_deadline()
+            wait_timeout = self.queue_timeout
+            remaining = time_left()
+            if remaining is not None:
+                wait_timeout = remaining if wait_timeout is None else min(wait_timeout, remaining)
+            try:
+                self.concurrency.acquire(queue, timeout=wait_timeout)
+            except TimeoutError:
+                check_deadline("acquiring an upstream slot")
+                raise
+
+            rate_limited = False
+            try:
+                self.bucket.acquire()
+                self._count("calls")
+                return send()
+            except Exception as error:
+                rate_limited = is_rate_limited(error)
+                if rate_limited:
+                    self._count("rate_limited")
+                if not is_transient(error) or attempt >= self.max_retries:
+                    self._count("failures")
+                    raise
+                delay = self.backoff_delay(attempt, error)
+                remaining = time_left()
+                if remaining is not None and delay >= remaining:
+                    raise DeadlineExceeded("No time left to retry upstream call") from error
+            finally:
+                self.concurrency.release(rate_limited=rate_limited)
+
+            attempt += 1
+            self._count("retries")
+            log.info("upstream.retry", queue=queue, attempt=attempt, max_retries=self.max_retries, delay=round(delay, 2))
+            time.sleep(delay)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current limiter state for monitoring"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+            "queue_depths": self.concurrency.queue_depths(),
+            **stats
+        }
+
+
+_limiter: Optional[UpstreamLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_upstream_limiter() -> UpstreamLimiter:
+    """Process-wide limiter, configured from the environment on first use"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = UpstreamLimiter.from_env()
+    return _limiter
+
+
+def set_upstream_limiter(limiter: Optional[UpstreamLimiter]):
+    global _limiter
+    with _limiter_lock:
+        _limiter = limiter
+
+
+def _queue_depths() -> Dict[tuple, int]:
+    limiter = _limiter
+    if limiter is None:
+        return {}
+    return {(queue,): depth for queue, depth in limiter.concurrency.queue_depths().items()}
+
+
+def _in_flight() -> Dict[tuple, int]:
+    limiter = _limiter
+    return {(): limiter.concurrency.in_flight} if limiter is not None else {}
+
+
+UPSTREAM_QUEUE_DEPTH.add_source(_queue_depths)
+UPSTREAM_IN_FLIGHT.add_source(_in_flight)
@@ -0,0 +1,112 @@
+"""
+Request Validation
+Cheap checks that reject empty, malformed or oversized agent requests before
+any agent or LLM work: body size, per-field caps and an input token budget
+"""
+
+import os
+import json
+import math
+import threading
+from typing import Any, Dict, Optional
+
+from utils.agent_pipeline import AgentEndpoint, RequestRejected
+from utils.structured_logging import get_logger
+
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(64 * 1024)))
+INPUT_TOKEN_BUDGET = int(os.getenv("INPUT_TOKEN_BUDGET", "3000"))
+TOKENIZER_ENCODING = os.getenv("INPUT_TOKENIZER", "cl100k_base")
+
+# Characters allowed per request field; override one with INPUT_MAX_CHARS_<FIELD>
+DEFAULT_FIELD_LIMITS = {
+    "query": 4000,
+    "experience": 8000,
+    "role": 200,
+    "topic": 300,
+    "level": 40,
+    "format": 40,
+    "context": 4000
+}
+
+# The first lookup decides between tiktoken and the estimate for the life of the process
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+log = get_logger("request_validation")
+
+
+def field_limits() -> Dict[str, int]:
+    return {field: int(os.getenv(f"INPUT_MAX_CHARS_{field.upper()}", str(limit)))
+            for field, limit in DEFAULT_FIELD_LIMITS.items()}
+
+
+def _get_encoding():
+    """tiktoken encoding, or None when tiktoken or its encoding file is unavailable"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+                except Exception as e:
+                    log.warning("tokenizer.unavailable", encoding=TOKENIZER_ENCODING, error=e)
+                    _encoding = None
+                _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken, else a conservative estimate (~4 characters per token)"""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(math.ceil(len(text) / 4), len(text.split()))
+
+
+def _size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value)
+    return len(json.dumps(value, default=str))
+
+
+class InputValidator:
+    """Pipeline validator: 400 for missing or malformed input, 413 for oversized input
+
+    Field caps are plain length checks, so a huge paste is turned away
+    without tokenizing it; only input within the caps is tokenized against
+    the token budget.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, token_budget: int = INPUT_TOKEN_BUDGET):
+        self.limits = limits or field_limits()
+        self.token_budget = token_budget
+
+    def __call__(self, endpoint: AgentEndpoint, data: Dict[str, Any], user_input: str):
+        if not data:
+            raise RequestRejected("Request body must be a non-empty JSON object")
+
+        raw_input = data.get(endpoint.input_field)
+        if raw_input is not None and not isinstance(raw_input, str):
+            raise RequestRejected(f"'{endpoint.input_field}' must be a string", field=endpoint.input_field)
+        if not user_input.strip():
+            raise RequestRejected(f"'{endpoint.input_field}' is required", field=endpoint.input_field)
+
+        for field, limit in self.limits.items():
+            value = data.get(field)
+            if value is None:
+                continue
+            size = _size(value)
+            if size > limit:
+                raise RequestRejected(f"'{field}' is too long ({size} characters, limit {limit})", status=413,
+                                      field=field, limit=limit, size=size)
+
+        context = data.get("context")
+        prompt_text = user_input
+        if context:
+            prompt_text += "\n" + (context if isinstance(context, str) else json.dumps(context, default=str))
+        tokens = count_tokens(prompt_text)
+        if tokens > self.token_budget:
+            raise RequestRejected(f"Input is too long ({tokens} tokens, limit {self.token_budget})", status=413,
+                                  field=endpoint.input_field, limit=self.token_budget, size=tokens)
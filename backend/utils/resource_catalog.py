@@ -0,0 +1,223 @@
+"""
+Learning Resource Catalog
+Curated courses, books and practice sites behind an in-memory inverted index
+with BM25 plus popularity ranking, so resource lookups need no LLM call
+"""
+
+import os
+import re
+import json
+import math
+import threading
+from typing import Any, Dict, List, Optional
+
+from utils.knowledge_base import BACKEND_DIR, grounded_prompt
+from utils.skill_graph import SkillGraph, get_skill_graph
+from utils.metrics import CACHE_LOOKUPS
+
+DEFAULT_CATALOG_DIR = os.getenv("LEARNING_RESOURCES_DATA", os.path.join(BACKEND_DIR, "data", "learning_resources"))
+DEFAULT_RESULT_LIMIT = int(os.getenv("LEARNING_RESOURCES_LIMIT", "8"))
+# Share of the final score that popularity and rating can add on top of text relevance
+POPULARITY_WEIGHT = float(os.getenv("LEARNING_RESOURCES_POPULARITY_WEIGHT", "0.5"))
+
+# Field weights for the BM25F-style term frequencies
+FIELD_WEIGHTS = {"title": 3.0, "topics": 2.0, "skills": 2.0, "provider": 1.0, "format": 1.0, "level": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Keys are in token form (plurals already stripped)
+LEVEL_WORDS = {
+    "beginner": "beginner", "intro": "beginner", "introduction": "beginner", "introductory": "beginner",
+    "basic": "beginner", "fundamental": "beginner",
+    "intermediate": "intermediate",
+    "advanced": "advanced", "expert": "advanced", "mastery": "advanced"
+}
+FORMAT_WORDS = {
+    "course": "course", "class": "course", "mooc": "course", "book": "book", "textbook": "book",
+    "tutorial": "tutorial", "guide": "tutorial", "doc": "tutorial", "documentation": "tutorial",
+    "practice": "practice", "exercise": "practice", "challenge": "practice",
+    "certification": "certification", "certificate": "certification", "cert": "certification",
+    "community": "community", "forum": "community"
+}
+STOPWORDS = {
+    "a", "an", "and", "the", "to", "of", "for", "in", "on", "with", "i", "me", "my", "want", "need", "how",
+    "learn", "learning", "best", "good", "top", "resource", "online", "recommend", "about", "into", "get",
+    "become", "start", "what", "should", "some", "from", "free", "paid"
+}
+
+_WORD_PATTERN = re.compile(r"[a-z0-9+#]+")
+_TITLE_KEY_PATTERN = re.compile(r"[^a-z0-9]+")
+
+
+def _tokens(text: str) -> List[str]:
+    """Lower-cased words with a light plural strip ("courses" -> "course")"""
+    words = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return words
+
+
+def _dedup_key(resource: Dict[str, Any]) -> str:
+    return _TITLE_KEY_PATTERN.sub(" ", resource["title"].lower()).strip()
+
+
+class ResourceCatalog:
+    """Inverted index over resource titles, topics, skills, provider, level and format
+
+    Postings hold field-weighted term frequencies, so a query is scored by
+    walking only the postings of its own terms. The text score is scaled by
+    a popularity/rating prior and results are de-duplicated by title and URL.
+    """
+
+    def __init__(self, resources: List[Dict[str, Any]], skill_graph: Optional[SkillGraph] = None):
+        self.skill_graph = skill_graph
+        self.resources: List[Dict[str, Any]] = []
+        seen = set()
+        for resource in resources:
+            keys = {_dedup_key(resource), resource.get("url") or _dedup_key(resource)}
+            if keys & seen:
+                continue
+            seen |= keys
+            self.resources.append(resource)
+
+        self._postings: Dict[str, Dict[int, float]] = {}
+        lengths = []
+        for doc_id, resource in enumerate(self.resources):
+            length = 0.0
+            for field, weight in FIELD_WEIGHTS.items():
+                value = resource.get(field) or ""
+                text = " ".join(value) if isinstance(value, list) else str(value)
+                for token in _tokens(text):
+                    postings = self._postings.setdefault(token, {})
+                    postings[doc_id] = postings.get(doc_id, 0.0) + weight
+                    length += weight
+            lengths.append(length)
+
+        count = len(self.resources)
+        self._average_length = sum(lengths) / count if count else 0.0
+        self._length_norm = [BM25_K1 * (1 - BM25_B + BM25_B * length / (self._average_length or 1)) for length in lengths]
+        self._idf = {
+            token: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for token, postings in self._postings.items()
+        }
+
+        max_popularity = max([resource.get("popularity", 0) for resource in self.resources] + [1])
+        self._prior = [
+            1 + POPULARITY_WEIGHT * (
+                0.7 * math.log1p(resource.get("popularity", 0)) / math.log1p(max_popularity)
+                + 0.3 * resource.get("rating", 0) / 5
+            )
+            for resource in self.resources
+        ]
+        self._lock = threading.Lock()
+        self.stats = {"searches": 0, "hits": 0, "misses": 0}
+
+    @classmethod
+    def from_directory(cls, directory: str = DEFAULT_CATALOG_DIR, skill_graph: Optional[SkillGraph] = None) -> "ResourceCatalog":
+        """Catalog from every *.json file (a list of resources) in `directory`"""
+        resources = []
+        if os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".json"):
+                    with open(os.path.join(directory, name), "r") as f:
+                        resources.extend(json.load(f))
+        return cls(resources, skill_graph)
+
+    def _query_terms(self, query: str) -> List[str]:
+        terms = [token for token in _tokens(query) if token not in STOPWORDS]
+        if self.skill_graph:
+            # Skill aliases ("k8s", "ml") also match the canonical skill name
+            for skill in self.skill_graph.ordered(self.skill_graph.extract_skills(query)):
+                terms.extend(token for token in _tokens(skill) if token not in terms)
+        return terms
+
+    def search(self, query: str, limit: int = DEFAULT_RESULT_LIMIT, level: Optional[str] = None,
+               resource_format: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Ranked, de-duplicated resources for `query`
+
+        Level and format words in the query only boost matching resources;
+        the `level` / `resource_format` arguments filter. At least one topic
+        term has to match, so "beginner courses" alone returns nothing.
+        """
+        terms = self._query_terms(query)
+        topic_terms = {term for term in terms if term not in LEVEL_WORDS and term not in FORMAT_WORDS}
+        terms = {LEVEL_WORDS.get(term) or FORMAT_WORDS.get(term) or term for term in terms}
+
+        scores: Dict[int, float] = {}
+        matched = set()
+        for term in terms:
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, frequency in self._postings[term].items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + self._length_norm[doc_id])
+                if term in topic_terms:
+                    matched.add(doc_id)
+
+        ranked = sorted(
+            (doc_id for doc_id in matched
+             if (not level or self.resources[doc_id].get("level") == level)
+             and (not resource_format or self.resources[doc_id].get("format") == resource_format)),
+            key=lambda doc_id: scores[doc_id] * self._prior[doc_id],
+            reverse=True
+        )[:limit]
+
+        with self._lock:
+            self.stats["searches"] += 1
+            self.stats["hits" if ranked else "misses"] += 1
+        return [dict(self.resources[doc_id], score=round(scores[doc_id] * self._prior[doc_id], 3)) for doc_id in ranked]
+
+
+def resource_line(resource: Dict[str, Any]) -> str:
+    line = f"{resource['title']} ({resource['provider']}) - {resource['level']} {resource['format']}"
+    details = [f"~{resource['hours']}h" if resource.get("hours") else "", resource.get("cost", ""),
+               f"rated {resource['rating']}" if resource.get("rating") else ""]
+    line += f", {', '.join(detail for detail in details if detail)}"
+    return line + (f" <{resource['url']}>" if resource.get("url") else "")
+
+
+def format_resources(resources: List[Dict[str, Any]]) -> str:
+    """Ranked resources as a plain-text answer"""
+    lines = ["Recommended resources (ranked by relevance and popularity):"]
+    lines.extend(f"{rank}. {resource_line(resource)}" for rank, resource in enumerate(resources, 1))
+    return "\n".join(lines)
+
+
+def pathway_prompt(goal: str, resources: List[Dict[str, Any]], context: Optional[Dict[str, Any]] = None) -> str:
+    """Prompt that asks the model only to order already-ranked resources into a pathway"""
+    facts = [resource_line(resource) for resource in resources]
+    if context:
+        facts.extend(f"Learner {key}: {value}" for key, value in context.items() if value)
+    return grounded_prompt(
+        "Sequence these resources into a learning pathway: foundation, development and mastery phases, "
+        "with what to study in each, rough time estimates and a milestone per phase.",
+        goal,
+        facts,
+        source="Catalog resources, best first (use only these; do not add others)"
+    )
+
+
+_catalog: Optional[ResourceCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_resource_catalog() -> ResourceCatalog:
+    """Shared catalog, indexed from LEARNING_RESOURCES_DATA on first use"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = ResourceCatalog.from_directory(skill_graph=get_skill_graph())
+        return _catalog
+
+
+def _cache_lookups() -> Dict[tuple, int]:
+    catalog = _catalog
+    if catalog is None:
+        return {}
+    return {("resource_catalog", "hit"): catalog.stats["hits"],
+            ("resource_catalog", "miss"): catalog.stats["misses"]}
+
+
+CACHE_LOOKUPS.add_source(_cache_lookups)
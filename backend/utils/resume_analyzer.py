@@ -0,0 +1,192 @@
+"""
+Local Resume Analyzer
+Deterministic section splitting, action-verb and quantification checks and
+ATS keyword matching with precompiled matchers, so the resume tools only
+send the LLM what actually needs rewriting
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from utils.skill_graph import SkillGraph, get_skill_graph
+
+SECTION_ALIASES = {
+    "contact": ["contact", "contact information", "personal details"],
+    "summary": ["summary", "professional summary", "profile", "objective", "about me", "career objective"],
+    "experience": ["experience", "work experience", "professional experience", "employment history", "work history"],
+    "education": ["education", "academic background", "education and training"],
+    "skills": ["skills", "technical skills", "core competencies", "key skills", "competencies"],
+    "projects": ["projects", "key projects", "selected projects"],
+    "certifications": ["certifications", "licenses", "certificates", "licenses and certifications"],
+    "awards": ["awards", "honors", "achievements", "awards and honors"]
+}
+REQUIRED_SECTIONS = ("experience", "education", "skills")
+
+ACTION_VERBS = {
+    "accelerated", "achieved", "administered", "analyzed", "architected", "automated", "built", "championed",
+    "coached", "collaborated", "consolidated", "coordinated", "created", "cut", "decreased", "defined",
+    "delivered", "deployed", "designed", "developed", "directed", "drove", "eliminated", "enabled",
+    "engineered", "established", "expanded", "generated", "grew", "headed", "identified", "implemented",
+    "improved", "increased", "initiated", "instituted", "integrated", "introduced", "launched", "led",
+    "managed", "mentored", "migrated", "modernized", "negotiated", "optimized", "orchestrated", "organized",
+    "overhauled", "owned", "partnered", "pioneered", "planned", "produced", "reduced", "redesigned",
+    "refactored", "resolved", "restructured", "revamped", "saved", "scaled", "secured", "shipped",
+    "simplified", "spearheaded", "standardized", "streamlined", "strengthened", "supervised", "trained",
+    "transformed", "tripled", "doubled", "won", "wrote"
+}
+WEAK_OPENERS = ["responsible for", "duties included", "worked on", "helped", "assisted", "tasked with", "involved in", "participated in"]
+
+_HEADER_PATTERN = re.compile(
+    r"^\s*(?:" + "|".join(re.escape(alias) for aliases in SECTION_ALIASES.values() for alias in sorted(aliases, key=len, reverse=True)) + r")\s*:?\s*$",
+    re.I | re.M
+)
+_ALIAS_TO_SECTION = {alias: section for section, aliases in SECTION_ALIASES.items() for alias in aliases}
+_BULLET_PATTERN = re.compile(r"^\s*(?:[-*•▪●‣–]|\d+[.)])\s+(.*\S)", re.M)
+_FIRST_WORD_PATTERN = re.compile(r"[A-Za-z]+")
+_WEAK_PATTERN = re.compile(r"^(?:" + "|".join(re.escape(phrase) for phrase in WEAK_OPENERS) + r")\b", re.I)
+# Any figure other than a bare year, currency, or a spelled-out count
+_METRIC_PATTERN = re.compile(
+    r"[$£€]\s?\d|(?<![\w.])(?!(?:19|20)\d{2}\b)\d+(?:[.,]\d+)?"
+    r"|\b(?:two|three|four|five|six|seven|eight|nine|ten|twelve|dozens?|hundreds|thousands|millions|doubled|tripled|halved)\b",
+    re.I
+)
+_EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+_PHONE_PATTERN = re.compile(r"(?:\+?\d[\s.-]?)?(?:\(\d{3}\)|\d{3})[\s.-]?\d{3}[\s.-]?\d{4}")
+_NON_ATS_CHARACTERS = re.compile(r"[☀-➿\U0001f300-\U0001faff─-╿]")
+_DATE_STYLES = {
+    "month_year": re.compile(r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+\d{4}\b", re.I),
+    "numeric": re.compile(r"\b\d{1,2}/\d{4}\b"),
+    "year_only": re.compile(r"(?<![/\w])(?:19|20)\d{2}\s*[-–]\s*(?:(?:19|20)\d{2}|present|current)\b", re.I)
+}
+
+
+class ResumeAnalyzer:
+    """Rule-based resume analysis; every matcher is compiled once per process"""
+
+    def __init__(self, skill_graph: Optional[SkillGraph] = None):
+        self.skill_graph = skill_graph or get_skill_graph()
+
+    def split_sections(self, text: str) -> Dict[str, str]:
+        """Section name -> body; text before the first header goes to "header" """
+        sections: Dict[str, str] = {}
+        current, start = "header", 0
+        for match in _HEADER_PATTERN.finditer(text):
+            sections[current] = sections.get(current, "") + text[start:match.start()]
+            current = _ALIAS_TO_SECTION[match.group(0).strip().rstrip(":").strip().lower()]
+            start = match.end()
+        sections[current] = sections.get(current, "") + text[start:]
+        return {name: body.strip() for name, body in sections.items() if body.strip() or name != "header"}
+
+    def analyze(self, text: str, target_role: Optional[str] = None) -> Dict[str, Any]:
+        sections = self.split_sections(text)
+        bullets = _BULLET_PATTERN.findall(sections.get("experience", "") + "\n" + sections.get("projects", "")) \
+            or _BULLET_PATTERN.findall(text)
+
+        action_bullets, weak_bullets, unquantified = 0, [], []
+        verbs_used: Dict[str, int] = {}
+        for bullet in bullets:
+            first = _FIRST_WORD_PATTERN.match(bullet)
+            verb = first.group(0).lower() if first else ""
+            if verb in ACTION_VERBS:
+                action_bullets += 1
+                verbs_used[verb] = verbs_used.get(verb, 0) + 1
+            elif _WEAK_PATTERN.match(bullet):
+                weak_bullets.append(bullet)
+            if not _METRIC_PATTERN.search(bullet):
+                unquantified.append(bullet)
+
+        graph = self.skill_graph
+        mentioned = graph.extract_skills(text)
+        role = graph.find_role(target_role) if target_role else graph.find_role(sections.get("header", "")[:300])
+        keywords = {"role": role, "matched": [], "missing": [], "missing_preferred": [], "coverage": None}
+        if role:
+            requirements = graph.roles[role]
+            keywords.update({
+                "matched": graph.ordered((requirements["must"] | requirements["preferred"]) & mentioned),
+                "missing": graph.ordered(requirements["must"] & ~mentioned),
+                "missing_preferred": graph.ordered(requirements["preferred"] & ~mentioned),
+                "coverage": round(1 - bin(requirements["must"] & ~mentioned).count("1") / max(bin(requirements["must"]).count("1"), 1), 2)
+            })
+
+        date_styles = [style for style, pattern in _DATE_STYLES.items() if pattern.search(text)]
+        issues = []
+        missing_sections = [section for section in REQUIRED_SECTIONS if section not in sections]
+        if missing_sections:
+            issues.append(f"Missing standard section headers: {', '.join(missing_sections)}")
+        if not _EMAIL_PATTERN.search(text) or not _PHONE_PATTERN.search(text):
+            issues.append("Contact details incomplete (need both email and phone)")
+        if _NON_ATS_CHARACTERS.search(text):
+            issues.append("Contains symbols or emoji that ATS parsers often drop")
+        if len(date_styles) > 1:
+            issues.append(f"Mixed date formats ({', '.join(date_styles)}); use one style throughout")
+        if bullets and action_bullets / len(bullets) < 0.6:
+            issues.append(f"Only {action_bullets} of {len(bullets)} bullets start with a strong action verb")
+        if weak_bullets:
+            issues.append(f"{len(weak_bullets)} bullets open with passive phrasing (e.g. 'responsible for')")
+        if bullets and len(unquantified) / len(bullets) > 0.5:
+            issues.append(f"{len(unquantified)} of {len(bullets)} bullets have no measurable result")
+        if keywords["missing"]:
+            issues.append(f"Missing {keywords['role']} keywords: {', '.join(keywords['missing'])}")
+
+        return {
+            "sections": list(sections),
+            "missing_sections": missing_sections,
+            "bullet_count": len(bullets),
+            "action_verb_bullets": action_bullets,
+            "action_verbs_used": sorted(verbs_used, key=verbs_used.get, reverse=True),
+            "weak_bullets": weak_bullets,
+            "quantified_bullets": len(bullets) - len(unquantified),
+            "unquantified_bullets": unquantified,
+            "skills_detected": graph.ordered(mentioned),
+            "keywords": keywords,
+            "date_styles": date_styles,
+            "issues": issues,
+            "word_count": len(text.split())
+        }
+
+    def analyze_batch(self, texts: List[str], target_role: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [self.analyze(text, target_role) for text in texts]
+
+
+def resume_hints(analysis: Dict[str, Any]) -> List[str]:
+    """Analysis as compact fact lines for a grounded prompt"""
+    keywords = analysis["keywords"]
+    hints = [
+        f"Sections found: {', '.join(analysis['sections']) or 'none'}",
+        f"Bullets: {analysis['bullet_count']} ({analysis['action_verb_bullets']} open with action verbs, "
+        f"{analysis['quantified_bullets']} quantified)",
+        f"Skills detected: {', '.join(analysis['skills_detected']) or 'none'}"
+    ]
+    if keywords["role"]:
+        hints.append(f"{keywords['role']} keywords present: {', '.join(keywords['matched']) or 'none'}; "
+                     f"missing: {', '.join(keywords['missing']) or 'none'}; "
+                     f"missing preferred: {', '.join(keywords['missing_preferred']) or 'none'}")
+    hints.extend(f"Issue: {issue}" for issue in analysis["issues"])
+    hints.extend(f"Needs a metric: {bullet}" for bullet in analysis["unquantified_bullets"][:8])
+    return hints
+
+
+def ats_report(analysis: Dict[str, Any]) -> str:
+    """Deterministic ATS report for content that passes every local check"""
+    keywords = analysis["keywords"]
+    lines = [
+        "ATS check (local analysis): no blocking issues found.",
+        f"- Standard sections present: {', '.join(analysis['sections'])}",
+        f"- {analysis['action_verb_bullets']} of {analysis['bullet_count']} bullets open with action verbs; "
+        f"{analysis['quantified_bullets']} include measurable results"
+    ]
+    if keywords["role"]:
+        lines.append(f"- Covers all must-have {keywords['role']} keywords: {', '.join(keywords['matched'])}")
+        if keywords["missing_preferred"]:
+            lines.append(f"- Optional keywords worth adding if accurate: {', '.join(keywords['missing_preferred'])}")
+    return "\n".join(lines)
+
+
+_analyzer: Optional[ResumeAnalyzer] = None
+
+
+def get_resume_analyzer() -> ResumeAnalyzer:
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = ResumeAnalyzer()
+    return _analyzer
@@ -0,0 +1,194 @@
+"""
+JSON Serialization
+One pluggable JSON codec for storage, logs and API responses: orjson or msgspec
+when installed, the standard library otherwise, always compact
+"""
+
+import os
+import copy
+import json
+import threading
+from typing import Any, Callable, Dict, Optional, Union
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+# "auto" picks the fastest installed backend: orjson, then msgspec, then json
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
+
+
+class StdlibSerializer:
+    """json module with one prebuilt compact encoder, instead of a new encoder per dumps(**options) call"""
+
+    name = "json"
+
+    def __init__(self, default: Callable[[Any], Any] = str):
+        self._encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=default)
+        self._decoder = json.JSONDecoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj).encode("utf-8")
+
+    def dumps_text(self, obj: Any) -> str:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._decoder.decode(data.decode("utf-8") if isinstance(data, (bytes, bytearray)) else data)
+
+
+class OrjsonSerializer:
+    name = "orjson"
+
+    def __init__(self, default: Callable[[Any], Any] = str):
+        self._default = default
+        # Like the json module, non-string keys are written as strings rather than rejected
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=self._default, option=self._options)
+
+    def dumps_text(self, obj: Any) -> str:
+        return orjson.dumps(obj, default=self._default, option=self._options).decode("utf-8")
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        # orjson.JSONDecodeError is a ValueError, as callers expect
+        return orjson.loads(data)
+
+
+class MsgspecSerializer:
+    name = "msgspec"
+
+    def __init__(self, default: Callable[[Any], Any] = str):
+        self._encoder = msgspec.json.Encoder(enc_hook=default)
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def dumps_text(self, obj: Any) -> str:
+        return self._encoder.encode(obj).decode("utf-8")
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+
+SERIALIZERS = {"json": StdlibSerializer}
+if MSGSPEC_AVAILABLE:
+    SERIALIZERS["msgspec"] = MsgspecSerializer
+if ORJSON_AVAILABLE:
+    SERIALIZERS["orjson"] = OrjsonSerializer
+
+
+def create_serializer(backend: str = JSON_BACKEND, default: Callable[[Any], Any] = str):
+    """Serializer for `backend`; unknown or uninstalled backends fall back to the fastest installed one"""
+    if backend not in SERIALIZERS:
+        if backend != "auto":
+            # Imported here: structured_logging encodes its records with this module
+            from utils.structured_logging import get_logger
+            get_logger("serialization").warning("serialization.backend_unavailable", backend=backend)
+        backend = "orjson" if ORJSON_AVAILABLE else "msgspec" if MSGSPEC_AVAILABLE else "json"
+    return SERIALIZERS[backend](default=default)
+
+
+_serializer = None
+_serializer_lock = threading.Lock()
+
+
+def get_serializer():
+    global _serializer
+    if _serializer is None:
+        with _serializer_lock:
+            if _serializer is None:
+                _serializer = create_serializer()
+    return _serializer
+
+
+def set_serializer(serializer):
+    global _serializer
+    with _serializer_lock:
+        _serializer = serializer
+
+
+def dumps(obj: Any) -> bytes:
+    return get_serializer().dumps(obj)
+
+
+def dumps_text(obj: Any) -> str:
+    return get_serializer().dumps_text(obj)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    return get_serializer().loads(data)
+
+
+class SerializerJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider (jsonify, request.get_json) backed by a serializer from this module
+
+    Responses are compact, with keys in insertion order rather than sorted.
+    Calls that ask for json module options (indent, sort_keys), and pretty
+    responses in debug mode, still go through the json module.
+    """
+
+    def __init__(self, app, backend: str = JSON_BACKEND):
+        super().__init__(app)
+        self.serializer = create_serializer(backend, default=self.default)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.serializer.dumps_text(obj)
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return self.serializer.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(obj)
+        return self._app.response_class(self.serializer.dumps(obj) + b"\n", mimetype=self.mimetype)
+
+
+class RecordSchema:
+    """Field order and defaults for a record type stored as a JSON column
+
+    encode() writes the known fields first, in schema order and with
+    defaults for missing ones, followed by any extra fields, so every
+    stored row has the same shape. decode() fills fields that older rows
+    lack, so readers never need .get() fallbacks.
+    """
+
+    def __init__(self, name: str, fields: Dict[str, Any]):
+        self.name = name
+        self.fields = dict(fields)
+
+    def normalize(self, record: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        record = record or {}
+        normalized = {}
+        for field, default in self.fields.items():
+            value = record.get(field, default)
+            # Mutable defaults are copied so records never share them
+            normalized[field] = copy.copy(value) if value is default and isinstance(default, (list, dict)) else value
+        normalized.update((field, value) for field, value in record.items() if field not in self.fields)
+        return normalized
+
+    def encode(self, record: Optional[Dict[str, Any]]) -> str:
+        return dumps_text(self.normalize(record))
+
+    def decode(self, data: Optional[Union[str, bytes]]) -> Dict[str, Any]:
+        return self.normalize(loads(data) if data else None)
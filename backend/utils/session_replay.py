@@ -0,0 +1,169 @@
+"""
+Session Record/Replay for Upstream LLM Calls
+Captures request/response pairs (with timings) and replays them deterministically
+so agent orchestration, tool fan-out and persistence can be profiled offline
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.serialization import dumps_text, loads
+
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+DEFAULT_SESSION_FILE = "llm_session.jsonl"
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode when a request has no recorded response"""
+
+
+def request_fingerprint(endpoint: str, request: Dict[str, Any]) -> str:
+    """Stable key for an upstream request, independent of dict ordering"""
+    canonical = json.dumps({"endpoint": endpoint, "request": request}, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def parse_latency_scale(value: Optional[str]) -> float:
+    """Translate a replay latency setting into a multiplier of the recorded latency
+
+    "none" (default) replays instantly, "original" sleeps for the recorded
+    latency and any number scales it (e.g. "0.5" replays at half latency).
+    """
+    if not value or value == "none":
+        return 0.0
+    if value == "original":
+        return 1.0
+    return max(float(value), 0.0)
+
+
+class SessionRecorder:
+    """Record or replay upstream LLM calls to/from a local JSON Lines file"""
+
+    def __init__(self, mode: str = MODE_OFF, path: str = DEFAULT_SESSION_FILE, latency_scale: float = 0.0):
+        if mode not in (MODE_OFF, MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"Unknown session mode: {mode}")
+
+        self.mode = mode
+        self.path = path
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._recordings: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        self.stats = {"recorded": 0, "replayed": 0, "misses": 0}
+
+        if mode == MODE_REPLAY:
+            self.load(path)
+
+    @classmethod
+    def from_env(cls) -> "SessionRecorder":
+        """Build a recorder from LLM_SESSION_MODE / LLM_SESSION_FILE / LLM_REPLAY_LATENCY"""
+        return cls(
+            mode=os.getenv("LLM_SESSION_MODE", MODE_OFF).lower(),
+            path=os.getenv("LLM_SESSION_FILE", DEFAULT_SESSION_FILE),
+            latency_scale=parse_latency_scale(os.getenv("LLM_REPLAY_LATENCY"))
+        )
+
+    def load(self, path: str) -> int:
+        """Load a recorded session, keeping the recorded order for repeated requests"""
+        recordings: Dict[str, List[Dict[str, Any]]] = {}
+        count = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = loads(line)
+                recordings.setdefault(entry["key"], []).append(entry)
+                count += 1
+
+        with self._lock:
+            self._recordings = recordings
+            self._cursors = {}
+        return count
+
+    def rewind(self):
+        """Restart replay from the first recorded response of every request"""
+        with self._lock:
+            self._cursors = {}
+
+    def call(self, endpoint: str, request: Dict[str, Any], send: Callable[[], Any]) -> Any:
+        """Run one upstream call according to the current mode
+
+        `send` performs the live call and must return a JSON-serializable response.
+        """
+        if self.mode == MODE_REPLAY:
+            return self._replay(endpoint, request)
+
+        if self.mode == MODE_RECORD:
+            start_time = time.perf_counter()
+            response = send()
+            latency = time.perf_counter() - start_time
+            self._record(endpoint, request, response, latency)
+            return response
+
+        return send()
+
+    def _record(self, endpoint: str, request: Dict[str, Any], response: Any, latency: float):
+        entry = {
+            "key": request_fingerprint(endpoint, request),
+            "endpoint": endpoint,
+            "recorded_at": datetime.now().isoformat(),
+            "latency_seconds": latency,
+            "request": request,
+            "response": response
+        }
+        line = dumps_text(entry)
+
+        with self._lock:
+            self._recordings.setdefault(entry["key"], []).append(entry)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self.stats["recorded"] += 1
+
+    def _replay(self, endpoint: str, request: Dict[str, Any]) -> Any:
+        key = request_fingerprint(endpoint, request)
+
+        with self._lock:
+            entries = self._recordings.get(key)
+            if not entries:
+                self.stats["misses"] += 1
+                raise ReplayMissError(f"No recorded response for {endpoint} request {key[:12]}")
+
+            # Identical requests replay their recordings in order, then wrap around
+            cursor = self._cursors.get(key, 0)
+            entry = entries[cursor % len(entries)]
+            self._cursors[key] = cursor + 1
+            self.stats["replayed"] += 1
+
+        if self.latency_scale:
+            time.sleep(entry["latency_seconds"] * self.latency_scale)
+        return entry["response"]
+
+
+_recorder: Optional[SessionRecorder] = None
+_recorder_lock = threading.Lock()
+
+
+def get_session_recorder() -> SessionRecorder:
+    """Process-wide recorder, configured from the environment on first use"""
+    global _recorder
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = SessionRecorder.from_env()
+    return _recorder
+
+
+def set_session_recorder(recorder: Optional[SessionRecorder]):
+    """Swap the process-wide recorder (None re-reads the environment on next use)"""
+    global _recorder
+    with _recorder_lock:
+        _recorder = recorder
@@ -0,0 +1,230 @@
+"""
+Skill Taxonomy Graph
+Skills, prerequisites and role requirements compiled once into bitsets, so
+profile-to-role skill gaps are computed as structured data without the LLM
+"""
+
+import os
+import re
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from utils.knowledge_base import BACKEND_DIR
+
+DEFAULT_SKILLS_PATH = os.getenv("SKILL_GRAPH_DATA", os.path.join(BACKEND_DIR, "data", "skill_graph", "skills.json"))
+DEFAULT_ROLES_PATH = os.getenv("SKILL_GRAPH_ROLES", os.path.join(BACKEND_DIR, "data", "knowledge_base", "roles.json"))
+
+
+def _bits(mask: int) -> List[int]:
+    ids = []
+    while mask:
+        low = mask & -mask
+        ids.append(low.bit_length() - 1)
+        mask ^= low
+    return ids
+
+
+def _trie_regex(phrases: List[str]) -> str:
+    """Alternation compiled as a prefix trie, so matching cost does not grow with the phrase count"""
+    trie: Dict[str, Any] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def emit(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+def _phrase_pattern(phrases: List[str]) -> Optional[re.Pattern]:
+    """Case-insensitive matcher for any of `phrases`, bounded by non-word characters"""
+    if not phrases:
+        return None
+    return re.compile(rf"(?<![\w+#])(?:{_trie_regex([phrase.lower() for phrase in phrases])})(?![\w+#])", re.I)
+
+
+class SkillGraph:
+    """Skill/role graph with precomputed adjacency and prerequisite closures
+
+    Every skill gets a bit position; each skill's transitive prerequisites
+    and each role's full requirement set (direct skills plus everything they
+    depend on) are stored as integer bitmasks, so a gap is a couple of
+    bitwise operations.
+    """
+
+    def __init__(self, skills: List[Dict[str, Any]], roles: List[Dict[str, Any]]):
+        self.names: List[str] = []
+        self.categories: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._aliases: Dict[str, int] = {}
+
+        for entry in skills:
+            self._add_skill(entry["skill"], entry.get("category", "general"), entry.get("aliases", []))
+        for role in roles:
+            for skill in role.get("must_have_skills", []) + role.get("preferred_skills", []):
+                self._add_skill(skill, "general", [])
+
+        # Direct prerequisite adjacency, then transitive closures
+        self.prerequisites: List[int] = [0] * len(self.names)
+        for entry in skills:
+            for prerequisite in entry.get("prerequisites", []):
+                self._add_skill(prerequisite, "general", [])
+                self.prerequisites.extend([0] * (len(self.names) - len(self.prerequisites)))
+                self.prerequisites[self._ids[entry["skill"]]] |= 1 << self._ids[prerequisite]
+        self.closure: List[int] = [0] * len(self.names)
+        self.depth: List[int] = [0] * len(self.names)
+        for skill_id in range(len(self.names)):
+            self._close(skill_id, set())
+
+        self.roles: Dict[str, Dict[str, int]] = {}
+        self._role_aliases: Dict[str, str] = {}
+        for role in roles:
+            must = self._mask(role.get("must_have_skills", []))
+            preferred = self._mask(role.get("preferred_skills", []))
+            self.roles[role["role"]] = {
+                "must": must,
+                "preferred": preferred,
+                "foundations": self._with_prerequisites(must) & ~must
+            }
+            for alias in [role["role"]] + role.get("aliases", []):
+                self._role_aliases[alias.lower()] = role["role"]
+
+        self._skill_pattern = _phrase_pattern(list(self._aliases))
+        self._role_pattern = _phrase_pattern(list(self._role_aliases))
+
+    @classmethod
+    def from_files(cls, skills_path: str = DEFAULT_SKILLS_PATH, roles_path: str = DEFAULT_ROLES_PATH) -> "SkillGraph":
+        with open(skills_path, "r") as f:
+            skills = json.load(f)
+        roles = []
+        if os.path.exists(roles_path):
+            with open(roles_path, "r") as f:
+                roles = json.load(f)
+        return cls(skills, roles)
+
+    def _add_skill(self, name: str, category: str, aliases: List[str]):
+        if name in self._ids:
+            return
+        skill_id = len(self.names)
+        self.names.append(name)
+        self.categories.append(category)
+        self._ids[name] = skill_id
+        for alias in [name] + aliases:
+            self._aliases.setdefault(alias.lower(), skill_id)
+
+    def _close(self, skill_id: int, visiting: set) -> int:
+        """Transitive prerequisites of `skill_id` (memoized; cycles are cut)"""
+        if self.closure[skill_id] or not self.prerequisites[skill_id] or skill_id in visiting:
+            return self.closure[skill_id]
+        visiting.add(skill_id)
+        mask, depth = self.prerequisites[skill_id], 0
+        for prerequisite in _bits(self.prerequisites[skill_id]):
+            mask |= self._close(prerequisite, visiting)
+            depth = max(depth, self.depth[prerequisite] + 1)
+        visiting.discard(skill_id)
+        self.closure[skill_id] = mask & ~(1 << skill_id)
+        self.depth[skill_id] = depth
+        return self.closure[skill_id]
+
+    def _mask(self, skills: List[str]) -> int:
+        mask = 0
+        for skill in skills:
+            mask |= 1 << self._ids[skill]
+        return mask
+
+    def _with_prerequisites(self, mask: int) -> int:
+        closed = mask
+        for skill_id in _bits(mask):
+            closed |= self.closure[skill_id]
+        return closed
+
+    def ordered(self, mask: int) -> List[str]:
+        """Skills in learning order: prerequisites before the skills that need them"""
+        return [self.names[skill_id] for skill_id in sorted(_bits(mask), key=lambda skill_id: (self.depth[skill_id], skill_id))]
+
+    def extract_skills(self, text: str) -> int:
+        """Bitmask of skills mentioned in free text (names or aliases)"""
+        if not self._skill_pattern:
+            return 0
+        mask = 0
+        for match in self._skill_pattern.finditer(text):
+            mask |= 1 << self._aliases[match.group(0).lower()]
+        return mask
+
+    def find_role(self, text: str) -> Optional[str]:
+        if not self._role_pattern:
+            return None
+        match = self._role_pattern.search(text)
+        return self._role_aliases[match.group(0).lower()] if match else None
+
+    def prerequisites_of(self, skill: str) -> List[str]:
+        return self.ordered(self.closure[self._ids[skill]])
+
+    def gap(self, profile: str, target_role: str) -> Optional[Dict[str, Any]]:
+        """Structured gap between the skills in `profile` and the role named in `target_role`
+
+        Skills a profile lists imply their prerequisites are known too.
+        Returns None when the role is not in the graph.
+        """
+        role = self.find_role(target_role)
+        if not role:
+            return None
+
+        requirements = self.roles[role]
+        mentioned = self.extract_skills(profile)
+        known = self._with_prerequisites(mentioned)
+        required = requirements["must"] | requirements["foundations"]
+        missing_must = requirements["must"] & ~known
+        missing_foundations = requirements["foundations"] & ~known
+        missing_preferred = requirements["preferred"] & ~known
+        covered = required & known
+
+        return {
+            "role": role,
+            "skills_detected": self.ordered(mentioned),
+            "matched_must_have": self.ordered(requirements["must"] & known),
+            "missing_must_have": self.ordered(missing_must),
+            "missing_foundations": self.ordered(missing_foundations),
+            "missing_preferred": self.ordered(missing_preferred),
+            "transferable": self.ordered(mentioned & ~(required | requirements["preferred"])),
+            "learning_path": self.ordered(missing_must | missing_foundations),
+            "coverage": round(bin(covered).count("1") / max(bin(required).count("1"), 1), 2)
+        }
+
+
+def gap_facts(gap: Dict[str, Any]) -> List[str]:
+    """Gap as compact fact lines for a grounded prompt"""
+    def none(skills: List[str]) -> str:
+        return ", ".join(skills) or "none"
+
+    return [
+        f"Target role: {gap['role']} (profile covers {gap['coverage']:.0%} of core requirements)",
+        f"Skills detected in profile: {none(gap['skills_detected'])}",
+        f"Must-have skills already met: {none(gap['matched_must_have'])}",
+        f"Missing must-have skills: {none(gap['missing_must_have'])}",
+        f"Missing foundations (prerequisites of must-haves): {none(gap['missing_foundations'])}",
+        f"Missing preferred skills: {none(gap['missing_preferred'])}",
+        f"Transferable skills outside the role profile: {none(gap['transferable'])}",
+        f"Learning order (prerequisites first): {none(gap['learning_path'])}"
+    ]
+
+
+_skill_graph: Optional[SkillGraph] = None
+_skill_graph_lock = threading.Lock()
+
+
+def get_skill_graph() -> SkillGraph:
+    """Shared graph, compiled from SKILL_GRAPH_DATA / SKILL_GRAPH_ROLES on first use"""
+    global _skill_graph
+    with _skill_graph_lock:
+        if _skill_graph is None:
+            _skill_graph = SkillGraph.from_files()
+        return _skill_graph
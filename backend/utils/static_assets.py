@@ -0,0 +1,188 @@
+"""
+Static Assets
+Frontend files loaded, fingerprinted and precompressed once at startup, then
+served from memory with ETags, 304s and long-lived caching for versioned URLs
+"""
+
+import os
+import re
+import hashlib
+import mimetypes
+import posixpath
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from flask import Response, abort, request
+
+from utils.compression import ENCODINGS, compress, negotiate_encoding
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRONTEND_DIR = os.path.abspath(os.getenv("FRONTEND_DIR", os.path.join(BACKEND_DIR, "..", "frontend")))
+# Re-read assets whose files changed (for local development; costs a stat per file per request)
+STATIC_RELOAD = os.getenv("STATIC_ASSET_RELOAD", "false").lower() in ("1", "true", "yes")
+
+# URLs carrying the current ?v=<fingerprint> never change, so browsers may keep them for a year
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Pages and unversioned URLs are revalidated on every use, which costs a 304 when unchanged
+REVALIDATE_CACHE_CONTROL = "no-cache"
+FINGERPRINT_LENGTH = 12
+# Smaller files are sent as-is: compression would not pay for its framing
+MIN_COMPRESS_BYTES = 256
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+# Assets are compressed once, so they get the maximum levels
+PRECOMPRESS_LEVELS = {"br": 11, "gzip": 9}
+
+# Local script and stylesheet references in HTML; absolute URLs and ones already versioned are left alone
+_ASSET_REFERENCE = re.compile(r'(?P<attr>\b(?:src|href)=")(?P<path>[^"?#:]+\.(?:js|css))(?=")')
+
+
+class StaticAsset:
+    """One file's bytes, fingerprint and precompressed variants"""
+
+    def __init__(self, path: str, data: bytes, mtime: float):
+        self.path = path
+        self.mtime = mtime
+        self.fingerprint = hashlib.sha256(data).hexdigest()[:FINGERPRINT_LENGTH]
+        mimetype, _ = mimetypes.guess_type(path)
+        self.mimetype = mimetype or "application/octet-stream"
+        if self.mimetype.startswith("text/") or self.mimetype == "application/javascript":
+            self.mimetype += "; charset=utf-8"
+        self.variants: Dict[Optional[str], bytes] = {None: data}
+        if len(data) >= MIN_COMPRESS_BYTES and self.mimetype.startswith(COMPRESSIBLE_TYPES):
+            for encoding in ENCODINGS:
+                compressed = compress(encoding, data, level=PRECOMPRESS_LEVELS[encoding])
+                if len(compressed) < len(data):
+                    self.variants[encoding] = compressed
+
+    def etag(self, encoding: Optional[str]) -> str:
+        return f'"{self.fingerprint}-{encoding}"' if encoding else f'"{self.fingerprint}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        """Whether an If-None-Match header names any representation of the current content"""
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        tags |= {tag[2:] for tag in tags if tag.startswith("W/")}
+        return any(self.etag(encoding) in tags for encoding in self.variants)
+
+
+class AssetRegistry:
+    """URL path -> StaticAsset for a set of mounted directories
+
+    HTML pages are rewritten at load time so their local script and style
+    references carry ?v=<fingerprint>; a changed file therefore gets a new
+    URL and the old one can be cached forever.
+    """
+
+    def __init__(self, mounts: List[Tuple[str, str, bool]]):
+        """`mounts` are (url prefix, directory, recursive)"""
+        self.mounts = mounts
+        self.assets: Dict[str, StaticAsset] = {}
+        self.stats = {"served": 0, "not_modified": 0, "compressed": 0}
+        self._load()
+
+    @classmethod
+    def default(cls) -> "AssetRegistry":
+        return cls([
+            ("", FRONTEND_DIR, False),
+            ("css/", os.path.join(FRONTEND_DIR, "css"), True),
+            ("js/", os.path.join(FRONTEND_DIR, "js"), True),
+            ("static/", os.path.join(BACKEND_DIR, "static"), True)
+        ])
+
+    def _files(self):
+        for prefix, directory, recursive in self.mounts:
+            if not os.path.isdir(directory):
+                continue
+            for root, dirs, files in os.walk(directory):
+                if not recursive:
+                    dirs[:] = []
+                for name in files:
+                    file_path = os.path.join(root, name)
+                    relative = os.path.relpath(file_path, directory).replace(os.sep, "/")
+                    yield prefix + relative, file_path
+
+    def _load(self):
+        pages = {}
+        for url_path, file_path in self._files():
+            with open(file_path, "rb") as f:
+                data = f.read()
+            mtime = os.path.getmtime(file_path)
+            if url_path.endswith(".html"):
+                pages[url_path] = (data, mtime)
+            else:
+                self.assets[url_path] = StaticAsset(url_path, data, mtime)
+        for url_path, (data, mtime) in pages.items():
+            self.assets[url_path] = StaticAsset(url_path, self._versioned_html(url_path, data), mtime)
+        self._source_mtimes = {url_path: asset.mtime for url_path, asset in self.assets.items()}
+
+    def _versioned_html(self, page_path: str, data: bytes) -> bytes:
+        base = posixpath.dirname(page_path)
+
+        def add_version(match):
+            reference = match.group("path")
+            if reference.startswith("/"):
+                target = reference.lstrip("/")
+            else:
+                target = posixpath.normpath(posixpath.join(base, reference))
+            asset = self.assets.get(target)
+            if asset is None:
+                return match.group(0)
+            return f'{match.group("attr")}{reference}?v={asset.fingerprint}'
+
+        return _ASSET_REFERENCE.sub(add_version, data.decode("utf-8")).encode("utf-8")
+
+    def stale(self) -> bool:
+        """Whether any mounted file was added, removed or modified since loading"""
+        try:
+            current = {url_path: os.path.getmtime(file_path) for url_path, file_path in self._files()}
+        except OSError:
+            return True
+        return current != self._source_mtimes
+
+    def version(self, url_path: str) -> Optional[str]:
+        asset = self.assets.get(url_path)
+        return asset.fingerprint if asset else None
+
+    def serve(self, url_path: str) -> Response:
+        """Response for GET `url_path`: 404, 304 or the best encoding the client accepts"""
+        asset = self.assets.get(url_path)
+        if asset is None:
+            abort(404)
+
+        versioned = request.args.get("v") == asset.fingerprint
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL if versioned else REVALIDATE_CACHE_CONTROL}
+        if len(asset.variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+
+        encoding = negotiate_encoding(request.accept_encodings, asset.variants)
+        headers["ETag"] = asset.etag(encoding)
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match and asset.matches(if_none_match):
+            self.stats["not_modified"] += 1
+            return Response(status=304, headers=headers)
+
+        self.stats["served"] += 1
+        if encoding:
+            self.stats["compressed"] += 1
+            headers["Content-Encoding"] = encoding
+        return Response(asset.variants[encoding], headers=headers, content_type=asset.mimetype)
+
+
+_registry: Optional[AssetRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_static_assets() -> AssetRegistry:
+    """Shared registry, loaded on first use (and reloaded on change with STATIC_ASSET_RELOAD)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None or (STATIC_RELOAD and _registry.stale()):
+            _registry = AssetRegistry.default()
+        return _registry
+
+
+def set_static_assets(registry: Optional[AssetRegistry]):
+    global _registry
+    with _registry_lock:
+        _registry = registry
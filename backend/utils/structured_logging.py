@@ -0,0 +1,208 @@
+"""
+Structured Logging
+JSON log lines with levels, sampling and size-capped fields, handed to a
+background thread through a bounded queue so request threads never block on stdout
+"""
+
+import os
+import sys
+import copy
+import queue
+import atexit
+import random
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from utils.serialization import dumps_text
+
+LOGGER_NAMESPACE = "career_agent"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # "json" or "text"
+# Share of DEBUG/INFO records kept; warnings and errors are always logged
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_FIELD_MAX_CHARS = int(os.getenv("LOG_FIELD_MAX_CHARS", "300"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Trace every agent run, not only requests that ask for it
+AGENT_VERBOSE = os.getenv("AGENT_VERBOSE", "false").lower() in ("1", "true", "yes")
+
+_RESERVED_KWARGS = {"exc_info", "stack_info", "stacklevel", "extra"}
+
+_agent_trace: contextvars.ContextVar = contextvars.ContextVar("agent_trace", default=False)
+
+
+def truncate(value: Any, limit: int = LOG_FIELD_MAX_CHARS) -> Any:
+    """Cap long strings (and the repr of other objects) at `limit` characters"""
+    if isinstance(value, (bool, int, float)) or value is None:
+        return value
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}...(+{len(text) - limit} chars)"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, event, then the record's fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage()
+        }
+        for key, value in getattr(record, "fields", {}).items():
+            entry[key] = truncate(value)
+        if record.exc_text:
+            entry["exception"] = truncate(record.exc_text, 4 * LOG_FIELD_MAX_CHARS)
+        return dumps_text(entry)
+
+
+class TextFormatter(logging.Formatter):
+    """Readable "[LEVEL] event key=value" lines for local development"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(f"{key}={truncate(value)}" for key, value in getattr(record, "fields", {}).items())
+        line = f"[{record.levelname}] {record.getMessage()}" + (f" {fields}" if fields else "")
+        return line + (f"\n{record.exc_text}" if record.exc_text else "")
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a `rate` share of records below WARNING"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or self.rate >= 1.0 or random.random() < self.rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Drops records (and counts them) instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback here; formatting and truncation run on the listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """Logger whose keyword arguments become fields: log.info("agent.fallback", agent="career")"""
+
+    def process(self, msg, kwargs):
+        fields = {key: kwargs.pop(key) for key in list(kwargs) if key not in _RESERVED_KWARGS}
+        kwargs["extra"] = {**kwargs.get("extra", {}), "fields": fields}
+        return msg, kwargs
+
+
+_listener: Optional[QueueListener] = None
+_listener_pid: Optional[int] = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging(level: str = LOG_LEVEL, log_format: str = LOG_FORMAT, sample_rate: float = LOG_SAMPLE_RATE,
+                      stream=None):
+    """(Re)install the queue handler and start its listener thread
+
+    Call again after fork: the listener thread does not survive it.
+    """
+    global _listener, _listener_pid
+    with _configure_lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            _listener.stop()
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(TextFormatter() if log_format == "text" else JsonFormatter())
+
+        handler = NonBlockingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        handler.addFilter(SamplingFilter(sample_rate))
+        logger = logging.getLogger(LOGGER_NAMESPACE)
+        for old in list(logger.handlers):
+            logger.removeHandler(old)
+        logger.addHandler(handler)
+        logger.setLevel(level)
+        logger.propagate = False
+
+        _listener = QueueListener(handler.queue, output)
+        _listener_pid = os.getpid()
+        _listener.start()
+
+
+def flush_logging():
+    """Stop the listener after it has written everything queued"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            _listener.stop()
+        _listener = None
+
+
+def get_logger(name: str) -> StructuredLogger:
+    if _listener is None:
+        configure_logging()
+    return StructuredLogger(logging.getLogger(f"{LOGGER_NAMESPACE}.{name}"), {})
+
+
+atexit.register(flush_logging)
+
+
+@contextmanager
+def agent_trace_scope(enabled: bool):
+    """Trace agent steps for this request (always on with AGENT_VERBOSE)"""
+    token = _agent_trace.set(bool(enabled) or AGENT_VERBOSE)
+    try:
+        yield
+    finally:
+        _agent_trace.reset(token)
+
+
+def agent_trace_enabled() -> bool:
+    return _agent_trace.get() or AGENT_VERBOSE
+
+
+class AgentTraceCallback(BaseCallbackHandler):
+    """Logs agent actions, tool results and the final answer, replacing AgentExecutor(verbose=True)"""
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self.log = get_logger("agent.trace")
+
+    def on_agent_action(self, action, **kwargs: Any):
+        self.log.info("agent.action", agent=self.agent, tool=action.tool, tool_input=action.tool_input)
+
+    def on_tool_end(self, output: Any, **kwargs: Any):
+        self.log.info("agent.tool_result", agent=self.agent, output=output)
+
+    def on_tool_error(self, error: BaseException, **kwargs: Any):
+        self.log.warning("agent.tool_error", agent=self.agent, error=error)
+
+    def on_agent_finish(self, finish, **kwargs: Any):
+        self.log.info("agent.finish", agent=self.agent, output=finish.return_values.get("output"))
+
+
+def trace_config(agent: str) -> Dict[str, Any]:
+    """invoke() keyword arguments that attach the trace callback when tracing is on"""
+    if not agent_trace_enabled():
+        return {}
+    return {"config": {"callbacks": [AgentTraceCallback(agent)]}}
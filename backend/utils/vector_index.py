@@ -0,0 +1,219 @@
+"""
+Persistent Vector Index and Resume/Job Description Matching
+Chunk embeddings live in a memory-mapped float32 file keyed by content hash,
+so unchanged chunks are never embedded twice
+"""
+
+import os
+import json
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; appends are then only serialized within a process
+    fcntl = None
+
+try:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    TEXT_SPLITTER_AVAILABLE = True
+except ImportError:
+    TEXT_SPLITTER_AVAILABLE = False
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[str]:
+    """Split a document into overlapping chunks (same settings the analysis always used)"""
+    if TEXT_SPLITTER_AVAILABLE:
+        splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        return [chunk for chunk in splitter.split_text(text) if chunk.strip()]
+
+    step = max(chunk_size - chunk_overlap, 1)
+    return [text[i:i + chunk_size] for i in range(0, max(len(text), 1), step) if text[i:i + chunk_size].strip()]
+
+
+class PersistentVectorIndex:
+    """Append-only, memory-mapped float32 vector store keyed by content hash
+
+    Vectors are appended to `vectors.f32` and their hashes, one per line, to
+    `keys.txt`; the matrix is memory-mapped on open, so loading costs no
+    parsing or copying and adding rows never rewrites existing data.
+    Appends hold an exclusive flock on the vectors file and first pick up
+    rows other processes appended, so worker processes can share a directory.
+    """
+
+    def __init__(self, directory: str, dim: Optional[int] = None):
+        self.directory = directory
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._rows: Dict[str, int] = {}
+        self._row_count = 0
+        self._matrix: Optional[np.ndarray] = None
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.directory, "vectors.f32")
+
+    @property
+    def _keys_path(self) -> str:
+        return os.path.join(self.directory, "keys.txt")
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.directory, "meta.json")
+
+    def _load(self):
+        self._rows = {}
+        self._row_count = 0
+        self._matrix = None
+        if not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path, "r") as f:
+            self.dim = json.load(f)["dim"]
+
+        keys = []
+        if os.path.exists(self._keys_path):
+            with open(self._keys_path, "r") as f:
+                keys = f.read().split()
+        # Vectors are written before keys, so trust only rows present in both files
+        stored_rows = os.path.getsize(self._vectors_path) // (4 * self.dim) if os.path.exists(self._vectors_path) else 0
+        for row, key in enumerate(keys[:stored_rows]):
+            self._rows.setdefault(key, row)
+        self._row_count = min(len(keys), stored_rows)
+        self._remap()
+
+    def _remap(self):
+        if self._row_count and self.dim:
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(self._row_count, self.dim))
+
+    def _refresh(self):
+        """Reload if another process appended rows (or left a torn write) since we last looked"""
+        if self.dim is None:
+            self._load()
+            return
+        size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        if size != self._row_count * 4 * self.dim:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def missing(self, keys: List[str]) -> List[str]:
+        with self._lock:
+            return [key for key in dict.fromkeys(keys) if key not in self._rows]
+
+    def add(self, keys: List[str], vectors: np.ndarray):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(keys):
+            return
+
+        with self._lock, open(self._vectors_path, "ab") as vectors_file:
+            if fcntl is not None:
+                # Released when the file is closed
+                fcntl.flock(vectors_file.fileno(), fcntl.LOCK_EX)
+            self._refresh()
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+            if not os.path.exists(self._meta_path):
+                with open(self._meta_path, "w") as f:
+                    json.dump({"dim": self.dim}, f)
+
+            new_keys, new_rows = [], []
+            for key, vector in zip(keys, vectors):
+                if key not in self._rows and key not in new_keys:
+                    new_keys.append(key)
+                    new_rows.append(vector)
+            if not new_keys:
+                return
+
+            # Drop vectors whose keys never made it to disk, so rows stay aligned with keys
+            vectors_file.truncate(self._row_count * 4 * self.dim)
+            vectors_file.write(np.stack(new_rows).astype(np.float32).tobytes())
+            vectors_file.flush()
+            with open(self._keys_path, "a") as f:
+                f.write("".join(key + "\n" for key in new_keys))
+
+            for offset, key in enumerate(new_keys):
+                self._rows[key] = self._row_count + offset
+            self._row_count += len(new_keys)
+            self._remap()
+
+    def get(self, keys: List[str]) -> np.ndarray:
+        with self._lock:
+            rows = [self._rows[key] for key in keys]
+            return np.asarray(self._matrix[rows], dtype=np.float32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class ResumeMatcher:
+    """Scores a resume against a job description from chunk embedding similarity
+
+    `embeddings` is an EmbeddingService (or anything with a matching
+    `embed(texts) -> matrix`), which owns caching of chunk vectors.
+    """
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+    def _vectors_for(self, chunks: List[str]) -> np.ndarray:
+        return _normalize(np.asarray(self.embeddings.embed(chunks), dtype=np.float32))
+
+    def analyze(self, resume_text: str, job_description: str, top_k: int = 3) -> Dict[str, Any]:
+        resume_chunks = chunk_text(resume_text)
+        job_chunks = chunk_text(job_description)
+        if not resume_chunks or not job_chunks:
+            return {"match_score": 0.0, "strongest_alignments": [], "weakest_requirements": []}
+
+        similarity = self._vectors_for(job_chunks) @ self._vectors_for(resume_chunks).T
+        best_resume_match = similarity.argmax(axis=1)
+        best_score = similarity.max(axis=1)
+
+        ranked = np.argsort(-best_score)
+        alignments = [
+            {"requirement": job_chunks[i], "evidence": resume_chunks[best_resume_match[i]], "similarity": round(float(best_score[i]), 3)}
+            for i in ranked[:top_k]
+        ]
+        gaps = [
+            {"requirement": job_chunks[i], "similarity": round(float(best_score[i]), 3)}
+            for i in ranked[::-1][:top_k]
+        ]
+
+        return {
+            "match_score": round(float(np.clip(best_score.mean(), 0.0, 1.0)) * 100, 1),
+            "strongest_alignments": alignments,
+            "weakest_requirements": gaps,
+            "resume_chunks": len(resume_chunks),
+            "job_chunks": len(job_chunks)
+        }
+
+
+_matchers: Dict[str, ResumeMatcher] = {}
+_matchers_lock = threading.Lock()
+
+
+def get_resume_matcher(backend: Optional[str] = None, model: Optional[str] = None) -> ResumeMatcher:
+    """Shared matcher per embedding backend/model"""
+    from utils.embedding_service import get_embedding_service
+
+    service = get_embedding_service(backend, model)
+    with _matchers_lock:
+        if service.backend.name not in _matchers:
+            _matchers[service.backend.name] = ResumeMatcher(service)
+        return _matchers[service.backend.name]